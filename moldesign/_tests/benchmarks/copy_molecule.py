@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+""" Measures the cost of copying molecules.
+
+Compares ``Molecule.copy`` and ``AtomContainer.copy_atoms``, which slice the atoms' data out of
+the molecule's arrays, against the general deepcopy-based path that they used to take. Usage:
+
+    python copy_molecule.py [num_copies ...]
+
+where each ``num_copies`` is the number of copies of a small protein (PDB 3AID) to combine
+into the molecule being copied (at most 13, since each copy adds two chains).
+"""
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+import moldesign as mdt
+
+# timeit turns off garbage collection by default; leave it on, as it is in real use
+GC_ENABLED = 'import gc; gc.enable()'
+
+PROTEIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', '3aid.pdb.gz')
+
+
+def make_molecule(num_copies):
+    protein = mdt.read(PROTEIN)
+    if num_copies == 1:
+        return protein
+    return protein.combine(*[protein for i in range(num_copies - 1)])
+
+
+def deepcopy_molecule(mol):
+    return mdt.Molecule(mol._copy_atoms_by_deepcopy(), name=mol.name + ' copy',
+                        pdbname=mol.pdbname, charge=mol.charge, metadata=mol.metadata)
+
+
+def main(sizes):
+    print('%10s %16s %16s %16s %16s' % ('atoms',
+                                        'deepcopy (s)', 'copy_atoms (s)',
+                                        'mol deepcopy (s)', 'mol.copy (s)'))
+    for num_copies in sizes:
+        mol = make_molecule(num_copies)
+        mol.bond_graph.topology  # build the topology once, as any earlier query would
+        timings = [min(timeit.repeat(func, setup=GC_ENABLED, number=1, repeat=3))
+                   for func in (mol._copy_atoms_by_deepcopy, mol.copy_atoms,
+                                lambda: deepcopy_molecule(mol), mol.copy)]
+        print('%10d %16.3f %16.3f %16.3f %16.3f' % ((mol.num_atoms,) + tuple(timings)))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1, 4, 12])
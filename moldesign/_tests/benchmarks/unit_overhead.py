@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+""" Measures the per-step cost of unit arithmetic in a velocity verlet step.
+
+Compares a unit-aware implementation of the step (i.e., doing all arithmetic with pint quantities)
+against ``VelocityVerlet.step``, which works on the molecule's raw arrays. Usage:
+
+    python unit_overhead.py [num_atoms ...]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import numpy as np
+
+import moldesign as mdt
+from moldesign import units as u
+
+
+def make_molecule(num_atoms):
+    mol = mdt.Molecule([mdt.Atom(1) for i in range(num_atoms)])
+    mol.positions = np.random.normal(size=(num_atoms, 3)) * u.angstrom
+    mol.set_energy_model(mdt.models.HarmonicOscillator(k=1.0*u.kcalpermol/u.angstrom**2))
+    mol.set_integrator(mdt.integrators.VelocityVerlet(timestep=1.0*u.fs))
+    mol.integrator.prep()
+    return mol
+
+
+def unit_aware_step(mol):
+    timestep = mol.integrator.params.timestep
+    phalf = mol.momenta + 0.5 * timestep * mol.calc_forces(wait=True)
+    mol.positions += phalf * timestep / mol.dim_masses
+    mol.momenta = phalf + 0.5 * timestep * mol.calc_forces(wait=True)
+
+
+def main(sizes):
+    print('%10s %18s %18s %8s' % ('atoms', 'with units (us)', 'raw arrays (us)', 'speedup'))
+    for num_atoms in sizes:
+        mol = make_molecule(num_atoms)
+        number = max(10, 20000 // num_atoms)
+        withunits = min(timeit.repeat(lambda: unit_aware_step(mol), number=number, repeat=3))
+        raw = min(timeit.repeat(mol.integrator.step, number=number, repeat=3))
+        print('%10d %18.1f %18.1f %8.2f' % (num_atoms,
+                                           1e6 * withunits / number,
+                                           1e6 * raw / number,
+                                           withunits / raw))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [10, 1000, 100000])
@@ -126,7 +126,7 @@ def test_center_of_mass_movement(fixturename, request):
 @pytest.mark.parametrize('fixturename', registered_types['container'])
 def test_container_properties(fixturename, request):
     obj = request.getfixturevalue(fixturename)
-    assert obj.mass == sum([atom.mass for atom in obj.atoms])
+    helpers.assert_almost_equal(obj.mass, sum([atom.mass for atom in obj.atoms]))
     np.testing.assert_array_equal(obj.positions.defunits(),
                                   u.array([atom.position for atom in obj.atoms]).defunits())
     assert obj.num_atoms == len(obj.atoms)
@@ -180,6 +180,49 @@ def test_atoms_within(fixturename, request):
             assert atom not in within5
 
 
+def test_atoms_within_tracks_moving_atoms(protein):
+    res = protein.residues[0]
+    before = set(res.atoms_within(5.0*u.angstrom))
+
+    protein.positions += [1.0, 2.0, 3.0] * u.angstrom
+    assert set(res.atoms_within(5.0*u.angstrom)) == before
+
+    res.translate([100.0, 0.0, 0.0] * u.angstrom)
+    assert len(res.atoms_within(5.0*u.angstrom)) == 0
+    assert res.distance(protein.residues[1]) > 80.0 * u.angstrom
+
+
+def test_subset_neighbor_queries_use_molecule_index(protein, monkeypatch):
+    first, last = protein.residues[0], protein.residues[-1]
+    expected_distance = first.calc_distance_array(last).min()
+    expected_contacts = first.calc_distance_array(last) <= 6.0*u.angstrom
+    protein.neighbor_index  # build the index before counting
+
+    built = []
+    newindex = mdt.geom.NeighborIndex
+    monkeypatch.setattr(mdt.geom, 'NeighborIndex',
+                        lambda positions: built.append(1) or newindex(positions))
+
+    assert abs(first.distance(last) - expected_distance) < 1e-10 * u.angstrom
+    np.testing.assert_array_equal(first.calc_contact_map(6.0*u.angstrom, last).toarray(),
+                                  expected_contacts)
+    assert not built
+
+
+@pytest.mark.parametrize('fixturename', ['residue', 'atomlist', 'small_molecule', 'protein'])
+def test_contact_map_matches_distance_array(fixturename, request):
+    obj = request.getfixturevalue(fixturename)
+    other = obj.atoms[0].molecule.residues[0]
+    radius = 4.0 * u.angstrom
+
+    for contacts, distances in ((obj.calc_contact_map(radius),
+                                 obj.calc_distance_array()),
+                                (obj.calc_contact_map(radius, other),
+                                 obj.calc_distance_array(other))):
+        assert contacts.shape == distances.shape
+        np.testing.assert_array_equal(contacts.toarray(), distances <= radius)
+
+
 @pytest.mark.parametrize('fixturename', ['atom', 'residue', 'atomlist'])
 @pytest.mark.screening
 def test_residues_within(fixturename, request):
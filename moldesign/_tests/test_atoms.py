@@ -85,6 +85,129 @@ def test_add_already_owned_atoms(h2):
                                 h2cpy.positions)
 
 
+def test_molecule_atom_columns_track_atom_attributes(pdb3aid):
+    mol = pdb3aid
+    assert (mol.atnums == [atom.atnum for atom in mol.atoms]).all()
+    assert list(mol.atom_names) == [atom.name for atom in mol.atoms]
+    assert (mol.residue_indices == [atom.residue.index for atom in mol.atoms]).all()
+    assert (mol.chain_indices == [atom.chain.index for atom in mol.atoms]).all()
+
+    atom = mol.atoms[10]
+    atom.mass = 2.0 * u.amu
+    atom.name = 'XX'
+    atom.formal_charge = -1 * u.q_e
+    assert mol.masses[10] == 2.0 * u.amu
+    assert mol.dim_masses[10, 2] == 2.0 * u.amu
+    assert mol.atom_names[10] == 'XX'
+    assert mol.formal_charges[10] == -1 * u.q_e
+
+    # atoms see changes made directly to the columns, even after they've been read
+    assert mol.atoms[11].mass == mol.masses[11]
+    mol.masses[11] = 3.0 * u.amu
+    mol.atnums[11] = 2
+    assert mol.atoms[11].mass == 3.0 * u.amu
+    assert mol.atoms[11].atnum == 2 and type(mol.atoms[11].atnum) is int
+    mol.masses = mol.masses.to(u.dalton)
+    assert mol.atoms[11].mass.units == u.dalton
+
+    # values survive copies, and re-indexing when atoms are added
+    for m in (mol.copy(), mdt.Molecule(mol.atoms)):
+        assert m.atoms[10].mass == 2.0 * u.amu
+        assert m.atoms[10].name == 'XX'
+        assert m.atoms[10].formal_charge == -1 * u.q_e
+    mol.add_atom(mdt.Atom('Xe'))
+    assert mol.atoms[10].mass == 2.0 * u.amu
+    assert mol.atnums[-1] == 54
+
+
+def test_vectorized_atom_queries_match_atom_attributes(pdb3aid):
+    mol = pdb3aid
+    residue = mol.residues[5]
+
+    for group in (mol, residue, mol.chains['A'], mol.atoms[::3]):
+        assert group.get_atoms(name='CA') == [a for a in group.atoms
+                                             if a.name == 'CA' or a.residue.name == 'CA']
+        assert group.get_atoms('protein', symbol='N') == [a for a in group.atoms
+                                                          if a.residue.type == 'protein'
+                                                          and a.atnum == 7]
+        assert group.get_atoms(resname='HOH', atnum=8) == [a for a in group.atoms
+                                                          if a.residue.resname == 'HOH'
+                                                          and a.atnum == 8]
+        assert group.heavy_atoms == [a for a in group.atoms if a.atnum != 1]
+        helpers.assert_almost_equal(group.mass, u.unitsum(a.mass for a in group.atoms))
+
+    assert mol.num_electrons == sum(atom.atnum for atom in mol.atoms) - mol.charge.value_in(u.q_e)
+
+
+def test_selection_expressions_match_atom_attributes(pdb3aid):
+    mol = pdb3aid
+    ligand = mol.residues[198]
+    assert ligand.resname == 'ARQ'  # sanity check
+
+    near_ligand = (mol.calc_distance_array(ligand) <= 8.0 * u.angstrom).any(axis=1)
+    expected = [a for a in mol.atoms
+                if near_ligand[a.index] and a.residue.type == 'protein' and a.name == 'CA']
+    assert mol.select('protein and name CA and within 8 of resname ARQ') == expected
+
+    assert mol.select('byres (water and within 3.5 of chain A)') == [
+        a for a in mol.atoms if a.residue.type == 'water' and
+        any(b in a.residue.atoms for b in mol.select('water and within 3.5 of chain A'))]
+
+    assert mol.select('not (hydrogen or protein)') == [a for a in mol.atoms
+                                                       if a.atnum != 1 and
+                                                       a.residue.type != 'protein']
+    assert mol.select('element C N and resid 10:12 30') == [
+        a for a in mol.atoms if a.symbol in ('C', 'N') and a.residue.pdbindex in (10, 11, 30)]
+    assert mol.select('backbone') == [a for res in mol.residues if res.backbone
+                                      for a in sorted(res.backbone, key=lambda x: x.index)]
+
+    chain = mol.chains['B']
+    assert chain.select('name CA or index 0:5') == [a for a in chain.atoms if a.name == 'CA']
+    indices = chain.select('name CA', indices=True)
+    assert list(indices) == [a.index for a in chain.atoms if a.name == 'CA']
+
+    sel = mdt.Selection.compile('name CA and not chain A')
+    assert mdt.Selection.compile('name CA and not chain A') is sel
+    assert list(sel.indices(mol)) == list(indices)
+
+
+def test_selections_follow_reassigned_residues_and_chains(pdb3aid):
+    mol = pdb3aid
+    atom = mol.residues[5].atoms[0]
+    newres = mol.residues[6]
+
+    atom.residue = newres
+    assert mol.residue_indices[atom.index] == newres.index
+    assert atom in mol.select('resindex %d' % newres.index)
+    assert atom not in mol.select('resindex 5')
+    assert atom in mol.get_atoms(resname=newres.resname)
+
+    residue = mol.residues[10]
+    residue.chain = mol.chains['B']
+    assert (mol.chain_indices[[a.index for a in residue.atoms]] == mol.chains['B'].index).all()
+    assert set(residue.atoms) <= set(mol.select('chain B'))
+
+
+def test_selections_ignore_residues_outside_the_molecule(pdb3aid):
+    mol = pdb3aid
+    atom = mol.atoms[0]
+    lastres = mol.residues[-1]
+
+    atom.residue = mdt.Molecule(mol.residues[3]).residues[0]
+    assert mol.residue_indices[atom.index] == -1
+    assert atom not in mol.select('resname %s' % lastres.resname)
+    assert atom not in mol.select('resid %d' % lastres.pdbindex)
+    assert len(mol.select('byres index 0')) == 0
+    assert len(mol.select('byres index %d' % lastres.atoms[0].index)) == lastres.num_atoms
+
+
+@pytest.mark.parametrize('expression', ['', 'name', 'all and', '(all', 'all foo',
+                                        'within x of all', 'element Xx', 'resid A', 'name "CA'])
+def test_invalid_selection_expressions(expression):
+    with pytest.raises(ValueError):
+        mdt.Selection(expression)
+
+
 def test_atom_shortstr_3aid(pdb3aid):
     assert pdb3aid.atoms[10]._shortstr() == 'CA #10 in A.GLN2'
 
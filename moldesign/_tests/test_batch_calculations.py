@@ -0,0 +1,67 @@
+""" Tests for calculating many conformations at once with EnergyModelBase.calculate_batch
+"""
+import pytest
+import numpy as np
+
+import moldesign as mdt
+from moldesign import units as u
+
+
+__PYTEST_MARK__ = 'internal'  # mark all tests in this module with this label (see ./conftest.py)
+
+
+class LoopedOscillator(mdt.models.HarmonicOscillator):
+    """ Uses the default (one calculation at a time) implementation of calculate_batch
+    """
+    calculate_batch = mdt.models.base.EnergyModelBase.calculate_batch
+
+
+@pytest.fixture(params=['harmonic', 'spring', 'looped'])
+def mol_and_conformations(request):
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(8)])
+    mol.positions = np.array([[1.0, 0.5, 0.0], [-0.5, 0.0, 0.2]]) * u.angstrom
+    k = 1.0 * u.kcalpermol / u.angstrom**2
+    if request.param == 'harmonic':
+        mol.set_energy_model(mdt.models.HarmonicOscillator, k=k)
+    elif request.param == 'spring':
+        mol.set_energy_model(mdt.models.Spring, k=k, d0=1.2*u.angstrom)
+    else:
+        mol.set_energy_model(LoopedOscillator, k=k)
+
+    rand = np.random.RandomState(4321)
+    conformations = mol.positions + rand.normal(size=(6, 2, 3)) * 0.1 * u.angstrom
+    return mol, conformations
+
+
+def test_batch_matches_single_calculations(mol_and_conformations):
+    mol, conformations = mol_and_conformations
+    initial_positions = mol.positions.copy()
+    initial_energy = mol.calculate_potential_energy()
+
+    result = mol.energy_model.calculate_batch(conformations)
+    assert result.potential_energy.shape == (6,)
+    assert result.forces.shape == (6, 2, 3)
+
+    # the molecule is left as it was
+    assert (mol.positions == initial_positions).all()
+    assert mol.potential_energy == initial_energy
+
+    for iconf, conformation in enumerate(conformations):
+        mol.positions = conformation
+        mol.calculate()
+        np.testing.assert_allclose(result.potential_energy[iconf].value_in(u.eV),
+                                   mol.potential_energy.value_in(u.eV))
+        np.testing.assert_allclose(result.forces[iconf].value_in(u.eV/u.angstrom),
+                                   mol.forces.value_in(u.eV/u.angstrom), atol=1e-12)
+
+
+def test_batch_requests(mol_and_conformations):
+    mol, conformations = mol_and_conformations
+    result = mol.energy_model.calculate_batch(conformations, requests=['potential_energy'])
+    assert list(result.keys()) == ['potential_energy']
+
+
+def test_batch_rejects_wrong_shape(mol_and_conformations):
+    mol, conformations = mol_and_conformations
+    with pytest.raises(ValueError):
+        mol.energy_model.calculate_batch(conformations[0])
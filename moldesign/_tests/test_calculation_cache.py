@@ -0,0 +1,99 @@
+""" Tests for the persistent calculation cache
+"""
+import os
+
+import pytest
+import numpy as np
+
+import moldesign as mdt
+from moldesign import units as u
+
+
+__PYTEST_MARK__ = 'internal'  # mark all tests in this module with this label (see ./conftest.py)
+
+
+class CountingOscillator(mdt.models.HarmonicOscillator):
+    CACHEABLE = True
+    ncalls = 0
+
+    def calculate(self, requests):
+        CountingOscillator.ncalls += 1
+        return super().calculate(requests)
+
+
+@pytest.fixture
+def resultcache(tmpdir):
+    cache = mdt.models.set_calculation_cache(str(tmpdir.join('calcs')))
+    CountingOscillator.ncalls = 0
+    yield cache
+    mdt.models.set_calculation_cache(None)
+
+
+def _make_molecule(k=1.0):
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(8)])
+    mol.positions = np.array([[1.0, 0.5, 0.0], [-0.5, 0.0, 0.0]]) * u.angstrom
+    mol.set_energy_model(CountingOscillator, k=k*u.kcalpermol/u.angstrom**2)
+    return mol
+
+
+def test_results_reused_by_new_molecule(resultcache):
+    energy = _make_molecule().calculate_potential_energy()
+    assert CountingOscillator.ncalls == 1
+    assert len(resultcache) == 1
+
+    mol = _make_molecule()  # e.g., after restarting the notebook
+    assert mol.calculate_potential_energy() == energy
+    assert CountingOscillator.ncalls == 1
+    assert mol.properties.mol is mol
+    assert mol.properties.geometry_matches(mol)
+    assert (mol.forces == _make_molecule().calculate_forces()).all()
+
+
+def test_cache_key_computed_once_per_calculation(resultcache, monkeypatch):
+    keys = []
+    original_key = resultcache.key
+    monkeypatch.setattr(resultcache, 'key', lambda mol: keys.append(original_key(mol)) or keys[-1])
+
+    mol = _make_molecule()
+    mol.calculate()
+    assert len(keys) == 1
+    assert os.path.exists(resultcache._filename(keys[0]))
+
+
+def test_cache_key_depends_on_calculation(resultcache):
+    mol = _make_molecule()
+    mol.calculate()
+    key = mdt.models.calculation_key(mol)
+
+    mol.atoms[0].x += 0.001 * u.angstrom
+    assert mdt.models.calculation_key(mol) != key
+    mol.atoms[0].x -= 0.001 * u.angstrom
+    assert mdt.models.calculation_key(mol) == key
+
+    assert mdt.models.calculation_key(_make_molecule(k=2.0)) != key
+
+    newmol = _make_molecule()
+    newmol.atoms[0].atnum = 2
+    assert mdt.models.calculation_key(newmol) != key
+
+
+def test_cache_bypassed_without_use_cache(resultcache):
+    _make_molecule().calculate()
+    _make_molecule().calculate(use_cache=False)
+    assert CountingOscillator.ncalls == 2
+
+
+def test_least_recently_used_results_are_evicted(resultcache):
+    mol = _make_molecule()
+    mol.calculate()
+    filesize = os.path.getsize(resultcache._filename(resultcache.key(mol)))
+    resultcache.max_size = 2.5 * filesize
+
+    keys = []
+    for i in range(3):
+        mol.atoms[0].x += 0.1 * u.angstrom
+        mol.calculate()
+        keys.append(resultcache.key(mol))
+    assert len(resultcache) == 2
+    assert not os.path.exists(resultcache._filename(keys[0]))
+    assert os.path.exists(resultcache._filename(keys[2]))
@@ -279,4 +279,52 @@ def test_wfn_copy(cached_h2_rhf_sto3g):
     # should be completely equal
     assert (wfn.aobasis.fock == original.wfn.aobasis.fock).all()
     # but different objects
-    assert wfn.aobasis.fock is not original.wfn.aobasis.fock
\ No newline at end of file
+    assert wfn.aobasis.fock is not original.wfn.aobasis.fock
+
+
+def test_bulk_atom_copy_matches_deepcopy(pdb3aid):
+    mol = pdb3aid
+    mol.atoms[5].metadata.note = 'original'
+    for oldatoms in (mol.atoms, mol.chains['B'].atoms, mdt.AtomList(mol.atoms[100:300:3])):
+        atoms = oldatoms.copy_atoms()
+        reference = oldatoms._copy_atoms_by_deepcopy()
+        assert len(atoms) == len(reference) == len(oldatoms)
+
+        for atom, ref in zip(atoms, reference):
+            assert atom.molecule is None
+            for attr in ('name', 'atnum', 'mass', 'formal_charge', 'pdbname', 'pdbindex'):
+                assert getattr(atom, attr) == getattr(ref, attr)
+            assert (atom.position == ref.position).all()
+            assert (atom.momentum == ref.momentum).all()
+            assert atom.residue.name == ref.residue.name
+            assert atom.chain.name == ref.chain.name
+            assert atom.metadata == ref.metadata
+
+        assert _indexed_bonds(atoms) == _indexed_bonds(reference)
+
+    copied = mol.atoms.copy_atoms()[5]
+    copied.metadata.note = 'copy'
+    assert mol.atoms[5].metadata.note == 'original'
+
+
+def _indexed_bonds(atoms):
+    indices = {atom: i for i, atom in enumerate(atoms)}
+    return {(indices[atom], indices[nbr], order)
+            for atom in atoms for nbr, order in atom.bond_graph.items()}
+
+
+def test_molecule_copy_shares_nothing_with_original(pdb3aid):
+    mol = pdb3aid
+    oldbackbone = mol.residues[3].backbone
+    newmol = mol.copy()
+    assert newmol.is_identical(mol)
+    assert (newmol.bond_graph.topology.bonds == mol.bond_graph.topology.bonds).all()
+
+    # cached references to the original's atoms aren't carried over
+    assert set(newmol.residues[3].backbone) == {newmol.atoms[a.index] for a in oldbackbone}
+    assert newmol.chains['A'].n_terminal is newmol.residues[0]
+
+    newmol.atoms[0].x += 1.0 * u.angstrom
+    newmol.new_bond(newmol.atoms[0], newmol.atoms[-1], 1)
+    assert not newmol.is_identical(mol)
+    assert mol.atoms[-1] not in mol.atoms[0].bond_graph
@@ -516,3 +516,86 @@ def test_pyscf_and_mdt_overlaps_are_the_same(h2_rhf_augccpvdz):
     np.testing.assert_allclose(mol.wfn.aobasis.overlaps,
                                overlaps,
                                atol=5.0e-7)
+
+
+@pytest.fixture
+def handmade_basis():
+    """ Normalized basis with spherical, cartesian and s-type contracted functions on two atoms
+    """
+    from moldesign.orbitals import (AtomicBasisFunction, BasisSet, CartesianGaussian,
+                                    Gaussian, SphericalGaussian)
+
+    mol = moldesign.Molecule([moldesign.Atom(6), moldesign.Atom(8)])
+    mol.atoms[1].x = 1.3 * u.angstrom
+    mol.atoms[1].y = -0.4 * u.angstrom
+    alphas = np.array([40.0, 3.5, 0.4]) / u.angstrom**2
+
+    functions = []
+    for atom in mol.atoms:
+        center = atom.position
+        functions.append(AtomicBasisFunction(
+                atom, n=1, l=0,
+                primitives=[Gaussian(center, a, coeff=c) for a, c in zip(alphas, [0.2, 0.5, 0.4])]))
+        for l in range(4):
+            for m in range(-l, l+1):
+                functions.append(AtomicBasisFunction(
+                        atom, n=l+1, l=l, m=m,
+                        primitives=[SphericalGaussian(center, a, l, m, coeff=c)
+                                    for a, c in zip(alphas[1:], [0.6, 0.5])]))
+        for cart in ('xx', 'yz'):
+            functions.append(AtomicBasisFunction(
+                    atom, n=3, l=2, cart=cart,
+                    primitives=[CartesianGaussian(center, alphas[2],
+                                                  moldesign.orbitals.gaussians.cart_to_powers(cart))]))
+
+    for fn in functions:
+        fn.normalize()
+    return BasisSet(mol, functions)
+
+
+def test_packed_basis_matches_function_by_function_evaluation(handmade_basis):
+    basis = handmade_basis
+    coords = 8.0 * (np.random.rand(300, 3) - 0.5) * u.angstrom
+
+    with np.errstate(under='ignore'):
+        expected = u.array([bf(coords) for bf in basis.orbitals]).T
+        values = basis(coords)
+    assert values.shape == (len(coords), len(basis))
+    helpers.assert_almost_equal(values, expected, decimal=10)
+
+    # coefficients can be applied directly, including a single orbital's coefficient vector
+    coeffs = np.random.rand(3, len(basis)) - 0.5
+    helpers.assert_almost_equal(basis(coords, coeffs=coeffs), expected.dot(coeffs.T),
+                                decimal=10)
+    helpers.assert_almost_equal(basis(coords, coeffs=coeffs[0]), expected.dot(coeffs[0]),
+                                decimal=10)
+
+
+def test_packed_basis_chunking_and_screening(handmade_basis):
+    from moldesign.orbitals.packed import PackedBasis
+
+    coords = 8.0 * (np.random.rand(100, 3) - 0.5) * u.angstrom
+    expected = handmade_basis(coords)
+
+    tiny = PackedBasis(handmade_basis, max_memory=1)
+    assert tiny.chunksize(len(handmade_basis)) == 1
+    helpers.assert_almost_equal(tiny(coords), expected, decimal=12)
+
+    faraway = [[1000.0, 0.0, 0.0], [0.0, -1000.0, 0.0]] * u.angstrom
+    with np.errstate(under='raise'):  # exponentials this small should never be evaluated
+        assert (handmade_basis(faraway).magnitude == 0.0).all()
+
+
+def test_basis_overlap_matrix_matches_pairwise_overlaps(handmade_basis):
+    basis = handmade_basis
+    assert basis._overlaps is None
+    overlaps = basis.overlaps
+    assert overlaps.shape == (len(basis), len(basis))
+    np.testing.assert_allclose(overlaps, overlaps.T)
+    np.testing.assert_allclose(np.diag(overlaps), 1.0, atol=1e-10)
+    assert np.linalg.eigvalsh(overlaps).min() > 0.0
+
+    for i, j in [(0, 19), (1, 20), (17, 7), (17, 28), (3, 22), (5, 5), (12, 31), (18, 37),
+                 (9, 28), (2, 33)]:
+        expected = basis.orbitals[i].overlap(basis.orbitals[j])
+        helpers.assert_almost_equal(overlaps[i, j], expected, decimal=10)
@@ -0,0 +1,82 @@
+""" Tests for MDT's in-process (non-OpenMM) integrators
+"""
+import pytest
+import numpy as np
+
+import moldesign as mdt
+from moldesign import units as u
+
+from .object_fixtures import h2, h2_harmonic
+
+
+__PYTEST_MARK__ = 'internal'  # mark all tests in this module with this label (see ./conftest.py)
+
+
+def test_verlet_one_force_call_per_step(h2_harmonic):
+    mol = h2_harmonic
+    mol.atoms[0].x = 1.0 * u.angstrom
+    model = mol.energy_model
+
+    ncalls = [0]
+    calculate = model.calculate
+
+    def counting_calculate(requests):
+        ncalls[0] += 1
+        return calculate(requests)
+    model.calculate = counting_calculate
+
+    traj = mol.run(100)
+    assert ncalls[0] == 101  # one call for the initial frame, then one per step
+    assert traj.num_frames == 4
+
+
+def test_verlet_harmonic_oscillator(h2_harmonic):
+    mol = h2_harmonic
+    mol.atoms[0].x = 1.0 * u.angstrom
+    mol.atoms[1].x = -0.5 * u.angstrom
+    mol.momenta *= 0.0
+
+    traj = mol.run(300)
+
+    # x(t) = x(0) cos(omega t) for each atom
+    omega = np.sqrt(mol.energy_model.params.k / mol.masses[0])
+    expected = (np.cos((omega * traj.time).value_in(u.dimensionless)) *
+                traj.positions[0, 0, 0])
+    np.testing.assert_allclose(traj.positions[:, 0, 0].value_in(u.angstrom),
+                               expected.value_in(u.angstrom),
+                               atol=1e-3)
+
+    energy = traj.potential_energy + traj.kinetic_energy
+    assert (abs(energy - energy[0]) < 1e-4 * energy[0]).all()
+
+
+@pytest.fixture
+def harmonic_gas():
+    mol = mdt.Molecule([mdt.Atom(6) for i in range(200)])
+    mol.positions = np.random.normal(size=(200, 3)) * u.angstrom
+    mol.set_energy_model(mdt.models.HarmonicOscillator(k=1.0*u.kcalpermol/u.angstrom**2))
+
+    # start with a Maxwell-Boltzmann distribution at 300K
+    kT = u.k_b * 300.0 * u.kelvin
+    mol.momenta = (np.sqrt(mol.dim_masses * kT).defunits() *
+                   np.random.normal(size=(mol.num_atoms, 3)))
+    return mol
+
+
+THERMOSTATS = {'baoab': lambda: mdt.integrators.LangevinBAOAB(collision_rate=5.0/u.ps),
+               'berendsen': lambda: mdt.integrators.BerendsenVerlet(coupling_time=50.0*u.fs),
+               'csvr': lambda: mdt.integrators.CSVRVerlet(coupling_time=50.0*u.fs)}
+
+
+@pytest.mark.parametrize('integrator', sorted(THERMOSTATS))
+def test_thermostat_reaches_temperature(harmonic_gas, integrator):
+    mol = harmonic_gas
+    mol.set_integrator(THERMOSTATS[integrator]())
+    mol.integrator.params.update(temperature=300.0*u.kelvin,
+                                 timestep=2.0*u.fs,
+                                 frame_interval=10)
+
+    traj = mol.run(1000)
+    assert abs(mol.time - 2.0*u.ps) < 1e-6*u.fs
+    temperature = traj.kinetic_temperature[traj.num_frames//2:].mean()
+    assert abs(temperature - 300.0*u.kelvin) < 30.0 * u.kelvin
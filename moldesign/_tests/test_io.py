@@ -304,3 +304,97 @@ def test_write_traj(h2_trajectory, tmpdir):
 
     assert int(subprocess.check_output(['wc', '-l', path]).split()[0]) == (
         (h2_trajectory.mol.num_atoms+2) * h2_trajectory.num_frames)
+
+
+@pytest.mark.parametrize('precision', [None, 1e-3*u.angstrom])
+def test_binary_traj_roundtrip(h2_trajectory, tmpdir, precision):
+    path = os.path.join(str(tmpdir), 'traj.mdtrj')
+    h2_trajectory.write(path, precision=precision)
+
+    frames = list(mdt.read_trajectory(path))
+    assert len(frames) == h2_trajectory.num_frames
+    tolerance = 1e-5 * u.angstrom if precision is None else precision
+    for frame, expected in zip(frames, h2_trajectory.frames):
+        assert frame.time == expected.time
+        assert (abs(frame.positions - expected.positions) <= tolerance).all()
+
+
+def test_binary_traj_is_compact():
+    mol = mdt.read(get_data_path('1yu8.pdb'))
+    traj = mdt.Trajectory(mol)
+    for i in range(10):
+        mol.positions += 0.01 * u.angstrom
+        traj.new_frame(time=i*u.ps)
+
+    binary = traj.write(format='mdtrj').getvalue()
+    pdb = traj.write(format='pdb').getvalue()
+    assert 10 * len(binary) < len(pdb)
+
+
+@pytest.fixture
+def h2_handmade_wfn():
+    """ H2 with a minimal (STO-3G-like) basis and a doubly-occupied bonding orbital
+    """
+    from moldesign.orbitals import AtomicBasisFunction, BasisSet, Gaussian
+
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(1)], name='h2')
+    mol.atoms[1].x = 0.74 * u.angstrom
+    functions = []
+    for atom in mol.atoms:
+        functions.append(AtomicBasisFunction(
+                atom, n=1, l=0,
+                primitives=[Gaussian(atom.position, alpha / u.a0**2, coeff=c)
+                            for alpha, c in ((3.42525, 0.15433),
+                                             (0.62391, 0.53533),
+                                             (0.16886, 0.44463))]))
+        functions[-1].normalize()
+    basis = BasisSet(mol, functions)
+
+    coeffs = numpy.array([[1.0, 1.0], [1.0, -1.0]])
+    coeffs /= numpy.sqrt(numpy.diag(coeffs.dot(basis.overlaps).dot(coeffs.T)))[:, None]
+    wfn = mdt.orbitals.ElectronicWfn(mol, 2, aobasis=basis, description='handmade',
+                                     density_matrix_ao=2.0 * numpy.outer(coeffs[0], coeffs[0]))
+    wfn.add_orbitals([mdt.orbitals.Orbital(c, wfn=wfn) for c in coeffs], orbtype='canonical')
+    return wfn
+
+
+def _read_cube(text):
+    lines = text.splitlines()
+    natoms, origin = int(lines[2].split()[0]), numpy.array(lines[2].split()[1:], dtype=float)
+    points = [int(l.split()[0]) for l in lines[3:6]]
+    deltas = [float(l.split()[i+1]) for i, l in enumerate(lines[3:6])]
+    data = ' '.join(lines[6 + abs(natoms):]).split()
+    if natoms < 0:
+        numorbs = int(data[0])
+        data = data[numorbs + 1:]
+    return origin, points, deltas, numpy.array(data, dtype=float).reshape(points + [-1])
+
+
+def test_write_orbital_cube(h2_handmade_wfn, tmpdir):
+    wfn = h2_handmade_wfn
+    grid = mdt.mathutils.padded_grid(wfn.positions, 3.0 * u.angstrom, npoints=11)
+    path = str(tmpdir.join('orbs.cube'))
+    mdt.write_cube(wfn.orbitals.canonical, path, grid=grid)
+    with open(path) as cubefile:
+        text = cubefile.read()
+
+    origin, points, deltas, values = _read_cube(text)
+    assert points == [11, 11, 11]
+    assert values.shape == (11, 11, 11, 2)
+    numpy.testing.assert_allclose(origin, grid.origin.value_in(u.a0), atol=1e-6)
+    numpy.testing.assert_allclose(deltas, grid.deltas.value_in(u.a0), atol=1e-6)
+
+    expected = wfn.orbitals.canonical[0](grid.allpoints()).value_in(u.a0**-1.5)
+    numpy.testing.assert_allclose(values[..., 0].ravel(), expected, rtol=1e-4, atol=1e-10)
+
+    # the same file is produced in parallel, or when written through mdt.write
+    assert mdt.write_cube(wfn.orbitals.canonical, grid=grid, num_processes=2) == text
+    assert _read_cube(mdt.write(wfn.orbitals.canonical[1], format='cube'))[3].shape[-1] == 1
+
+
+def test_density_cube_integrates_to_num_electrons(h2_handmade_wfn):
+    wfn = h2_handmade_wfn
+    origin, points, deltas, values = _read_cube(mdt.write_cube(wfn, npoints=40))
+    assert values.shape == (40, 40, 40, 1)
+    assert (values >= 0.0).all()
+    numpy.testing.assert_allclose(values.sum() * numpy.prod(deltas), 2.0, rtol=1e-3)
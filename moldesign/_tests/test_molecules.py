@@ -50,6 +50,35 @@ def test_h2_array_link(h2):
     assert h2.atoms[1].py == 3.0*u.default.momentum
 
 
+def test_h2_raw_arrays_are_views(h2):
+    mol = h2.copy()
+    atom1, atom2 = mol.atoms
+    mol.positions_raw[1, 2] = 2.0
+    assert atom2.z == 2.0 * u.default.length
+
+    mol.momenta_raw = np.ones((2, 3))
+    assert (atom1.momentum == np.ones(3) * u.default.momentum).all()
+
+    mol.positions = 0.1 * np.ones((2, 3)) * u.nm
+    np.testing.assert_allclose(mol.positions_raw, np.ones((2, 3)))
+
+
+def test_suspend_unit_checks(h2):
+    mol = h2.copy()
+    with pytest.raises(u.DimensionalityError):
+        mol.positions[0] = [1.0, 2.0, 3.0]
+
+    with u.suspend_unit_checks():
+        mol.positions[0] = [1.0, 2.0, 3.0]
+        mol.positions = np.zeros((2, 3))
+        mol.atoms[1].position = [4.0, 5.0, 6.0]
+    assert (mol.atoms[0].position == np.zeros(3) * u.default.length).all()
+    assert mol.atoms[1].y == 5.0 * u.default.length
+
+    with pytest.raises(u.DimensionalityError):
+        mol.positions[0] = [1.0, 2.0, 3.0]
+
+
 def test_benzene_orbital_numbers(benzene):
     assert benzene.num_electrons == 42
     assert benzene.homo == 20
@@ -324,6 +353,80 @@ def test_changing_bonds_makes_mols_different(nucleic):
     assert not nucleic.same_topology(n, verbose=True)
 
 
+def _ring_with_tail_and_pair():
+    """ 6-membered ring (atoms 0-5) with a 2-atom tail on atom 0 (atoms 6-7), plus a separate
+    diatomic (atoms 8-9)
+    """
+    atoms = [mdt.Atom('C') for i in range(10)]
+    for i in range(6):
+        atoms[i].bond_to(atoms[(i+1) % 6], 1)
+    atoms[0].bond_to(atoms[6], 1)
+    atoms[6].bond_to(atoms[7], 2)
+    atoms[8].bond_to(atoms[9], 1)
+    return mdt.Molecule(atoms)
+
+
+def test_bond_topology_arrays_and_algorithms():
+    mol = _ring_with_tail_and_pair()
+    topology = mol.bond_graph.topology
+
+    assert mol.num_bonds == topology.num_bonds == 9
+    assert list(topology.neighbors_of(0)) == [1, 5, 6]
+    assert list(topology.degrees) == [3, 2, 2, 2, 2, 2, 2, 1, 1, 1]
+    assert topology.orders[topology.offsets[6]:topology.offsets[7]].tolist() == [1, 2]
+    assert [tuple(b) for b in topology.bonds] == [(bond.a1.index, bond.a2.index)
+                                                 for bond in mol.bonds]
+
+    labels = topology.connected_components()
+    assert len(set(labels[:8])) == 1
+    assert labels[8] == labels[9] != labels[0]
+
+    assert topology.ring_atoms.tolist() == [True]*6 + [False]*4
+    for bond in mol.bonds:
+        assert bond.is_cyclic == (bond.a2.index < 6)
+
+    assert topology.shortest_path(7, 3) in ([7, 6, 0, 1, 2, 3], [7, 6, 0, 5, 4, 3])
+    assert topology.shortest_path(7, 8) is None
+    assert topology.distances(7).tolist() == [2, 3, 4, 5, 4, 3, 1, 0, np.inf, np.inf]
+
+    assert topology.fragment(6, 0).tolist() == [6, 7]
+    assert topology.fragment(0, 6).tolist() == [0, 1, 2, 3, 4, 5]
+    with pytest.raises(ValueError):
+        topology.fragment(0, 1)
+    assert topology.orders[topology.offsets[6]:topology.offsets[7]].tolist() == [1, 2]
+    assert topology.fragment(7, 6).tolist() == [7]
+
+
+def test_bond_topology_updates_with_bond_graph():
+    mol = _ring_with_tail_and_pair()
+    assert mol.bond_graph.topology.cyclic_bonds.sum() == 6
+
+    mol.delete_bond(mol.atoms[2], mol.atoms[3])
+    topology = mol.bond_graph.topology
+    assert mol.num_bonds == 8
+    assert not topology.cyclic_bonds.any()
+    assert topology.fragment(2, 1).tolist() == [2]
+
+    mol.atoms[7].bond_to(mol.atoms[8], 1)
+    assert mol.num_bonds == 9
+    assert len(set(mol.bond_graph.topology.connected_components())) == 1
+
+
+def test_cyclic_bonds_in_protein(pdb1yu8):
+    mol = pdb1yu8
+    topology = mol.bond_graph.topology
+    labels = topology.connected_components()
+
+    for ibond, (i, j) in enumerate(topology.bonds):
+        # brute force: the bond is in a ring if its atoms are still connected without it
+        others = np.delete(topology.bonds, ibond, axis=0)
+        cut = mdt.molecules.BondTopology(mol.num_atoms, others).connected_components()
+        assert topology.cyclic_bonds[ibond] == (cut[i] == cut[j])
+        assert labels[i] == labels[j]
+
+    assert topology.cyclic_bonds.any()
+
+
 def test_charge_from_number(h2):
     h2plus = mdt.Molecule(h2, charge=1)
     assert h2plus.charge == 1 * u.q_e
@@ -231,3 +231,217 @@ def test_fallback_to_builtin_minimizer_for_arbitrary_constraints(small_mol, inte
 def test_list_platforms():  # doesn't do much right now
     platforms = mdt.interfaces.openmm.list_openmmplatforms()
     print('Found platforms %d: ', (len(platforms), platforms))
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_simtk_array_conversions():
+    from simtk import unit as stku
+
+    velocities = stku.Quantity(np.arange(12.0).reshape((4, 3)), stku.nanometer/stku.picosecond)
+    converted = mdt.interfaces.openmm.simtk2pint(velocities)
+    np.testing.assert_allclose(converted.value_in(u.nm/u.ps), np.arange(12.0).reshape((4, 3)))
+
+    raw = mdt.interfaces.openmm.simtk2raw(velocities)
+    assert not isinstance(raw, u.MdtQuantity)
+    np.testing.assert_allclose(raw, converted.value_in(u.default.length/u.default.time))
+
+    energy = mdt.interfaces.openmm.simtk2pint(-5.0 * stku.kilojoule_per_mole)
+    assert abs(energy - -5.0*u.kjpermol) < 1e-6 * u.kjpermol
+
+    # conversions follow changes to the default unit system
+    oldlength = u.default.length
+    try:
+        u.default.length = u.nm
+        raw = mdt.interfaces.openmm.simtk2raw(velocities)
+        np.testing.assert_allclose(raw, converted.value_in(u.nm/u.default.time))
+    finally:
+        u.default.length = oldlength
+    np.testing.assert_allclose(mdt.interfaces.openmm.simtk2raw(velocities),
+                               converted.value_in(u.default.length/u.default.time))
+
+
+def _two_particle_simulation():
+    from simtk import openmm, unit as stku
+    from simtk.openmm import app
+
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(8)])
+    system = openmm.System()
+    topology = app.Topology()
+    residue = topology.addResidue('OH', topology.addChain())
+    for atom in mol.atoms:
+        system.addParticle(atom.mass.value_in(u.amu))
+        topology.addAtom(atom.name, app.Element.getByAtomicNumber(atom.atnum), residue)
+    bond = openmm.HarmonicBondForce()
+    bond.addBond(0, 1, 0.1, 1000.0)
+    system.addForce(bond)
+    sim = app.Simulation(topology, system, openmm.VerletIntegrator(1.0*stku.femtosecond))
+    sim.context.setPositions(np.array([[0.0, 0.0, 0.0], [0.12, 0.0, 0.0]]) * stku.nanometer)
+    return mol, sim
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_buffered_reporter_records_fields_at_own_intervals():
+    mol, sim = _two_particle_simulation()
+    reporter = mdt.interfaces.openmm.BufferedReporter(mol, {'positions': 10, 'energies': 4})
+    sim.reporters = [reporter]
+    reporter.report_all(sim)
+    sim.step(25)
+    reporter.report_all(sim)
+    traj = reporter.build_trajectory()
+
+    assert reporter.steps == [0, 4, 8, 10, 12, 16, 20, 24, 25]
+    assert traj.num_frames == 9
+    np.testing.assert_allclose(traj.time.value_in(u.fs), reporter.steps)
+    assert 'forces' not in traj.properties and 'momenta' not in traj.properties
+
+    has_positions = ~np.isnan(traj.positions[:, 0, 0].magnitude)
+    np.testing.assert_array_equal(has_positions, [1, 0, 0, 1, 0, 0, 1, 0, 1])
+    assert abs(traj.positions[0, 1, 0] - 1.2*u.angstrom) < 1e-6 * u.angstrom
+
+    has_energy = ~np.isnan(traj.potential_energy.magnitude)
+    np.testing.assert_array_equal(has_energy, [1, 1, 1, 0, 1, 1, 1, 1, 1])
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_buffered_reporter_kinetic_energy_without_velocities():
+    mol, sim = _two_particle_simulation()
+    reporter = mdt.interfaces.openmm.BufferedReporter(mol, {'energies': 5})
+    sim.reporters = [reporter]
+    sim.step(20)
+    traj = reporter.build_trajectory()
+
+    assert 'momenta' not in traj.properties
+    assert traj.num_frames == 4
+    kinetic = traj.kinetic_energy
+    assert kinetic.dimensionality == u.default.energy.dimensionality
+    assert (kinetic > 0.0 * u.default.energy).all()
+    temperatures = traj.kinetic_temperature
+    assert not np.isnan(temperatures.magnitude).any()
+    assert (temperatures > 0.0 * u.kelvin).all()
+
+
+@pytest.fixture
+def water_with_handmade_ff():
+    import parmed
+
+    mol = mdt.Molecule([mdt.Atom(name='O', atnum=8),
+                        mdt.Atom(name='H1', atnum=1),
+                        mdt.Atom(name='H2', atnum=1)])
+    mol.positions = [[0.0, 0.0, 0.0], [0.96, 0.0, 0.0], [-0.24, 0.93, 0.0]] * u.angstrom
+    mol.new_bond(mol.atoms[0], mol.atoms[1], 1)
+    mol.new_bond(mol.atoms[0], mol.atoms[2], 1)
+
+    struc = parmed.Structure()
+    for atom in mol.atoms:
+        struc.add_atom(parmed.Atom(name=atom.name, atomic_number=atom.atnum,
+                                   mass=atom.mass.value_in(u.amu), charge=0.0), 'HOH', 1)
+    bondtype = parmed.BondType(450.0, 0.96)
+    angletype = parmed.AngleType(55.0, 104.5)
+    struc.bond_types.append(bondtype)
+    struc.angle_types.append(angletype)
+    struc.bonds.append(parmed.Bond(struc.atoms[0], struc.atoms[1], type=bondtype))
+    struc.bonds.append(parmed.Bond(struc.atoms[0], struc.atoms[2], type=bondtype))
+    struc.angles.append(parmed.Angle(struc.atoms[1], struc.atoms[0], struc.atoms[2],
+                                     type=angletype))
+    mol.ff = mdt.forcefields.ForcefieldParams(mol, struc)
+    mol.set_energy_model(mdt.models.OpenMMPotential, compute_platform='cpu', num_cpus=1)
+    mol.set_integrator(mdt.integrators.OpenMMVerlet, timestep=1.0*u.fs, frame_interval=10.0*u.fs,
+                       constrain_hbonds=False, constrain_water=False)
+    return mol
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_resume_checkpointed_run(water_with_handmade_ff, tmpdir):
+    from moldesign.integrators.openmm import OpenMMBaseIntegrator
+
+    mol = water_with_handmade_ff
+    reference = mol.copy().run(100.0*u.fs)
+
+    chkdir = str(tmpdir.join('checkpoints'))
+    mol.integrator.params.update(checkpoint_directory=chkdir, checkpoint_interval=25.0*u.fs)
+
+    # Crash the run after its second checkpoint
+    write_checkpoint = OpenMMBaseIntegrator._write_checkpoint
+    ncheckpoints = [0]
+
+    def crash_after_two_checkpoints(integrator, *args):
+        write_checkpoint(integrator, *args)
+        ncheckpoints[0] += 1
+        if ncheckpoints[0] == 2:
+            integrator.sim.step(7)  # progress that will be lost
+            raise KeyboardInterrupt()
+
+    mol.integrator._write_checkpoint = lambda *args: crash_after_two_checkpoints(mol.integrator,
+                                                                                 *args)
+    with pytest.raises(KeyboardInterrupt):
+        mol.run(100.0*u.fs)
+
+    traj = mdt.integrators.resume_dynamics(chkdir)
+    assert traj.num_frames == reference.num_frames == 11
+    assert abs(traj.mol.time - 100.0*u.fs) < 1e-6*u.fs
+    np.testing.assert_allclose(traj.time.value_in(u.fs), reference.time.value_in(u.fs))
+    np.testing.assert_allclose(traj.positions.value_in(u.angstrom),
+                               reference.positions.value_in(u.angstrom), atol=1e-5)
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_simulation_updated_in_place(water_with_handmade_ff):
+    from moldesign.models import openmm as mmodel
+
+    mol = water_with_handmade_ff
+    model = mol.energy_model
+    initial_positions = mol.positions.copy()
+    energy = mol.calculate_potential_energy()
+    sim = model.sim
+
+    # switching integrators just reconfigures the existing OpenMM integrator
+    mol.run(10.0*u.fs)
+    assert model.sim is sim
+    mol.set_integrator(mdt.integrators.OpenMMLangevin, timestep=2.0*u.fs,
+                       temperature=300.0*u.kelvin, frame_interval=10.0*u.fs,
+                       constrain_hbonds=False, constrain_water=False)
+    traj = mol.run(20.0*u.fs)
+    assert model.sim is sim
+    assert traj.num_frames == 3
+    assert sim.integrator.getStepSize()._value == 0.002
+    assert sim.integrator.getGlobalVariableByName('kT') > 0.0
+
+    # constraints are applied to the existing context
+    mol.constrain_atom(mol.atoms[0])
+    pos = mol.atoms[0].position.copy()
+    mol.run(20.0*u.fs)
+    assert model.sim is sim
+    np.testing.assert_allclose(mol.atoms[0].position.value_in(u.angstrom),
+                               pos.value_in(u.angstrom), atol=1e-6)
+    mol.clear_constraints()
+    mol.run(20.0*u.fs)
+    assert model.sim is sim
+    assert sim.system.getParticleMass(0)._value > 0.0
+
+    # a new energy model gets its system from the cache
+    ncached = len(mmodel._SYSTEM_XML_CACHE)
+    mol.set_energy_model(mdt.models.OpenMMPotential, compute_platform='cpu', num_cpus=1)
+    mol.positions = initial_positions
+    assert abs(mol.calculate_potential_energy() - energy) < 1e-8 * u.eV
+    assert len(mmodel._SYSTEM_XML_CACHE) == ncached
+    assert mol.energy_model.sim is not sim
+
+
+@pytest.mark.skipif(missing_openmm, reason='OpenMM not installed')
+def test_batch_calculation_matches_single_calculations(water_with_handmade_ff):
+    mol = water_with_handmade_ff
+    rand = np.random.RandomState(1234)
+    conformations = mol.positions + rand.normal(size=(5, 3, 3)) * 0.05 * u.angstrom
+
+    result = mol.energy_model.calculate_batch(conformations)
+    assert result.potential_energy.shape == (5,)
+    assert result.forces.shape == (5, 3, 3)
+
+    for iconf, conformation in enumerate(conformations):
+        mol.positions = conformation
+        mol.calculate()
+        np.testing.assert_allclose(result.potential_energy[iconf].value_in(u.kcalpermol),
+                                   mol.potential_energy.value_in(u.kcalpermol), rtol=1e-6)
+        np.testing.assert_allclose(result.forces[iconf].value_in(u.kcalpermol/u.angstrom),
+                                   mol.forces.value_in(u.kcalpermol/u.angstrom),
+                                   rtol=1e-5, atol=1e-5)
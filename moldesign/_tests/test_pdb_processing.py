@@ -137,6 +137,88 @@ def test_missing_atoms_3b5x():
     assert mol.num_residues == 1144
 
 
+def test_pdb_is_read_in_a_single_pass():
+    with open(get_data_path('1yu8.pdb'), 'r') as pdbfile:
+        lines = (line for line in pdbfile.readlines())  # can't be rewound
+    mol = mdt.fileio.read_pdb(lines)
+    assert mol.num_atoms == 600
+    assert mol.metadata.missing_residues == {'X': {10: 'PRO', 11: 'THR', 12: 'LYS'}}
+
+
+def test_nmr_pdb_reads_first_model_only():
+    mol = mdt.read(get_data_path('5b7a.pdb.bz2'))
+    assert mol.num_atoms == 1551
+    assert mol.metadata.pdb_experimental == 'SOLUTION NMR'
+
+
+def test_pdb_alternate_locations():
+    lines = ['ATOM      1  N   GLY A   1      -1.000   0.000   0.000  1.00  0.00           N',
+             'ATOM      2  CA AGLY A   1       0.000   0.000   0.000  0.60  0.00           C',
+             'ATOM      3  CA BGLY A   1       0.000   0.500   0.000  0.40  0.00           C',
+             'ATOM      4  C   GLY A   1       1.000   0.000   0.000  1.00  0.00           C',
+             'END']
+    mol = mdt.fileio.read_pdb(lines, assign_ccd_bonds=False)
+    assert mol.num_atoms == 3
+    assert [atom.pdbindex for atom in mol.atoms] == [1, 2, 4]
+    assert mol.atoms[1].position[1] == 0.0 * mdt.units.angstrom
+
+
+def test_pdb_deuterium_and_unknown_elements():
+    lines = ['ATOM      1  N   GLY A   1      -1.000   0.000   0.000  1.00  0.00           N',
+             'ATOM      2  D   GLY A   1      -1.500   0.800   0.000  1.00  0.00           D',
+             'HETATM    3  UNK UNX B   2       5.000   0.000   0.000  1.00  0.00           X',
+             'END']
+    mol = mdt.fileio.read_pdb(lines, assign_ccd_bonds=False)
+    assert [atom.atnum for atom in mol.atoms] == [7, 1, 0]
+    assert abs(mol.atoms[1].mass - 2.014*mdt.units.amu) < 0.001 * mdt.units.amu
+    assert mol.atoms[2].mass == 0.0 * mdt.units.amu
+    assert mol.atoms[2].name == 'UNK'
+
+
+def test_pdb_conect_bond_orders_roundtrip():
+    mol = mdt.read(get_data_path('propane.pdb'))
+    mol.atoms[0].bond_graph[mol.atoms[1]] = mol.atoms[1].bond_graph[mol.atoms[0]] = 2
+
+    newmol = mdt.read(mol.write('pdb'), format='pdb')
+    assert newmol.atoms[0].bond_graph[newmol.atoms[1]] == 2
+    assert mol.same_bonds(newmol)
+
+
+def test_mmcif_tokenizer():
+    from moldesign.helpers.pdbreader import _read_cif
+
+    cif = """data_TEST
+# a comment
+_struct.title 'A "quoted" title'
+_struct.pdbx_descriptor
+;Multiple
+lines
+;
+loop_
+_citation_author.name
+_citation_author.ordinal
+'Smith, J.'  1
+"O'Neil, K." 2  # trailing comment
+globally_unique 3
+loop_
+_software.name
+_software.version
+stopwatch globa
+"""
+    data = _read_cif(cif.splitlines(True), {})
+    assert data['_struct.title'] == 'A "quoted" title'
+    assert data['_struct.pdbx_descriptor'] == 'Multiple\nlines'
+    assert data['_citation_author.name'] == ['Smith, J.', "O'Neil, K.", 'globally_unique']
+    assert data['_citation_author.ordinal'] == ['1', '2', '3']
+    assert data['_software.name'] == ['stopwatch']
+    assert data['_software.version'] == ['globa']
+
+
+def test_small_molecule_cif_is_rejected():
+    with pytest.raises(ValueError):
+        mdt.read(get_data_path('ACTG.cif'))
+
+
 MISSINGRES_2JAJ = [('A', 'GLY', -4), ('A', 'PRO', -3), ('A', 'LEU', -2), ('A', 'GLY', -1),
                    ('A', 'MET', 0), ('A', 'ALA', 1), ('A', 'GLY', 2), ('A', 'LEU', 3),
                    ('A', 'GLY', 4), ('A', 'HIS', 5), ('A', 'PRO', 6), ('A', 'ALA', 7),
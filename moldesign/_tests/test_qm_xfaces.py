@@ -136,3 +136,54 @@ def test_aobasis(h2_rhf_sto3g):
         assert isinstance(orb.name, str)
 
 # todo: deal with other shells, cartesian vs. spherical
+
+
+def test_pyscf_batch_matches_single_calculations(h2):
+    h2.set_energy_model(mdt.models.PySCFPotential, basis='sto-3g', theory='rhf')
+    conformations = u.array([h2.positions * scale for scale in (0.9, 0.95, 1.0, 1.05)])
+
+    result = h2.energy_model.calculate_batch(conformations)
+    assert result.potential_energy.shape == (4,)
+    assert result.forces.shape == (4, 2, 3)
+
+    for iconf, conformation in enumerate(conformations):
+        h2.positions = conformation
+        h2.calculate(requests=['forces'])
+        np.testing.assert_allclose(result.potential_energy[iconf].value_in(u.hartree),
+                                   h2.potential_energy.value_in(u.hartree), atol=1e-7)
+        np.testing.assert_allclose(result.forces[iconf].value_in(u.hartree/u.bohr),
+                                   h2.forces.value_in(u.hartree/u.bohr), atol=1e-5)
+
+
+@pytest.mark.internal
+def test_aspc_coefficients():
+    from moldesign.models.pyscf import aspc_coefficients
+
+    np.testing.assert_allclose(aspc_coefficients(1), [1.0])
+    np.testing.assert_allclose(aspc_coefficients(2), [2.0, -1.0])
+    np.testing.assert_allclose(aspc_coefficients(4), [2.8, -2.8, 1.2, -0.2])
+
+    # extrapolates linear series exactly
+    for num in range(2, 6):
+        values = 3.0 - 2.0 * np.arange(num, 0, -1.0)  # most recent first
+        np.testing.assert_allclose(aspc_coefficients(num).dot(values), 3.0 - 2.0 * (num+1))
+
+
+def test_pyscf_extrapolated_guesses_give_same_energies(h2):
+    h2.set_integrator(mdt.integrators.VelocityVerlet, timestep=0.5*u.fs, frame_interval=1)
+    h2.atoms[0].x += 0.1 * u.angstrom
+    start = h2.positions.copy()
+
+    h2.set_energy_model(mdt.models.PySCFPotential, basis='sto-3g', theory='rhf',
+                        guess_extrapolation=4)
+    traj = h2.run(5.0 * u.fs)
+    assert len(h2.energy_model._guess_history) == 4
+
+    h2.positions = start
+    h2.momenta *= 0.0
+    h2.time = 0.0 * u.fs
+    h2.set_energy_model(mdt.models.PySCFPotential, basis='sto-3g', theory='rhf',
+                        store_orb_guesses=False)
+    reference = h2.run(5.0 * u.fs)
+    np.testing.assert_allclose(traj.potential_energy.value_in(u.hartree),
+                               reference.potential_energy.value_in(u.hartree), atol=1e-7)
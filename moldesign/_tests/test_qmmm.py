@@ -100,3 +100,71 @@ def test_mechanical_embedding_wfn(h2_h2_mechanical_embedding_rhf):
     assert abs(h2_qm.potential_energy - qmprops.potential_energy) < 1e-8 * u.hartree
     helpers.assert_almost_equal(h2_qm.wfn.fock_ao, qmprops.wfn.fock_ao)
     assert qmprops.potential_energy + mmprops.potential_energy == mol.potential_energy
+
+
+@pytest.fixture
+def butane_chain_with_handmade_ff():
+    """ Four bonded carbons (no hydrogens) with a minimal force field, so that a QM/MM boundary
+    can be placed across the middle bond
+    """
+    import parmed
+
+    mol = mdt.Molecule([mdt.Atom(name='C%d' % i, atnum=6) for i in range(4)], name='chain')
+    mol.positions = [[0.0, 0.0, 0.0], [1.3, 0.9, 0.0], [2.8, 0.7, 0.3], [3.9, 1.8, 0.1]
+                     ] * u.angstrom
+    for i in range(3):
+        mol.new_bond(mol.atoms[i], mol.atoms[i+1], 1)
+
+    struc = parmed.Structure()
+    for atom in mol.atoms:
+        struc.add_atom(parmed.Atom(name=atom.name, atomic_number=atom.atnum,
+                                   mass=atom.mass.value_in(u.amu), charge=0.0,
+                                   rmin=1.9, epsilon=0.1), 'BUT', 1)
+    bondtype = parmed.BondType(300.0, 1.5)
+    angletype = parmed.AngleType(60.0, 110.0)
+    struc.bond_types.append(bondtype)
+    struc.angle_types.append(angletype)
+    for i in range(3):
+        struc.bonds.append(parmed.Bond(struc.atoms[i], struc.atoms[i+1], type=bondtype))
+    for i in range(2):
+        struc.angles.append(parmed.Angle(struc.atoms[i], struc.atoms[i+1], struc.atoms[i+2],
+                                         type=angletype))
+    mol.ff = mdt.forcefields.ForcefieldParams(mol, struc)
+    mol.set_energy_model(mdt.models.MechanicalEmbeddingQMMM,
+                         qm_atom_indices=[0, 1],
+                         qm_model=mdt.models.HarmonicOscillator(k=2.0*u.eV/u.angstrom**2),
+                         mm_model=mdt.models.OpenMMPotential(compute_platform='cpu', num_cpus=1))
+    return mol
+
+
+def test_link_atom_qmmm_forces_match_energy_gradient(butane_chain_with_handmade_ff):
+    mol = butane_chain_with_handmade_ff
+    mol.calculate()
+    model = mol.energy_model
+
+    # only the bond entirely inside the QM region is turned off in the MM system
+    pmdobj = model.mmmol.ff.parmed_obj
+    assert [b.type.k for b in pmdobj.bonds] == [0.0, 300.0, 300.0]
+    assert len(pmdobj.angles) == 2
+    assert pmdobj.atoms[1] in pmdobj.atoms[0]._exclusion_partners
+
+    assert len(model.qm_link_atoms) == 1
+    linkatom = model.qmmol.atoms[-1]
+    helpers.assert_almost_equal(linkatom.position,
+                                mol.atoms[1].position + mdt.helpers.qmmm.LINKBONDRATIO *
+                                (mol.atoms[2].position - mol.atoms[1].position))
+
+    forces = mol.forces.copy()
+    numerical = -helpers.num_grad(mol, mol.calculate_potential_energy, step=0.001*u.angstrom)
+    helpers.assert_almost_equal(forces, numerical, decimal=4)
+
+
+def test_concurrent_qmmm_matches_serial(butane_chain_with_handmade_ff):
+    mol = butane_chain_with_handmade_ff
+    mol.calculate()
+    energy, forces = mol.potential_energy, mol.forces
+
+    mol.energy_model.params.concurrent = False
+    mol.calculate(use_cache=False)
+    assert mol.potential_energy == energy
+    assert (mol.forces == forces).all()
@@ -123,3 +123,36 @@ def test_split_chains_3p3k():
     assert newmol.chains['C'] is newmol.chains[2]
     assert newmol.chains['C'].type == 'water'
 
+
+
+def _bond_indices(mol):
+    return set(frozenset((bond.a1.index, bond.a2.index)) for bond in mol.bonds)
+
+
+@pytest.mark.parametrize('filename', ['3aid.pdb.gz', '1yu8.pdb'])
+def test_distance_bonds_match_ccd_bonds(filename):
+    ccdmol = mdt.read(get_data_path(filename))
+    mol = mdt.read(get_data_path(filename))
+    for atom in mol.atoms:
+        atom.bond_graph.clear()
+    assert mol.num_bonds == 0
+
+    numbonds = mdt.tools.assign_bonds_by_distance(mol)
+    assert numbonds == ccdmol.num_bonds
+    assert _bond_indices(mol) == _bond_indices(ccdmol)
+
+    assert mdt.tools.assign_bonds_by_distance(mol) == 0  # all bonds already exist
+
+
+def test_distance_bonds_restricted_to_atoms(pdb3aid):
+    residue = pdb3aid.residues[5]
+    expected = _bond_indices(pdb3aid)
+    for atom in residue.atoms:
+        for bond in atom.bonds:
+            pdb3aid.delete_bond(bond)
+
+    mdt.tools.assign_bonds_by_distance(pdb3aid, residue.atoms)
+    missing = expected - _bond_indices(pdb3aid)  # only the peptide bonds to the neighbors
+    assert len(missing) == 2
+    for pair in missing:
+        assert len(pair.intersection(atom.index for atom in residue.atoms)) == 1
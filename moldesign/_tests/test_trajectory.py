@@ -76,6 +76,92 @@ def test_geometry_analysis_precanned(precanned_trajectory):
     assert traj.someletter == list('abc')
 
 
+
+@pytest.fixture
+def random_walk_trajectory():
+    mol = mdt.Molecule([mdt.Atom(6) for i in range(6)])
+    traj = mdt.Trajectory(mol)
+    rand = np.random.RandomState(1234)
+    mol.positions = rand.normal(size=(6, 3)) * u.angstrom
+    for i in range(5):
+        mol.positions += rand.normal(scale=0.3, size=(6, 3)) * u.angstrom
+        traj.new_frame()
+    return traj
+
+
+@pytest.mark.internal
+def test_batch_geometry_matches_single_measurements(random_walk_trajectory):
+    traj = random_walk_trajectory
+    quads = [(0, 1, 2, 3), (5, 4, 3, 2), (1, 3, 5, 0)]
+
+    distances = traj.distances([q[:2] for q in quads])
+    angles = traj.angles([q[:3] for q in quads])
+    dihedrals = traj.dihedrals(quads)
+    assert dihedrals.shape == (traj.num_frames, len(quads))
+
+    for iframe, frame in enumerate(traj.frames):
+        traj.mol.positions = frame.positions
+        atoms = traj.mol.atoms
+        for iquad, (i, j, k, l) in enumerate(quads):
+            np.testing.assert_allclose(
+                    distances[iframe, iquad].value_in(u.angstrom),
+                    mdt.distance(atoms[i], atoms[j]).value_in(u.angstrom))
+            np.testing.assert_allclose(
+                    angles[iframe, iquad].value_in(u.degrees),
+                    mdt.angle(atoms[i], atoms[j], atoms[k]).value_in(u.degrees))
+            np.testing.assert_allclose(
+                    dihedrals[iframe, iquad].value_in(u.degrees),
+                    mdt.dihedral(atoms[i], atoms[j], atoms[k], atoms[l]).value_in(u.degrees))
+
+
+@pytest.mark.internal
+def test_batch_geometry_of_empty_trajectory():
+    traj = mdt.Trajectory(mdt.Molecule([mdt.Atom(6) for i in range(4)]))
+
+    distances = traj.distances([(0, 1), (2, 3)])
+    dihedrals = traj.dihedrals([(0, 1, 2, 3)])
+    assert distances.shape == (0, 2)
+    assert distances.dimensionality == u.angstrom.dimensionality
+    assert dihedrals.shape == (0, 1)
+    assert dihedrals.dimensionality == u.degrees.dimensionality
+
+
+@pytest.mark.internal
+def test_superposed_rmsd(random_walk_trajectory):
+    traj = random_walk_trajectory
+    mol = traj.mol
+    mol.positions = traj.frames[0].positions
+
+    # a rigid rotation and translation of the first frame should superimpose exactly
+    theta = 1.1
+    rotation = np.array([[np.cos(theta), -np.sin(theta), 0.0],
+                         [np.sin(theta), np.cos(theta), 0.0],
+                         [0.0, 0.0, 1.0]])
+    mol.positions = mol.positions.dot(rotation) + [1.0, -2.0, 3.0] * u.angstrom
+    traj.new_frame()
+
+    rmsd = traj.rmsd(superpose=True)
+    plain_rmsd = traj.rmsd()
+    assert abs(rmsd[0]) < 1e-6 * u.angstrom
+    assert abs(rmsd[-1]) < 1e-6 * u.angstrom
+    assert plain_rmsd[-1] > 1.0 * u.angstrom
+    assert (rmsd <= plain_rmsd + 1e-8 * u.angstrom).all()
+
+
+@pytest.mark.internal
+def test_trajectory_selections_use_each_frame(random_walk_trajectory):
+    traj = random_walk_trajectory
+
+    selections = traj.select('within 1.5 of index 0')
+    assert len(selections) == traj.num_frames
+    for frame, indices in zip(traj.frames, selections):
+        distances = np.sqrt(((frame.positions - frame.positions[0])**2).sum(axis=1))
+        assert list(indices) == list(np.nonzero(distances <= 1.5 * u.angstrom)[0])
+
+    for indices in traj.select('index 1 3:5'):
+        assert list(indices) == [1, 3, 4]
+
+
 @pytest.mark.internal
 @pytest.mark.screening
 def test_frame_to_molecule_conversion(precanned_trajectory):
@@ -114,9 +200,124 @@ def test_property_backfill(precanned_trajectory):
     oldnumframes = len(traj)
 
     traj.mol.time += 1.0*u.fs
-    traj.new_frame(somenewthing=5)
+    traj.new_frame(somenewthing=5, somenewletter='z')
+
+    np.testing.assert_array_equal(traj.somenewthing, [np.nan] * oldnumframes + [5])
+    assert traj.somenewletter == [None] * oldnumframes + ['z']
+
+    traj.new_frame()
+    np.testing.assert_array_equal(traj.somenewthing, [np.nan] * oldnumframes + [5, np.nan])
+
+
+@pytest.mark.internal
+def test_frames_are_views(precanned_trajectory):
+    traj = precanned_trajectory
+
+    assert len(traj.frames) == traj.num_frames == 3
+    assert traj.frames[-1] is traj.frames[2]
+    assert traj.frames[1].someletter == 'b'
+    assert [f.somenumber for f in traj.frames[1:]] == [2, 3]
+    np.testing.assert_allclose(traj.frames[1].positions.value_in(u.angstrom),
+                               traj.positions[1].value_in(u.angstrom))
+
+
+@pytest.mark.internal
+def test_preallocated_trajectory_storage():
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(1)])
+    traj = mdt.Trajectory(mol, preallocate=100)
+
+    for i in range(10):
+        mol.atoms[0].x = i * u.angstrom
+        assert traj.new_frame(step=i) == i
+
+    assert traj.positions.shape == (10, 2, 3)
+    assert traj.positions._magnitude._array.shape == (128, 2, 3)
+    np.testing.assert_allclose(traj.positions[:, 0, 0].value_in(u.angstrom), np.arange(10))
+    assert (traj.step == np.arange(10)).all()
+
+
+@pytest.mark.internal
+def test_disk_backed_trajectory(tmpdir):
+    mol = mdt.Molecule([mdt.Atom(6), mdt.Atom(1), mdt.Atom(7)])
+    dirname = str(tmpdir.join('traj'))
+    traj = mdt.Trajectory(mol, directory=dirname)
+
+    for i in range(5):
+        mol.atoms[1].x = i * u.angstrom
+        mol.time = i * u.fs
+        traj.new_frame(step=i, annotation='frame %d' % i)
+    traj.flush()
+
+    assert isinstance(traj.positions._magnitude, mdt.utils.MemmapArray)
+    np.testing.assert_allclose(traj.distance(mol.atoms[0], mol.atoms[1]).value_in(u.angstrom),
+                               np.arange(5))
+
+    reopened = mdt.Trajectory.from_directory(mol, dirname)
+    assert reopened.num_frames == 5
+    assert (reopened.step == np.arange(5)).all()
+    np.testing.assert_allclose(reopened.positions.value_in(u.angstrom),
+                               traj.positions.value_in(u.angstrom))
+    np.testing.assert_allclose(reopened.time.value_in(u.fs), np.arange(5))
+    np.testing.assert_allclose(reopened.rmsd().value_in(u.angstrom),
+                               traj.rmsd().value_in(u.angstrom))
+    assert 'annotation' not in reopened.properties
+    with pytest.raises(IOError):
+        reopened.new_frame()
+
+
+@pytest.mark.internal
+def test_disk_backed_trajectory_saves_partially_recorded_properties(tmpdir):
+    mol = mdt.Molecule([mdt.Atom(6), mdt.Atom(1)])
+    dirname = str(tmpdir.join('traj'))
+    traj = mdt.Trajectory(mol, directory=dirname)
+
+    for i in range(4):
+        props = {}
+        if i < 2:
+            props['early'] = i * u.eV
+        else:
+            props['late'] = float(i)
+            props['laststep'] = i
+        traj.new_frame(**props)
+    traj.flush()
+
+    reopened = mdt.Trajectory.from_directory(mol, dirname)
+    assert set(reopened.properties) >= {'early', 'late', 'laststep'}
+    np.testing.assert_array_equal(reopened.early.value_in(u.eV), [0.0, 1.0, np.nan, np.nan])
+    np.testing.assert_array_equal(reopened.late, [np.nan, np.nan, 2.0, 3.0])
+    np.testing.assert_array_equal(reopened.laststep, [np.nan, np.nan, 2.0, 3.0])
+
+
+@pytest.mark.internal
+def test_trajectory_from_arrays():
+    mol = mdt.Molecule([mdt.Atom(6), mdt.Atom(1)])
+    positions = np.random.random((4, 2, 3)) * u.nm
+    traj = mdt.Trajectory.from_arrays(mol, {'positions': positions,
+                                            'time': np.arange(4.0) * u.ps,
+                                            'annotation': list('abcd')})
+
+    assert traj.num_frames == 4
+    assert traj.positions.units == u.default.length
+    np.testing.assert_allclose(traj.positions.value_in(u.nm), positions.magnitude)
+    np.testing.assert_allclose(traj.frames[2].time.value_in(u.fs), 2000.0)
+    assert traj.annotation == list('abcd')
+
+    traj.new_frame(annotation='e')
+    assert traj.num_frames == 5
+
+    with pytest.raises(ValueError):
+        mdt.Trajectory.from_arrays(mol, {'positions': positions, 'time': np.arange(3.0) * u.ps})
+
+
+@pytest.mark.internal
+def test_copied_trajectory_is_independent(precanned_trajectory):
+    traj = precanned_trajectory
+    newtraj = traj.copy()
+    newtraj.new_frame(somenumber=4)
 
-    assert traj.somenewthing == [None] * oldnumframes + [5]
+    assert newtraj.num_frames == traj.num_frames + 1
+    assert len(traj.somenumber) == traj.num_frames
+    assert newtraj.someletter == list('abc') + [None]
 
 
 @pytest.mark.internal
@@ -0,0 +1,71 @@
+""" Tests for finite-difference hessians and normal mode analysis
+"""
+import pytest
+import numpy as np
+
+import moldesign as mdt
+from moldesign import units as u
+
+
+__PYTEST_MARK__ = 'internal'  # mark all tests in this module with this label (see ./conftest.py)
+
+
+@pytest.fixture
+def harmonic_mol():
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(8), mdt.Atom(6)])
+    mol.positions = np.array([[1.0, 0.5, 0.0], [-0.5, 0.0, 0.2], [0.0, 1.0, -1.0]]) * u.angstrom
+    mol.set_energy_model(mdt.models.HarmonicOscillator, k=2.0*u.eV/u.angstrom**2)
+    return mol
+
+
+@pytest.fixture
+def spring_mol():
+    mol = mdt.Molecule([mdt.Atom(1), mdt.Atom(9)])
+    mol.positions = np.array([[0.0, 0.0, 0.0], [0.6, 0.5, 0.3]]) * u.angstrom
+    mol.set_energy_model(mdt.models.Spring, k=30.0*u.eV/u.angstrom**2,
+                         d0=mol.atoms[0].distance(mol.atoms[1]))
+    return mol
+
+
+def test_hessian_of_harmonic_oscillator(harmonic_mol):
+    hess = mdt.hessian(harmonic_mol)
+    assert hess.shape == (9, 9)
+
+    expected = np.zeros((9, 9))
+    expected[[0, 3, 6], [0, 3, 6]] = 2.0
+    np.testing.assert_allclose(hess.value_in(u.eV/u.angstrom**2), expected, atol=1e-8)
+
+
+def test_parallel_hessian_matches_serial(harmonic_mol):
+    serial = mdt.hessian(harmonic_mol)
+    parallel = mdt.hessian(harmonic_mol, num_processes=2)
+    np.testing.assert_allclose(parallel.value_in(u.eV/u.angstrom**2),
+                               serial.value_in(u.eV/u.angstrom**2), atol=1e-12)
+
+
+def test_diatomic_normal_mode(spring_mol):
+    modes = mdt.normal_modes(spring_mol)
+    assert len(modes) == 1  # 3N - 5 for a linear molecule
+    assert modes.num_imaginary == 0
+
+    m1, m2 = spring_mol.masses
+    omega = np.sqrt(spring_mol.energy_model.params.k * (m1 + m2) / (m1 * m2))
+    expected = (omega / (2.0 * np.pi * u.c)).value_in(1.0/u.ureg.centimeter)
+    np.testing.assert_allclose(modes.frequencies[0].value_in(1.0/u.ureg.centimeter), expected,
+                               rtol=1e-4)
+    np.testing.assert_allclose(modes.reduced_masses[0].value_in(u.amu),
+                               (m1 * m2 * (m1 + m2) / (m1**2 + m2**2)).value_in(u.amu),
+                               rtol=1e-4)
+
+    # the mode stretches the bond
+    bond = spring_mol.positions[1] - spring_mol.positions[0]
+    stretch = modes.modes[0][1] - modes.modes[0][0]
+    cosine = stretch.dot(bond.value_in(u.angstrom)) / (np.linalg.norm(stretch) *
+                                                       bond.norm().value_in(u.angstrom))
+    assert abs(abs(cosine) - 1.0) < 1e-6
+
+
+def test_unprojected_modes_include_translations(spring_mol):
+    modes = mdt.normal_modes(spring_mol, project=False)
+    assert len(modes) == 6
+    assert (abs(modes.frequencies[:5]) < 20.0 / u.ureg.centimeter).all()
@@ -23,7 +23,7 @@ from moldesign import units as u
 
 from . import PACKAGEPATH
 
-__all__ = 'ATOMIC_MASSES ATOMIC_NUMBERS ELEMENTS SYMBOLS'.split()
+__all__ = 'ATOMIC_MASSES ATOMIC_NUMBERS COVALENT_RADII ELEMENTS SYMBOLS'.split()
 
 with open(os.path.join(PACKAGEPATH, '_static_data', 'nist_atomic.yml'), 'r') as ymlfile:
     isotopes = yaml.load(ymlfile)
@@ -42,3 +42,24 @@ for atnum, mass in list(ATOMIC_MASSES.items()):
     ATOMIC_MASSES[ELEMENTS[atnum]] = mass  # index by atnum and symbol
 
 ATOMIC_MASSES[-1] = -1.0*u.amu
+ATOMIC_MASSES[0] = 0.0*u.amu  # dummy atoms (e.g., atoms of unknown elements in PDB files)
+
+
+# Single-bond covalent radii, in angstroms, from B. Cordero et al., Dalton Trans. 2832 (2008).
+# Where several values are given, we use sp3 (for carbon) and low-spin (for Mn, Fe and Co) radii
+COVALENT_RADII = {atnum: r*u.angstrom for atnum, r in enumerate(
+        [0.31, 0.28,  # H, He
+         1.28, 0.96, 0.84, 0.76, 0.71, 0.66, 0.57, 0.58,  # Li - Ne
+         1.66, 1.41, 1.21, 1.11, 1.07, 1.05, 1.02, 1.06,  # Na - Ar
+         2.03, 1.76, 1.70, 1.60, 1.53, 1.39, 1.39, 1.32, 1.26,  # K - Co
+         1.24, 1.32, 1.22, 1.22, 1.20, 1.19, 1.20, 1.20, 1.16,  # Ni - Kr
+         2.20, 1.95, 1.90, 1.75, 1.64, 1.54, 1.47, 1.46, 1.42,  # Rb - Rh
+         1.39, 1.45, 1.44, 1.42, 1.39, 1.39, 1.38, 1.39, 1.40,  # Pd - Xe
+         2.44, 2.15, 2.07, 2.04, 2.03, 2.01, 1.99, 1.98, 1.98, 1.96, 1.94,  # Cs - Tb
+         1.92, 1.92, 1.89, 1.90, 1.87, 1.87, 1.75, 1.70, 1.62, 1.51, 1.44,  # Dy - Os
+         1.41, 1.36, 1.36, 1.32, 1.45, 1.46, 1.48, 1.40, 1.50, 1.50,  # Ir - Rn
+         2.60, 2.21, 2.15, 2.06, 2.00, 1.96, 1.90, 1.87, 1.80, 1.69],  # Fr - Cm
+        start=1)}
+
+for atnum, radius in list(COVALENT_RADII.items()):
+    COVALENT_RADII[ELEMENTS[atnum]] = radius  # index by atnum and symbol
@@ -32,6 +32,9 @@ from .interfaces import biopython_interface
 from .interfaces import openbabel as openbabel_interface
 from .interfaces.parmed_interface import write_pdb, write_mmcif
 from .helpers import pdb
+from .helpers import pdbreader
+from .helpers import bintraj
+from .helpers import cube
 from .external import pathlib
 
 # imported names
@@ -220,28 +223,53 @@ def write(obj, filename=None, format=None):
 
 
 @utils.exports
-def write_trajectory(traj, filename=None, format=None, overwrite=True):
+def write_trajectory(traj, filename=None, format=None, overwrite=True,
+                     precision=bintraj.DEFAULT_PRECISION):
     """ Write trajectory a file (if filename provided) or file-like buffer
 
+    For the compact binary format (``.mdtrj``), only positions and times are written, and frames
+    are streamed to the file without creating intermediate molecule objects.
+
     Args:
         traj (moldesign.molecules.Trajectory): trajectory to write
         filename (str): name of file (return a file-like object if not passed)
         format (str): file format (guessed from filename if None)
         overwrite (bool): overwrite filename if it exists
+        precision (u.Scalar[length]): for binary trajectories only - precision to store
+           coordinates with (if ``None``, store uncompressed 32-bit floats)
 
     Returns:
         StringIO: file-like object (only if filename not passed)
     """
     format, compression, modesuffix = _get_format(filename, format)
 
+    if filename and (not overwrite) and _isfile(filename):
+        raise IOError('%s exists' % filename)
+
     # If user is requesting a pickle, just dump the whole thing now and return
     if format.lower() in PICKLE_EXTENSIONS:
         write(traj, filename=filename, format=format)
+        return
+
+    elif format.lower() in BINARY_TRAJECTORY_EXTENSIONS:
+        if not filename:
+            fileobj = io.BytesIO()
+        else:
+            fileobj = COMPRESSION[compression](filename, 'w' + modesuffix)
+        writer = bintraj.BinaryTrajectoryWriter(fileobj, traj.mol.num_atoms,
+                                                precision=precision)
+
+        positions = traj.positions
+        times = traj.time if 'time' in traj.properties else None
+        if hasattr(positions, 'units'):
+            # convert units once, then stream raw arrays straight from the trajectory's storage
+            scale = mdt.units.angstrom.value_of(1.0 * positions.units)
+            positions = (row * scale for row in positions.magnitude)
+        for i, pos in enumerate(positions):
+            writer.write_frame(pos, None if times is None else times[i])
 
     # for traditional molecular file formats, write the frames one after another
     else:
-        if filename and (not overwrite) and _isfile(filename):
-            raise IOError('%s exists' % filename)
         if not filename:
             fileobj = io.StringIO()
         else:
@@ -250,43 +278,140 @@ def write_trajectory(traj, filename=None, format=None, overwrite=True):
         for frame in traj.frames:
             fileobj.write(frame.write(format=format))
 
-        if filename is None:
-            fileobj.seek(0)
-            return fileobj
+    if filename is None:
+        fileobj.seek(0)
+        return fileobj
+    else:
+        fileobj.close()
+
+
+@utils.exports
+def read_trajectory(f, format=None):
+    """ Iterate over the frames stored in a binary trajectory file
+
+    Frames are read one at a time, so this can be used for trajectories that are too large to
+    hold in memory.
+
+    Args:
+        f (filename or file-like): file to read
+        format (str): file format (guessed from filename if None)
+
+    Yields:
+        utils.DotDict: each frame's ``positions`` and ``time``
+
+    Raises:
+        ValueError: if the format is not a binary trajectory format
+    """
+    if isinstance(f, (str, pathlib.Path)):
+        format, compression, modesuffix = _get_format(str(f), format)
+        fileobj = COMPRESSION[compression](str(f), 'r' + modesuffix)
+        close_handle = True
+    else:
+        fileobj = f
+        close_handle = False
+
+    try:
+        if format is not None and format.lower() not in BINARY_TRAJECTORY_EXTENSIONS:
+            raise ValueError('Cannot stream trajectories in "%s" format' % format)
+        for frame in bintraj.iter_binary_trajectory(fileobj):
+            yield frame
+    finally:
+        if close_handle:
+            fileobj.close()
+
+
+@utils.exports
+def write_cube(obj, filename=None, grid=None, npoints=80, padding=4.0*mdt.units.angstrom,
+               num_processes=1):
+    """ Write orbital amplitudes or an electron density to a Gaussian cube file
+
+    The grid is evaluated and written one plane at a time, so even very large grids never need to
+    be held in memory.
+
+    Args:
+        obj (moldesign.orbitals.Orbital or List[Orbital] or moldesign.orbitals.ElectronicWfn):
+           an orbital or list of orbitals (such as ``mol.wfn.orbitals.canonical``) to write
+           amplitudes for, or a wavefunction to write the electron density of
+        filename (str or file-like): path or text buffer to write to (if not passed, the file
+           is returned as a string)
+        grid (moldesign.mathutils.VolumetricGrid): grid to evaluate on (default: a grid of
+           ``npoints**3`` points extending ``padding`` past the atoms in each direction)
+        npoints (int): number of points in each dimension of the default grid
+        padding (Scalar[length]): how far the default grid extends past the atoms
+        num_processes (int): number of processes to evaluate the grid with
+           (if 0, use all available CPUs)
+
+    Returns:
+        str: if filename is None, the contents of the cube file
+    """
+    if isinstance(obj, mdt.orbitals.ElectronicWfn):
+        wfn = obj
+        function = cube.DensityValues(wfn)
+        orbital_indices = None
+        comment = 'Electron density (%s)' % wfn.description
+    else:
+        if isinstance(obj, mdt.orbitals.Orbital):
+            orbitals = [obj]
         else:
+            orbitals = list(obj)
+        wfn = orbitals[0].wfn
+        function = cube.OrbitalValues(orbitals)
+        orbital_indices = function.indices
+        comment = 'Orbital amplitudes: %s' % ', '.join(str(orb.name) for orb in orbitals)
+
+    positions = wfn.positions
+    if grid is None:
+        grid = mdt.mathutils.padded_grid(positions, padding, npoints=npoints)
+
+    if filename is None:
+        fileobj = io.StringIO()
+    elif hasattr(filename, 'write'):
+        fileobj = filename
+    else:
+        fileobj = open(str(filename), 'w')
+
+    try:
+        cube.write_cube(fileobj, wfn.mol.atoms, positions, grid,
+                        cube.iter_grid_values(function, grid, num_processes=num_processes),
+                        comment=comment, orbital_indices=orbital_indices)
+    finally:
+        if fileobj is not filename and filename is not None:
             fileobj.close()
 
+    if filename is None:
+        return fileobj.getvalue()
+
 
-def read_pdb(f, assign_ccd_bonds=True):
+def read_pdb(f, assign_ccd_bonds=True, assign_distance_bonds=True):
     """ Read a PDB file and return a molecule.
 
-    This uses ParmEd's parser to get the molecular structure, with additional functionality
-    to assign Chemical Component Dictionary bonds, detect missing residues, and find
-    biomolecular assembly information.
+    The file is read in a single pass by MDT's native parser, which also extracts missing
+    residues and biomolecular assembly information. Bonds are created from CONECT records, the
+    PDB Chemical Component Dictionary, and (for anything left over) interatomic distances.
 
     Note:
         Users won't typically use this routine; instead, they'll use ``moldesign.read``, which will
         delegate to this routine when appropriate.
 
     Args:
-        f (filelike): filelike object giving access to the PDB file (must implement readline+seek)
+        f (filelike): filelike object giving access to the PDB file (must be iterable over lines)
         assign_ccd_bonds (bool): Use the PDB Chemical Component Dictionary (CCD) to create bond
             topology (note that bonds from CONECT records will always be created as well)
+        assign_distance_bonds (bool): Assign bonds based on interatomic distances to any residues
+            that don't have any bonds after reading CONECT records and the CCD (see
+            :meth:`moldesign.tools.assign_bonds_by_distance`)
 
     Returns:
         moldesign.Molecule: the parsed molecule
     """
-    assemblies = pdb.get_pdb_assemblies(f)
-    f.seek(0)
-    mol = mdt.interfaces.parmed_interface.read_pdb(f)
+    mol, assemblies = pdbreader.read_pdb_structure(f)
     mol.properties.bioassemblies = assemblies
 
-    f.seek(0)
-    mol.metadata.missing_residues = mdt.helpers.get_pdb_missing_residues(f)
-
     # Assign bonds from residue templates
     if assign_ccd_bonds:
         pdb.assign_biopolymer_bonds(mol)
+    if assign_distance_bonds:
+        pdb.assign_missing_bonds_by_distance(mol)
 
     if assemblies:
         pdb.warn_assemblies(mol, assemblies)
@@ -294,24 +419,31 @@ def read_pdb(f, assign_ccd_bonds=True):
     return mol
 
 
-def read_mmcif(f):
+def read_mmcif(f, assign_distance_bonds=True):
     """ Read an mmCIF file and return a molecule.
 
-    This uses OpenBabel's basic structure parser along with biopython's mmCIF bioassembly parser
+    The file is read in a single pass by MDT's native parser. Bonds are created from the PDB
+    Chemical Component Dictionary and (for anything left over) interatomic distances.
 
     Note:
         Users won't typically use this routine; instead, they'll use ``moldesign.read``, which will
         delegate to this routine when appropriate.
 
     Args:
-        f (filelike): file-like object that accesses the mmCIF file (must implement seek)
+        f (filelike): file-like object that accesses the mmCIF file (must be iterable over lines)
+        assign_distance_bonds (bool): Assign bonds based on interatomic distances to any residues
+            that don't have any bonds from the CCD (see
+            :meth:`moldesign.tools.assign_bonds_by_distance`)
 
     Returns:
         moldesign.Molecule: the parsed molecular structure
     """
-    mol = mdt.interfaces.parmed_interface.read_mmcif(f)
-    f.seek(0)
-    assemblies = biopython_interface.get_mmcif_assemblies(f)
+    mol, mmcdata = pdbreader.read_mmcif_structure(f)
+    pdb.assign_biopolymer_bonds(mol)
+    if assign_distance_bonds:
+        pdb.assign_missing_bonds_by_distance(mol)
+
+    assemblies = biopython_interface.get_mmcif_assemblies(mmcdata=mmcdata)
     if assemblies:
         pdb.warn_assemblies(mol, assemblies)
     mol.properties.bioassemblies = assemblies
@@ -455,7 +587,7 @@ def _get_format(filename, format):
         if format is None:
             format = suffix
 
-    if format in PICKLE_EXTENSIONS:
+    if format in PICKLE_EXTENSIONS or format in BINARY_TRAJECTORY_EXTENSIONS:
         mode = 'b'
     elif (compressor == 'bz2' and not PY2) or compressor == 'gz':
         mode = 't'
@@ -480,7 +612,8 @@ READERS = {'pdb': read_pdb,
 
 WRITERS = {'pdb': write_pdb,
            'mmcif': write_mmcif,
-           'xyz': write_xyz}
+           'xyz': write_xyz,
+           'cube': write_cube}
 
 
 if PY2:
@@ -489,6 +622,7 @@ else:
     bzopener = bz2.open
 
 PICKLE_EXTENSIONS = set("p pkl pickle mdt".split())
+BINARY_TRAJECTORY_EXTENSIONS = set(["mdtrj"])
 COMPRESSION = {'gz': gzip.open,
                'gzip': gzip.open,
                'bz2': bzopener,
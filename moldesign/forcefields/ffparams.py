@@ -58,7 +58,8 @@ class ForcefieldParams(object):
         This function can be removed once parmed 0.7.4 is released - AMV 5.19.17
         """
         self.__dict__.update(state)
-        self.parmed_obj.initialize_topology()
+        if hasattr(self.parmed_obj, 'initialize_topology'):  # removed in later ParmEd versions
+            self.parmed_obj.initialize_topology()
 
     def get_atom_terms(self, atom):
         return AtomTerms(atom, self.parmed_obj.atoms[atom.index])
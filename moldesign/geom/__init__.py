@@ -4,6 +4,7 @@ def toplevel(o):
 __all__ = []
 
 from .coords import *
+from .batch import *
 from .grads import *
 from .setcoord import *
 from .constraints import *
@@ -11,3 +12,4 @@ from .symmetry import *
 from .monitor import *
 from .shake import *
 from .alignment import *
+from .neighbors import *
@@ -0,0 +1,167 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Vectorized versions of the measurements in :mod:`moldesign.geom.coords`.
+
+These work on position arrays rather than atoms, and calculate many measurements at once
+(for one set of coordinates of shape ``(num_atoms, 3)``, or for a whole stack of frames with
+shape ``(num_frames, num_atoms, 3)``) without any python-level loops.
+"""
+import numpy as np
+
+from .. import units as u
+
+from . import toplevel
+
+
+@toplevel
+def batch_distances(positions, pairs):
+    """ Distances between many pairs of atoms
+
+    Args:
+        positions (u.Array[length]): coordinates with shape ``(num_atoms, 3)`` or
+            ``(num_frames, num_atoms, 3)``
+        pairs (List[Tuple[int or mdt.Atom]]): ``(a1, a2)`` pairs of atoms (or atom indices)
+
+    Returns:
+        u.Array[length]: distances with shape ``(num_pairs,)`` or ``(num_frames, num_pairs)``
+    """
+    pos, units = _strip_units(positions)
+    idx = _index_array(pairs, 2)
+    r12 = pos[..., idx[:, 0], :] - pos[..., idx[:, 1], :]
+    dist = np.sqrt((r12*r12).sum(axis=-1))
+    return dist if units is None else dist * units
+
+
+@toplevel
+def batch_angles(positions, triples):
+    """ Angles between bonds a2-a1 and a2-a3 for many triples of atoms
+
+    Args:
+        positions (u.Array[length]): coordinates with shape ``(num_atoms, 3)`` or
+            ``(num_frames, num_atoms, 3)``
+        triples (List[Tuple[int or mdt.Atom]]): ``(a1, a2, a3)`` triples of atoms (or atom indices)
+
+    Returns:
+        u.Array[angle]: angles with shape ``(num_triples,)`` or ``(num_frames, num_triples)``
+    """
+    pos, _ = _strip_units(positions)
+    idx = _index_array(triples, 3)
+    r21 = _unit_vectors(pos[..., idx[:, 0], :] - pos[..., idx[:, 1], :])
+    r23 = _unit_vectors(pos[..., idx[:, 2], :] - pos[..., idx[:, 1], :])
+    costheta = np.clip((r21*r23).sum(axis=-1), -1.0, 1.0)
+    return np.arccos(costheta) * u.radians
+
+
+@toplevel
+def batch_dihedrals(positions, quads):
+    """ Twist angles of bonds a1-a2 and a4-a3 around the central bond a2-a3 for many sets of atoms
+
+    Uses the same conventions as :meth:`moldesign.geom.dihedral`.
+
+    Args:
+        positions (u.Array[length]): coordinates with shape ``(num_atoms, 3)`` or
+            ``(num_frames, num_atoms, 3)``
+        quads (List[Tuple[int or mdt.Atom]]): ``(a1, a2, a3, a4)`` sets of atoms (or atom indices)
+
+    Returns:
+        u.Array[angle]: angles in [0, 2 pi) with shape ``(num_quads,)`` or
+           ``(num_frames, num_quads)``
+    """
+    pos, _ = _strip_units(positions)
+    idx = _index_array(quads, 4)
+    p1, p2, p3, p4 = (pos[..., idx[:, i], :] for i in range(4))
+
+    plane_normal = _unit_vectors(p2 - p3)
+    r21 = p1 - p2
+    r34 = p4 - p3
+    va = _unit_vectors(r21 - plane_normal * (r21*plane_normal).sum(axis=-1)[..., None])
+    vb = _unit_vectors(r34 - plane_normal * (r34*plane_normal).sum(axis=-1)[..., None])
+
+    costheta = (va*vb).sum(axis=-1)
+    sintheta = (np.cross(va, vb)*plane_normal).sum(axis=-1)
+    theta = np.arctan2(sintheta, costheta) % (2.0*np.pi)
+    return theta * u.radians
+
+
+@toplevel
+def batch_rmsd(positions, reference, superpose=False):
+    r""" Root-mean-square deviation between each set of positions and a reference structure
+
+    Args:
+        positions (u.Array[length]): coordinates with shape ``(num_atoms, 3)`` or
+            ``(num_frames, num_atoms, 3)``
+        reference (u.Array[length]): reference coordinates, with shape ``(num_atoms, 3)``
+        superpose (bool): if True, calculate the RMSD after optimally superimposing each frame
+            onto the reference (i.e., after removing translations and rotations), using the
+            Kabsch algorithm
+
+    Returns:
+        u.Scalar[length] or u.Vector[length]: RMSD for each frame
+    """
+    pos, units = _strip_units(positions)
+    if units is None:
+        ref = np.asarray(reference)
+    else:
+        ref = units.value_of(reference)
+    natoms = ref.shape[0]
+
+    if superpose:
+        pos = pos - pos.mean(axis=-2)[..., None, :]
+        ref = ref - ref.mean(axis=0)
+
+        # The optimal rotation's residual can be calculated directly from the singular values of
+        # the 3x3 covariance matrix. The sign of its determinant determines whether the optimal
+        # orthogonal transformation would be an improper rotation (i.e., a reflection)
+        covariance = np.einsum('...ij,ik->...jk', pos, ref)
+        singular_values = np.linalg.svd(covariance, compute_uv=False)
+        reflect = np.where(np.linalg.det(covariance) < 0.0, -1.0, 1.0)
+        singular_values[..., 2] *= reflect
+
+        e0 = (pos*pos).sum(axis=(-2, -1)) + (ref*ref).sum()
+        msd = np.maximum(e0 - 2.0*singular_values.sum(axis=-1), 0.0) / natoms
+    else:
+        diff = pos - ref
+        msd = (diff*diff).sum(axis=(-2, -1)) / natoms
+
+    rmsd = np.sqrt(msd)
+    return rmsd if units is None else rmsd * units
+
+
+def _strip_units(positions):
+    if hasattr(positions, 'units'):
+        return np.asarray(positions.magnitude, dtype='float64'), positions.units
+    else:
+        return np.asarray(positions, dtype='float64'), None
+
+
+def _index_array(tuples, width):
+    """ Convert a list of atom tuples (or an array of atom indices) into an integer array
+    """
+    if isinstance(tuples, np.ndarray) and tuples.dtype.kind in 'iu':
+        idx = tuples
+    else:
+        idx = np.array([[getattr(atom, 'index', atom) for atom in t] for t in tuples],
+                       dtype='int64')
+    return idx.reshape((-1, width))
+
+
+def _unit_vectors(vecs):
+    norms = np.sqrt((vecs*vecs).sum(axis=-1))[..., None]
+    norms[norms == 0.0] = 1.0
+    return vecs / norms
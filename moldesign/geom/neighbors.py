@@ -0,0 +1,153 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import itertools
+
+import numpy as np
+
+from .. import utils
+
+
+@utils.exports
+class NeighborIndex(object):
+    """ A spatial index (k-d tree) over a set of positions, for finding neighbors without
+    calculating every pairwise distance.
+
+    Molecules keep one of these (see :attr:`moldesign.Molecule.neighbor_index`) that is rebuilt
+    whenever their atoms move.
+
+    Args:
+        positions (np.ndarray): Nx3 array of positions (without units; queries must use the same
+           units)
+    """
+    def __init__(self, positions):
+        from scipy.spatial import cKDTree
+
+        self.positions = np.array(positions, dtype='float64')
+        self.tree = cKDTree(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getstate__(self):  # k-d trees aren't always pickleable; they're rebuilt on demand
+        return {'positions': self.positions}
+
+    def __setstate__(self, state):
+        self.__init__(state['positions'])
+
+    def matches(self, positions):
+        """ Returns True if this index is still valid for the passed positions
+
+        Args:
+            positions (np.ndarray): Nx3 array of positions
+
+        Returns:
+            bool: True if the positions are the same ones that this index was built for
+        """
+        return np.array_equal(positions, self.positions)
+
+    def within(self, points, radius):
+        """ Find the indexed positions within a given distance of ANY of the query points
+
+        Args:
+            points (np.ndarray): Mx3 array of query points
+            radius (float): search radius
+
+        Returns:
+            np.ndarray: sorted indices of the positions within ``radius`` of any query point
+        """
+        points = np.asarray(points, dtype='float64').reshape((-1, 3))
+        neighbor_lists = self.tree.query_ball_point(points, radius)
+        return np.unique(np.fromiter(itertools.chain.from_iterable(neighbor_lists),
+                                     dtype='int64'))
+
+    def min_distance(self, points, mask=None):
+        """ Find the smallest distance between any query point and any indexed position
+
+        Args:
+            points (np.ndarray): Mx3 array of query points
+            mask (np.ndarray): boolean array; only consider the indexed positions where this is
+               True (default: consider all positions)
+
+        Returns:
+            float: the smallest distance (``inf`` if there are no points or positions to compare)
+        """
+        points = np.asarray(points, dtype='float64').reshape((-1, 3))
+        if mask is None:
+            if len(self) == 0 or len(points) == 0:
+                return np.inf
+            return self.tree.query(points, k=1)[0].min()
+
+        # Search progressively more neighbors of each point until either a position in the mask
+        # is found, or the neighbors are already further away than the closest match so far
+        best = np.inf
+        pending = np.arange(len(points))
+        k = 8
+        while len(pending) > 0 and mask.any():
+            k = min(k, len(self))
+            distances, neighbors = self.tree.query(points[pending], k=k)
+            distances = distances.reshape((len(pending), k))
+            valid = mask[neighbors.reshape((len(pending), k))]
+            if valid.any():
+                best = min(best, distances[valid].min())
+            if k == len(self):
+                break
+            pending = pending[~valid.any(axis=1) & (distances[:, -1] < best)]
+            k *= 2
+        return best
+
+    def point_contacts(self, points, radius, lookup=None, num_columns=None):
+        """ Find the indexed positions within a given distance of each query point
+
+        Args:
+            points (np.ndarray): Mx3 array of query points
+            radius (float): contact distance
+            lookup (np.ndarray): maps each indexed position to a column of the result, or to -1 to
+               ignore it (default: column ``i`` is indexed position ``i``)
+            num_columns (int): number of columns in the result (required if ``lookup`` is passed)
+
+        Returns:
+            scipy.sparse.csr_matrix: boolean contact map of shape ``(M, num_columns)``
+        """
+        import scipy.sparse
+
+        points = np.asarray(points, dtype='float64').reshape((-1, 3))
+        neighbor_lists = self.tree.query_ball_point(points, radius)
+        rows = np.repeat(np.arange(len(points)), [len(n) for n in neighbor_lists])
+        cols = np.fromiter(itertools.chain.from_iterable(neighbor_lists),
+                           dtype='int64', count=len(rows))
+        if lookup is None:
+            num_columns = len(self)
+        else:
+            cols = lookup[cols]
+            rows, cols = rows[cols >= 0], cols[cols >= 0]
+        return scipy.sparse.csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)),
+                                       shape=(len(points), num_columns))
+
+    def pairs(self, radius):
+        """ Find all pairs of indexed positions within a given distance of each other
+
+        Args:
+            radius (float): search radius
+
+        Returns:
+            np.ndarray: array of shape ``(num_pairs, 2)``; each row contains the indices
+               ``i < j`` of a pair of positions
+        """
+        pairs = self.tree.query_pairs(radius, output_type='ndarray')
+        return pairs.reshape((-1, 2)).astype('int64')
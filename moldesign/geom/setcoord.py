@@ -148,32 +148,19 @@ def _get_fragment(mol, a1, a2):
 
     This won't work if a1 and a2 are in a cycle.
     """
-    # DFS for a1's side of the bond. To prevent visiting a2, we mark it as visited at the start
-    visited = set([a2])
-    def dfs_dive(atom):
-        visited.add(atom)
-        for nbr in atom.bond_graph:
-            if nbr is a2 and atom is not a1:
-                raise ValueError("a1 and a2 are in a cyclic moiety")
-            if nbr not in visited:
-                dfs_dive(nbr)
-    dfs_dive(a1)
-    visited.remove(a2)
-    result = moldesign.molecules.atomcollections.AtomList(visited)
-    return result
+    indices = mol.bond_graph.topology.fragment(a1.index, a2.index)
+    return moldesign.molecules.atomcollections.AtomList(mol.atoms[i] for i in indices)
 
 
 def _get_fragment_indices(mol, a1, a2):
-    key = (mol, a1, a2)
-    if key in _get_fragment_indices.cache:
-        return _get_fragment_indices.cache[key]
-
-    # Try to get the smaller fragment ... a bit hacky right now
-    try: frag1 = _get_fragment(mol, a1, a2)
+    # Try to get the smaller fragment. These are cached by the topology object, which is
+    # discarded whenever the molecule's bonds change
+    topology = mol.bond_graph.topology
+    try: frag1 = topology.fragment(a1.index, a2.index)
     except ValueError:
         frag1 = None
 
-    try: frag2 = _get_fragment(mol, a2, a1)
+    try: frag2 = topology.fragment(a2.index, a1.index)
     except ValueError:
         if frag1 is None: raise
         else:
@@ -187,9 +174,4 @@ def _get_fragment_indices(mol, a1, a2):
             frag = frag1
             sign = 1.0
 
-    indices = [atom.index for atom in frag]
-    result = np.array(indices)
-    _get_fragment_indices.cache[key] = (result, sign)
-    return result, sign
-
-_get_fragment_indices.cache = {}
+    return frag, sign
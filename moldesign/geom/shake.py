@@ -18,7 +18,6 @@ standard_library.install_aliases()
 # limitations under the License.
 import numpy as np
 import moldesign as mdt
-from moldesign import units as u
 
 # TODO: create dynamics wrapper that uses timestep to explicitly calculate constraint forces
 
@@ -50,17 +49,16 @@ def shake_positions(mol, prev_positions, max_cycles=100, use_masses=True, constr
     # A: (num_constr, num_constr)
     # multipliers: (num_constr, )
     # delta: (3N,)
-    curr = mol.positions.copy()
-    prev = prev_positions.copy()
-    mol.positions = prev
+    curr = mol.positions_raw.copy()
+    mol.positions = prev_positions
     prevgrad = np.array([_clean_grad_array(c.gradient()) for c in constraints])
-    mol.positions = curr
+    mol.positions_raw = curr
 
     if use_masses:
-        dim_masses = mol.dim_masses
+        dim_masses = mol.dim_masses.defunits_value()
     else:
-        dim_masses = np.ones((mol.num_atoms, 3)) * u.default.mass
-    flat_masses = dim_masses.defunits_value().flatten()
+        dim_masses = np.ones((mol.num_atoms, 3))
+    flat_masses = dim_masses.flatten()
 
     for i in range(max_cycles):
         for c in mol.constraints:
@@ -77,11 +75,9 @@ def shake_positions(mol, prev_positions, max_cycles=100, use_masses=True, constr
         A = np.dot(currgrad/flat_masses, prevgrad.T)
         multipliers = np.linalg.solve(A, values)
 
-        # reapply units and adjust positions
-        delta = multipliers.dot(prevgrad).reshape(mol.num_atoms, 3) * (
-            u.default.mass * u.default.length)
-
-        mol.positions -= delta/dim_masses
+        # adjust positions (delta has units of mass*length in the default unit system)
+        delta = multipliers.dot(prevgrad).reshape(mol.num_atoms, 3)
+        mol.positions_raw -= delta/dim_masses
 
     else:
         raise mdt.ConvergenceFailure('SHAKE did not converge after %d iterations'%
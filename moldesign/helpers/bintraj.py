@@ -0,0 +1,176 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Streaming reader and writer for MDT's compact binary trajectory format (``.mdtrj``)
+
+The format stores positions (and times) only, and is written and read one frame at a time.
+Positions can either be stored as raw 32-bit floats, or (by default) lossily compressed
+in the same spirit as the XTC format: coordinates are rounded to a fixed precision, stored
+as differences between consecutive atoms in the smallest integer type that fits them, and then
+zlib-compressed.
+
+Layout (all values little-endian):
+  - header: 8-byte magic string, number of atoms (uint32), precision in angstroms
+    (float64, 0 for uncompressed float32 data)
+  - for each frame: time in fs (float64, NaN if unknown), encoding (uint8), number of
+    payload bytes (uint32), followed by the payload
+"""
+import struct
+import zlib
+
+import numpy as np
+
+from .. import units as u
+from .. import utils
+
+MAGIC = b'MDTRJ\x00\x01\x00'
+HEADER = struct.Struct('<Id')
+FRAMEHEADER = struct.Struct('<dBI')
+
+DEFAULT_PRECISION = 0.001 * u.angstrom
+
+RAW_FLOAT32 = 0
+INT_ENCODINGS = {1: np.dtype('<i1'),
+                 2: np.dtype('<i2'),
+                 3: np.dtype('<i4')}
+
+
+class BinaryTrajectoryWriter(object):
+    """ Writes frames to an MDT binary trajectory file one at a time
+
+    Args:
+        fileobj (file-like): binary stream to write to
+        num_atoms (int): number of atoms in each frame
+        precision (u.Scalar[length]): coordinates will be rounded to this precision and compressed
+            (if ``None``, they will be stored as uncompressed 32-bit floats instead)
+
+    Example:
+        >>> with open('traj.mdtrj', 'wb') as outfile:
+        >>>     writer = BinaryTrajectoryWriter(outfile, mol.num_atoms)
+        >>>     for i in range(100):
+        >>>         mol.run(10)
+        >>>         writer.write_frame(mol.positions, mol.time)
+    """
+    def __init__(self, fileobj, num_atoms, precision=DEFAULT_PRECISION):
+        self.fileobj = fileobj
+        self.num_atoms = num_atoms
+        if precision is None:
+            self.precision = 0.0
+        else:
+            self.precision = u.angstrom.value_of(precision)
+            if self.precision <= 0.0:
+                raise ValueError('Precision must be positive')
+        self.num_frames = 0
+
+        self.fileobj.write(MAGIC)
+        self.fileobj.write(HEADER.pack(self.num_atoms, self.precision))
+
+    def write_frame(self, positions, time=None):
+        """ Append a frame to the file
+
+        Args:
+            positions (u.Array[length] or np.ndarray): Nx3 array of positions (in angstroms if
+               not a quantity)
+            time (u.Scalar[time]): time of this frame (optional)
+        """
+        if hasattr(positions, 'units'):
+            positions = positions.value_in(u.angstrom)
+        positions = np.asarray(positions, dtype='float64')
+        if positions.shape != (self.num_atoms, 3):
+            raise ValueError('Expected positions with shape (%d, 3), got %s' %
+                             (self.num_atoms, positions.shape))
+
+        if time is None:
+            time = np.nan
+        else:
+            time = u.fs.value_of(time)
+
+        if self.precision:
+            encoding, payload = _encode_fixed_precision(positions, self.precision)
+        else:
+            encoding, payload = RAW_FLOAT32, positions.astype('<f4').tobytes()
+
+        self.fileobj.write(FRAMEHEADER.pack(time, encoding, len(payload)))
+        self.fileobj.write(payload)
+        self.num_frames += 1
+
+
+def iter_binary_trajectory(fileobj):
+    """ Iterate through the frames of an MDT binary trajectory file
+
+    Only one frame is held in memory at a time.
+
+    Args:
+        fileobj (file-like): binary stream to read from
+
+    Yields:
+        utils.DotDict: frame with ``positions`` (u.Array[length]) and ``time`` (u.Scalar[time])
+           values (``time`` is ``None`` if it wasn't recorded)
+
+    Raises:
+        IOError: if the file isn't an MDT binary trajectory, or is truncated
+    """
+    magic = fileobj.read(len(MAGIC))
+    if magic != MAGIC:
+        raise IOError('Not an MDT binary trajectory file')
+    num_atoms, precision = HEADER.unpack(_read_exactly(fileobj, HEADER.size))
+
+    while True:
+        framehead = fileobj.read(FRAMEHEADER.size)
+        if not framehead:
+            return
+        elif len(framehead) < FRAMEHEADER.size:
+            raise IOError('Trajectory file is truncated')
+        time, encoding, nbytes = FRAMEHEADER.unpack(framehead)
+        payload = _read_exactly(fileobj, nbytes)
+
+        if encoding == RAW_FLOAT32:
+            positions = np.frombuffer(payload, dtype='<f4').astype('float64')
+        else:
+            positions = _decode_fixed_precision(encoding, payload, precision)
+
+        yield utils.DotDict(positions=positions.reshape((num_atoms, 3)) * u.angstrom,
+                            time=None if np.isnan(time) else time * u.fs)
+
+
+def _encode_fixed_precision(positions, precision):
+    ipos = np.round(positions / precision).astype('int64')
+    deltas = ipos.copy()
+    deltas[1:] -= ipos[:-1]
+
+    maxdelta = np.abs(deltas).max() if deltas.size else 0
+    for encoding, dtype in sorted(INT_ENCODINGS.items()):
+        if maxdelta <= np.iinfo(dtype).max:
+            break
+    else:
+        raise ValueError('Coordinates are too large to store with precision %s angstrom'
+                         % precision)
+    return encoding, zlib.compress(deltas.astype(dtype).tobytes())
+
+
+def _decode_fixed_precision(encoding, payload, precision):
+    deltas = np.frombuffer(zlib.decompress(payload), dtype=INT_ENCODINGS[encoding])
+    ipos = deltas.reshape((-1, 3)).astype('int64').cumsum(axis=0)
+    return ipos * precision
+
+
+def _read_exactly(fileobj, nbytes):
+    data = fileobj.read(nbytes)
+    if len(data) != nbytes:
+        raise IOError('Trajectory file is truncated')
+    return data
@@ -0,0 +1,162 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Streaming writer for Gaussian cube files
+
+Volumetric data is evaluated one slab of grid planes at a time (optionally in a pool of worker
+processes) and written as soon as it's available, so that the full grid never needs to be in
+memory.
+
+All quantities in the file are in atomic units (bohr for lengths, bohr^-3/2 for orbital
+amplitudes, and bohr^-3 for densities).
+"""
+import multiprocessing
+
+import numpy as np
+
+from .. import units as u
+
+VALUES_PER_LINE = 6
+
+
+class OrbitalValues(object):
+    """ Evaluates the amplitudes of one or more orbitals (in bohr^-3/2) at a list of points
+
+    Args:
+        orbitals (List[moldesign.orbitals.Orbital]): orbitals (all in the same basis)
+    """
+    def __init__(self, orbitals):
+        self.basis = orbitals[0].basis
+        self.coeffs = np.array([orb.coeffs for orb in orbitals])
+        self.indices = [orb.index if orb.index is not None else i
+                        for i, orb in enumerate(orbitals)]
+
+    def __call__(self, points):
+        return self.basis(points, coeffs=self.coeffs).value_in(u.a0**-1.5)
+
+
+class DensityValues(object):
+    """ Evaluates a wavefunction's electron density (in bohr^-3) at a list of points
+
+    The AO density matrix is diagonalized once, so that the density at each point can be
+    calculated from the amplitudes of just its eigenvectors with non-zero eigenvalues.
+
+    Args:
+        wfn (moldesign.orbitals.ElectronicWfn): wavefunction
+    """
+    def __init__(self, wfn):
+        if wfn.density_matrix_ao is None:
+            raise ValueError('%s has no density matrix' % wfn)
+        self.basis = wfn.aobasis
+        weights, vectors = np.linalg.eigh(np.asarray(wfn.density_matrix_ao))
+        keep = np.abs(weights) > 1.0e-10 * np.abs(weights).max()
+        self.weights = weights[keep]
+        self.coeffs = vectors[:, keep].T
+
+    def __call__(self, points):
+        amplitudes = self.basis(points, coeffs=self.coeffs).value_in(u.a0**-1.5)
+        return (amplitudes**2).dot(self.weights)[:, None]
+
+
+def iter_grid_values(function, grid, num_processes=1):
+    """ Evaluate a function on a grid, one x-plane at a time
+
+    Args:
+        function (callable): picklable function that takes an array of points and returns an
+            array of shape ``(num_points, num_values)``
+        grid (moldesign.mathutils.VolumetricGrid): grid to evaluate it on
+        num_processes (int): number of worker processes (if 0, use all available CPUs)
+
+    Yields:
+        np.ndarray: values for the points in each x-plane, in ``grid.allpoints()`` order
+    """
+    if num_processes == 0:
+        num_processes = multiprocessing.cpu_count()
+    num_processes = min(num_processes, grid.xpoints)
+
+    if num_processes <= 1:
+        for points in grid.iter_slabs():
+            yield function(points)
+    else:
+        pool = multiprocessing.Pool(num_processes, initializer=_init_worker,
+                                    initargs=(function, grid))
+        try:
+            for values in pool.imap(_evaluate_plane, range(grid.xpoints)):
+                yield values
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+_worker_state = {}
+
+
+def _init_worker(function, grid):
+    _worker_state['function'] = function
+    _worker_state['grid'] = grid
+
+
+def _evaluate_plane(iplane):
+    return _worker_state['function'](_worker_state['grid'].slab(iplane))
+
+
+def write_cube(fileobj, atoms, positions, grid, planes, comment='', orbital_indices=None):
+    """ Write a cube file
+
+    Args:
+        fileobj (file-like): text stream to write to
+        atoms (List[moldesign.Atom]): the atoms to list in the file
+        positions (Matrix[length]): their positions
+        grid (moldesign.mathutils.VolumetricGrid): grid that the data was evaluated on
+        planes (Iterable[np.ndarray]): the values in each x-plane of the grid (see
+            :func:`iter_grid_values`), each with shape ``(ypoints*zpoints, num_values)``
+        comment (str): description of the data (written in the file's second line)
+        orbital_indices (List[int]): for orbitals, the (0-based) index of each orbital
+           (or ``None`` for any other type of data)
+    """
+    natoms = len(atoms)
+    if orbital_indices is not None:
+        natoms = -natoms  # cube file convention to indicate orbital data
+
+    fileobj.write(u'Generated by the Molecular Design Toolkit\n')
+    fileobj.write(u'%s\n' % comment.replace('\n', ' '))
+    fileobj.write(u'%5d%12.6f%12.6f%12.6f\n' % ((natoms,) + tuple(grid.origin.value_in(u.a0))))
+    for idim, (npoints, delta) in enumerate(zip(grid.points, grid.deltas.value_in(u.a0))):
+        axis = [0.0, 0.0, 0.0]
+        axis[idim] = delta
+        fileobj.write(u'%5d%12.6f%12.6f%12.6f\n' % ((npoints,) + tuple(axis)))
+    for atom, position in zip(atoms, positions.value_in(u.a0)):
+        fileobj.write(u'%5d%12.6f%12.6f%12.6f%12.6f\n' % ((atom.atnum, float(atom.atnum)) +
+                                                         tuple(position)))
+    if orbital_indices is not None:
+        _write_rows(fileobj, [len(orbital_indices)] + [i + 1 for i in orbital_indices],
+                    u'%5d')
+
+    # each (x,y) pair starts a new line, listing all values for every z-point
+    for values in planes:
+        for row in np.asarray(values).reshape(grid.ypoints, -1):
+            _write_rows(fileobj, row, u'%13.5E')
+
+
+def _write_rows(fileobj, values, fmt):
+    numfull = len(values) // VALUES_PER_LINE * VALUES_PER_LINE
+    if numfull:
+        fileobj.write((fmt * VALUES_PER_LINE + u'\n') * (numfull // VALUES_PER_LINE)
+                      % tuple(values[:numfull]))
+    if numfull < len(values):
+        fileobj.write(fmt * (len(values) - numfull) % tuple(values[numfull:]) + u'\n')
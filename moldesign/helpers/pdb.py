@@ -263,7 +263,31 @@ def assign_biopolymer_bonds(mol):
         except KeyError:
             if residue.type not in ('ion', 'water'):
                 print(('WARNING: failed to assign bonds for %s; use '
-                      '``residue.assign_distance.bonds`` to guess the topology') % str(residue))
+                      '``mdt.tools.assign_bonds_by_distance`` to guess the topology')
+                      % str(residue))
+
+
+def assign_missing_bonds_by_distance(mol):
+    """ Use interatomic distances to assign bonds to any residues that have no internal bonds
+
+    These are typically residues that aren't in the chemical component dictionary, and weren't
+    described by CONECT records. Single-atom residues (e.g., ions) are ignored.
+
+    Returns:
+        int: the number of bonds created
+    """
+    atoms = [atom for residue in mol.residues
+             if residue.num_atoms > 1 and not _has_internal_bonds(residue)
+             for atom in residue]
+    return mdt.tools.assign_bonds_by_distance(mol, atoms)
+
+
+def _has_internal_bonds(residue):
+    for atom in residue:
+        for nbr in atom.bond_graph:
+            if nbr.residue is residue:
+                return True
+    return False
 
 
 def assign_unique_hydrogen_names(mol):
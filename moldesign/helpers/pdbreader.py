@@ -0,0 +1,529 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Native, single-pass readers for PDB and mmCIF files.
+
+These build MDT atoms, residues and chains directly as the file is read, without creating
+an intermediate structure object (e.g., from ParmEd or biopython) or reading the file more
+than once. Only the first model in the file is read, and only the first of any set of
+alternate locations for an atom is kept.
+"""
+import collections
+import re
+
+import numpy as np
+
+import moldesign as mdt
+from .. import units as u
+from .. import utils
+from . import pdb
+
+
+def read_pdb_structure(fileobj):
+    """ Parse the structure, metadata and bioassemblies from a PDB file in a single pass
+
+    Args:
+        fileobj (file-like): iterable over the lines of the PDB file
+
+    Returns:
+        Tuple[moldesign.Molecule, Mapping[str, BioAssembly]]: the molecule (including
+           bonds from CONECT records, and missing residues in ``metadata.missing_residues``),
+           and its biomolecular assemblies
+    """
+    builder = _StructureBuilder()
+    serials = {}
+    conect_lines = []
+    remark_lines = {'350': [], '465': []}
+    titles, authors, experimental = [], [], []
+    doi = box = None
+    model_finished = False
+
+    for line in fileobj:
+        record = line[:6]
+        if record == 'ATOM  ' or record == 'HETATM':
+            if model_finished:
+                continue
+            serial = _pdb_int(line[6:11], len(serials) + 1)
+            atnum, mass = _pdb_element(line[76:78], line[12:16])
+            atom = builder.add_atom(name=line[12:16].strip(),
+                                    atnum=atnum,
+                                    mass=mass,
+                                    pdbindex=serial,
+                                    altloc=line[16].strip(),
+                                    resname=line[17:21].strip(),
+                                    resnum=_pdb_int(line[22:26], None),
+                                    icode=line[26].strip(),
+                                    chain=line[21].strip(),
+                                    xyz=(line[30:38], line[38:46], line[46:54]))
+            if atom is not None:
+                serials[serial] = atom
+        elif record == 'ENDMDL':
+            model_finished = builder.num_atoms > 0
+        elif record == 'CONECT':
+            conect_lines.append(line)
+        elif record == 'REMARK':
+            remarks = remark_lines.get(line[7:10], None)
+            if remarks is not None:
+                remarks.append(line)
+        elif record == 'JRNL  ':
+            field = line[12:16]
+            if field == 'TITL':
+                titles.append(line[19:].strip())
+            elif field == 'AUTH':
+                authors.append(line[19:].strip())
+            elif field == 'DOI ':
+                doi = line[19:].strip()
+        elif record == 'EXPDTA':
+            experimental.append(line[10:].strip())
+        elif record == 'CRYST1':
+            box = _box_vectors(*[float(line[i:i+width])
+                                 for i, width in ((6, 9), (15, 9), (24, 9),
+                                                  (33, 7), (40, 7), (47, 7))])
+
+    metadata = _make_metadata(' '.join(titles), ''.join(authors), ' '.join(experimental),
+                              box, doi)
+    mol = builder.build(metadata)
+
+    for a1, a2, order in _conect_bonds(conect_lines, serials):
+        a1.bond_to(a2, order)
+
+    # these are short, so we use the (iterator-based) parsers from moldesign.helpers.pdb on them
+    end = ['REMARK 999\n'] * 2
+    assemblies = pdb.get_pdb_assemblies(iter(remark_lines['350'] + end))
+    mol.metadata.missing_residues = pdb.get_pdb_missing_residues(iter(remark_lines['465'] + end))
+    return mol, assemblies
+
+
+def read_mmcif_structure(fileobj):
+    """ Parse the structure and all other data from an mmCIF file in a single pass
+
+    Chains are named using their ``label_asym_id`` (i.e., the mmCIF standard), unless the file
+    doesn't have ``_pdbx_poly_seq_scheme`` data, in which case the author's chain names are used.
+
+    Args:
+        fileobj (file-like): iterable over the lines of the mmCIF file
+
+    Returns:
+        Tuple[moldesign.Molecule, dict]: the molecule, and all other data items in the file's
+           first data block (in the same format as ``Bio.PDB.MMCIF2Dict``)
+
+    Raises:
+        ValueError: if the file doesn't contain any ``_atom_site`` records
+    """
+    builder = _StructureBuilder()
+    data = _read_cif(fileobj, {'_atom_site': builder.mmcif_row_reader,
+                               '_atom_site_anisotrop': None})
+
+    if builder.num_atoms == 0:
+        raise ValueError('No atoms found in mmCIF data (note that small-molecule CIF files '
+                         'are not supported)')
+    if '_pdbx_poly_seq_scheme.asym_id' not in data:
+        builder.use_author_chains()
+
+    authors = _aslist(data.get('_citation_author.name', []))
+    metadata = _make_metadata(title='; '.join(_aslist(data.get('_citation.title', []))),
+                              authors=', '.join(collections.OrderedDict.fromkeys(authors)),
+                              experimental=data.get('_exptl.method', ''),
+                              box=_cif_box(data),
+                              doi=', '.join(doi for doi in
+                                            _aslist(data.get('_citation.pdbx_database_id_DOI',
+                                                             []))
+                                            if doi != '?'))
+    return builder.build(metadata), data
+
+
+class _StructureBuilder(object):
+    """ Collects atoms, residues and chains as they are read from a file
+    """
+    def __init__(self):
+        self.atoms = []
+        self.positions = []
+        self.chains = collections.OrderedDict()
+        self._residue = None
+        self._residuekey = None
+        self._altlocs = set()
+        self._mmcif_model = None
+
+    @property
+    def num_atoms(self):
+        return len(self.atoms)
+
+    def add_atom(self, name, atnum, mass, pdbindex, altloc, resname, resnum, icode, chain, xyz,
+                 authchain=None):
+        """ Create a new atom (and its residue and chain, if necessary)
+
+        Returns:
+            moldesign.Atom: the new atom (or None, if this is an alternate location for an atom
+               we've already created)
+        """
+        residuekey = (resname, resnum, icode, chain, authchain)
+        if altloc:
+            atomkey = (name, residuekey)
+            if atomkey in self._altlocs:
+                return None
+            self._altlocs.add(atomkey)
+
+        if residuekey != self._residuekey:
+            if chain not in self.chains:
+                self.chains[chain] = _ChainRecord(chain)
+            self._residue = self.chains[chain].new_residue(resname, resnum, authchain)
+            self._residuekey = residuekey
+
+        atom = mdt.Atom(name=name, atnum=atnum, mass=mass, pdbindex=pdbindex)
+        atom.residue = self._residue
+        self._residue.add(atom)
+        self.atoms.append(atom)
+        self.positions.append(xyz)
+        return atom
+
+    def mmcif_row_reader(self, tags):
+        """ Returns a function that adds the atom described by each row of an ``_atom_site`` loop
+        """
+        columns = {tag.split('.', 1)[1]: i for i, tag in enumerate(tags)}
+
+        def col(*names):
+            for name in names:
+                if name in columns:
+                    return columns[name]
+            return None
+
+        (iserial, ielem, iname, ialtloc, iresname, iresnum,
+         iicode, ichain, iauthchain, ix, iy, iz, imodel) = (
+            col('id'), col('type_symbol'), col('auth_atom_id', 'label_atom_id'),
+            col('label_alt_id'), col('auth_comp_id', 'label_comp_id'),
+            col('auth_seq_id', 'label_seq_id'), col('pdbx_PDB_ins_code'),
+            col('label_asym_id', 'auth_asym_id'), col('auth_asym_id', 'label_asym_id'),
+            col('Cartn_x'), col('Cartn_y'), col('Cartn_z'), col('pdbx_PDB_model_num'))
+
+        def add_row(row):
+            if imodel is not None:
+                if self._mmcif_model is None:
+                    self._mmcif_model = row[imodel]
+                elif row[imodel] != self._mmcif_model:
+                    return
+            name = row[iname]
+            altloc = row[ialtloc] if ialtloc is not None else ''
+            icode = row[iicode] if iicode is not None else ''
+            atnum, mass = _cif_element(row[ielem], name)
+            self.add_atom(name=name,
+                          atnum=atnum,
+                          mass=mass,
+                          pdbindex=int(row[iserial]),
+                          altloc='' if altloc in '.?' else altloc,
+                          resname=row[iresname],
+                          resnum=int(row[iresnum]),
+                          icode='' if icode in '.?' else icode,
+                          chain=row[ichain],
+                          authchain=row[iauthchain],
+                          xyz=(row[ix], row[iy], row[iz]))
+        return add_row
+
+    def use_author_chains(self):
+        """ Regroup residues into chains using their author-assigned chain names
+        """
+        residues = [record for chain in self.chains.values() for record in chain.residues]
+        self.chains = collections.OrderedDict()
+        for residue, authchain in residues:
+            if authchain not in self.chains:
+                self.chains[authchain] = _ChainRecord(authchain)
+            self.chains[authchain].residues.append((residue, authchain))
+
+    def build(self, metadata):
+        for chainrecord in self.chains.values():
+            chain = mdt.Chain(pdbname=chainrecord.name)
+            for residue, authchain in chainrecord.residues:
+                residue.chain = chain
+                chain.add(residue)
+
+        mol = mdt.Molecule(self.atoms, metadata=metadata)
+        if self.positions:
+            mol.positions = np.array(self.positions, dtype='float64') * u.angstrom
+        return mol
+
+
+class _ChainRecord(object):
+    """ A chain's name and its list of (residue, author chain name) pairs
+    """
+    def __init__(self, name):
+        self.name = name
+        self.residues = []
+
+    def new_residue(self, resname, resnum, authchain):
+        residue = mdt.Residue(resname=resname, pdbindex=resnum)
+        self.residues.append((residue, authchain))
+        return residue
+
+
+def _pdb_int(field, default):
+    try:
+        return int(field)
+    except ValueError:
+        return default
+
+
+# hydrogen isotopes that have their own element symbols (e.g., in neutron structures), and their
+# indices in the list of hydrogen isotopes
+_HYDROGEN_ISOTOPES = {'D': 1, 'T': 2}
+
+
+def _pdb_element(element, name):
+    """ Atomic number and mass of an atom, from a PDB atom record's element column or (if that's
+    missing) from the atom name.
+
+    Returns:
+        Tuple[int, u.Scalar[mass]]: the atomic number (0 if the element is unknown) and mass
+           (``None`` to use the element's default mass)
+    """
+    element = element.strip().capitalize()
+    if element in _HYDROGEN_ISOTOPES:
+        isotope = mdt.data.atomic.isotopes[1][_HYDROGEN_ISOTOPES[element]]
+        return 1, isotope['mass'] * u.amu
+    if element in mdt.data.ATOMIC_NUMBERS:
+        return mdt.data.ATOMIC_NUMBERS[element], None
+    elif element == 'X':  # explicitly unknown
+        return 0, None
+
+    # By convention, two-letter element symbols start in the first column of the (4-character)
+    # name field, while one-letter symbols start in the second column
+    symbol = name.strip().lstrip('0123456789')
+    if name[0].isalpha() and len(name.strip()) < 4:
+        if symbol[:2].capitalize() in mdt.data.ATOMIC_NUMBERS:
+            return mdt.data.ATOMIC_NUMBERS[symbol[:2].capitalize()], None
+    return mdt.data.ATOMIC_NUMBERS.get(symbol[:1].upper(), 0), None
+
+
+def _cif_element(element, name):
+    symbol = element.capitalize()
+    if symbol in mdt.data.ATOMIC_NUMBERS or symbol in _HYDROGEN_ISOTOPES or symbol == 'X':
+        return _pdb_element(element, name)
+    else:
+        return _pdb_element('', ' ' + name)
+
+
+def _conect_bonds(conect_lines, serials):
+    """ Get bonds from PDB CONECT records.
+
+    Bonds listed multiple times are assigned the corresponding bond order (this is how
+    :meth:`moldesign.Molecule.write` records bond orders).
+
+    Yields:
+        Tuple[moldesign.Atom, moldesign.Atom, int]: bonded atoms and the bond order
+    """
+    counts = collections.Counter()
+    for line in conect_lines:
+        origin = _pdb_int(line[6:11], None)
+        for istart in range(11, 31, 5):
+            partner = _pdb_int(line[istart:istart+5], None)
+            if partner is not None:
+                counts[origin, partner] += 1
+
+    for (i, j), count in counts.items():
+        if (j, i) in counts and i > j:
+            continue  # already handled
+        if i in serials and j in serials:
+            yield serials[i], serials[j], max(count, counts.get((j, i), 0))
+
+
+def _box_vectors(a, b, c, alpha, beta, gamma):
+    """ Periodic box vectors from unit cell lengths and angles (in degrees)
+    """
+    alpha, beta, gamma = np.deg2rad([alpha, beta, gamma])
+    cx = c * np.cos(beta)
+    cy = c * (np.cos(alpha) - np.cos(beta)*np.cos(gamma)) / np.sin(gamma)
+    vectors = np.array([[a, 0.0, 0.0],
+                        [b*np.cos(gamma), b*np.sin(gamma), 0.0],
+                        [cx, cy, np.sqrt(c*c - cx*cx - cy*cy)]])
+    vectors[np.abs(vectors) < 1e-6] = 0.0
+    return vectors * u.angstrom
+
+
+def _cif_box(data):
+    try:
+        return _box_vectors(*[float(data['_cell.%s' % field])
+                              for field in ('length_a', 'length_b', 'length_c',
+                                            'angle_alpha', 'angle_beta', 'angle_gamma')])
+    except (KeyError, ValueError):
+        return None
+
+
+def _make_metadata(title, authors, experimental, box, doi):
+    metadata = utils.DotDict(description=title)
+    if authors:
+        metadata.pdb_authors = authors
+    if experimental:
+        metadata.pdb_experimental = experimental
+    if box is not None:
+        metadata.pdb_box_vectors = box
+    if doi:
+        metadata.pdb_doi = doi
+        metadata.url = "http://dx.doi.org/%s" % doi
+    return metadata
+
+
+def _aslist(l):
+    if isinstance(l, list):
+        return l
+    else:
+        return [l]
+
+
+class _CifText(str):
+    """ A quoted or multi-line CIF value (which can never be a tag or keyword)
+    """
+
+
+_CIF_TOKEN = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
+
+
+def _tokenize_cif(fileobj):
+    """ Yields the tokens in a CIF file; quoted and multi-line values are returned as _CifText
+    """
+    textfield = None
+    for line in fileobj:
+        if textfield is not None:  # we're inside a multi-line text field
+            if line[:1] == ';':
+                yield _CifText('\n'.join(textfield))
+                textfield = None
+                line = line[1:]
+            else:
+                textfield.append(line.rstrip('\r\n'))
+                continue
+        elif line[:1] == ';':
+            textfield = [line[1:].rstrip('\r\n')]
+            continue
+
+        if "'" not in line and '"' not in line and '#' not in line:  # fast path (most lines)
+            for token in line.split():
+                yield token
+        else:
+            for single, double, bare in _CIF_TOKEN.findall(line):
+                if bare:
+                    if bare[0] == '#':  # comment
+                        break
+                    yield bare
+                else:
+                    yield _CifText(single or double)
+
+
+def _read_cif(fileobj, loop_readers):
+    """ Read the first data block of a CIF file
+
+    Args:
+        fileobj (file-like): iterable over the lines of the file
+        loop_readers (Mapping[str, callable]): maps category names (e.g., ``'_atom_site'``) to
+           functions that will process that category's loop row by row instead of storing it.
+           Each function is called with the list of the loop's tags, and returns a callback that
+           is called with each row. Loops that map to ``None`` are skipped.
+
+    Returns:
+        dict: all other data items (loops are stored as lists of values)
+    """
+    data = {}
+    tag = None
+    loop = None
+    seen_block = False
+
+    for token in _tokenize_cif(fileobj):
+        if tag is not None:  # the value for a tag
+            data[tag] = str(token)
+            tag = None
+            continue
+
+        keyword = type(token) is str and (token[0] == '_' or _is_cif_keyword(token))
+
+        if loop is not None:
+            if not keyword:
+                loop.add_value(token)
+                continue
+            elif token[0] == '_' and not loop.values_started:
+                loop.tags.append(token)
+                continue
+            else:
+                data.update(loop.finish())
+                loop = None
+
+        if not keyword:  # a stray value - ignore it
+            continue
+        elif token[0] == '_':
+            tag = token
+        elif token.lower() == 'loop_':
+            loop = _CifLoop(loop_readers)
+        elif token[:5].lower() == 'data_':
+            if seen_block:
+                break
+            seen_block = True
+
+    if loop is not None:
+        data.update(loop.finish())
+    return data
+
+
+_CIF_KEYWORDS = set(('loop_', 'global_', 'stop_'))
+_CIF_BLOCK_PREFIXES = ('data_', 'save_')
+
+
+def _is_cif_keyword(token):
+    """ Whether a bare (unquoted) token is a reserved CIF word, rather than a value
+    """
+    token = token.lower()
+    return token in _CIF_KEYWORDS or token.startswith(_CIF_BLOCK_PREFIXES)
+
+
+class _CifLoop(object):
+    """ Collects (or dispatches) the values of a loop as they're read from a CIF file
+    """
+    def __init__(self, loop_readers):
+        self.tags = []
+        self.values_started = False
+        self._loop_readers = loop_readers
+        self._row = []
+        self._columns = None
+        self._reader = None
+
+    def add_value(self, token):
+        if not self.values_started:
+            self.values_started = True
+            category = self.tags[0].split('.')[0]
+            if category in self._loop_readers:
+                reader = self._loop_readers[category]
+                self._reader = reader(self.tags) if reader is not None else _skip_row
+            else:
+                self._columns = [[] for tag in self.tags]
+
+        if self._reader is not None:
+            self._row.append(token)
+            if len(self._row) == len(self.tags):
+                self._reader(self._row)
+                self._row = []
+        else:
+            self._columns[len(self._row)].append(str(token))
+            self._row.append(None)
+            if len(self._row) == len(self.tags):
+                self._row = []
+
+    def finish(self):
+        """ Returns:
+            dict: mapping from each tag to its list of values (empty if the loop was dispatched)
+        """
+        if self._columns is None:
+            return {}
+        return dict(zip(self.tags, self._columns))
+
+
+def _skip_row(row):
+    pass
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import numpy as np
+
 import moldesign as mdt
 
 LINKBONDRATIO = 0.709  # fixed ratio of C-C to C-H bond length for link atoms
@@ -90,3 +92,36 @@ def set_link_atom_positions(linkatoms):
         dist = LINKBONDRATIO * nbr.distance(proxy)
         atom.position = (nbr.position +
                          dist * mdt.mathutils.normalized(proxy.position - nbr.position))
+
+
+def link_atom_positions(positions, qm_indices, mm_indices):
+    """ Calculate the positions of a set of link atoms at once (see
+    :func:`set_link_atom_positions`)
+
+    Args:
+        positions (np.ndarray): positions of all atoms in the molecule
+        qm_indices (np.ndarray[int]): index of the QM atom bonded to each link atom
+        mm_indices (np.ndarray[int]): index of the MM atom replaced by each link atom
+
+    Returns:
+        np.ndarray: link atom positions (in the same units as ``positions``)
+    """
+    qmpositions = positions[qm_indices]
+    return qmpositions + LINKBONDRATIO * (positions[mm_indices] - qmpositions)
+
+
+def distribute_link_atom_forces(forces, linkforces, qm_indices, mm_indices):
+    """ Apply the forces on link atoms to the real atoms that determine their positions
+    (in place).
+
+    Because each link atom is placed at ``r_qm + LINKBONDRATIO * (r_mm - r_qm)``, the chain rule
+    gives the QM atom ``1 - LINKBONDRATIO`` of its force, and the MM atom the rest.
+
+    Args:
+        forces (np.ndarray): forces on all atoms in the molecule (modified in place)
+        linkforces (np.ndarray): forces on each link atom
+        qm_indices (np.ndarray[int]): index of the QM atom bonded to each link atom
+        mm_indices (np.ndarray[int]): index of the MM atom replaced by each link atom
+    """
+    np.add.at(forces, qm_indices, (1.0 - LINKBONDRATIO) * linkforces)
+    np.add.at(forces, mm_indices, LINKBONDRATIO * linkforces)
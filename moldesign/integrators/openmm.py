@@ -16,20 +16,48 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+import os
+import pickle
+
 import pyccc
 import pyccc.exceptions
 
+import moldesign as mdt
 from .. import exceptions
+from .. import parameters
+from .. import units as u
 from ..compute import packages
-from ..interfaces.openmm import MdtReporter, pint2simtk, OpenMMPickleMixin
+from ..interfaces import openmm as opm
+from ..interfaces.openmm import MdtReporter, BufferedReporter, OpenMMPickleMixin
 from ..utils import exports
 
 
 from .base import IntegratorBase, LangevinBase
 
 
+record_fields = parameters.Parameter(
+        'record_fields',
+        'Fields to record, mapped to the time (or number of steps) between records. '
+        'Fields are "positions", "velocities", "forces" and "energies". If set, data is '
+        'buffered during the run and the trajectory is only created at the end. '
+        '(default: record everything at every frame_interval)',
+        default=None, type=dict)
+
+checkpoint_parameters = [
+    parameters.Parameter(
+            'checkpoint_directory',
+            'Run in chunks, writing a checkpoint to this directory after each one, so that the '
+            'run can be resumed with moldesign.integrators.resume_dynamics',
+            default=None, type=str),
+    parameters.Parameter(
+            'checkpoint_interval', 'Time between checkpoints',
+            default=100.0*u.ps, type=u.default.time)]
+
+
 class OpenMMBaseIntegrator(IntegratorBase, OpenMMPickleMixin):
     _openmm_compatible = True
+    PARAMETERS = IntegratorBase.PARAMETERS + [record_fields] + checkpoint_parameters
 
     def prep(self):
         if not self.mol.energy_model._openmm_compatible:
@@ -62,6 +90,11 @@ class OpenMMBaseIntegrator(IntegratorBase, OpenMMPickleMixin):
         nsteps = self.time_to_steps(run_for, self.params.timestep)
         self.energy_model._set_openmm_state()
 
+        if self.params.get('checkpoint_directory', None):
+            return self._run_checkpointed(nsteps)
+        elif self.params.get('record_fields', None):
+            return self._run_buffered(nsteps)
+
         self.reporter = self._attach_reporters()
         self.reporter.annotation = self._describe_dynamics()
         self.reporter.report_from_mol()
@@ -71,16 +104,131 @@ class OpenMMBaseIntegrator(IntegratorBase, OpenMMPickleMixin):
         self.energy_model._sync_to_openmm()
         if self.reporter.last_report_time != self.mol.time:
             self.reporter.report_from_mol()
+        self.reporter.trajectory.flush()
         return self.reporter.trajectory
 
-    def _attach_reporters(self):
+    def _run_buffered(self, nsteps):
+        """ Run dynamics, recording only the fields in ``params.record_fields``
+        """
+        intervals = {field: self.time_to_steps(interval, self.params.timestep)
+                     for field, interval in self.params.record_fields.items()}
+        self.reporter = BufferedReporter(self.mol, intervals,
+                                         directory=self.params.get('trajectory_directory', None))
+        self.reporter.annotation = self._describe_dynamics()
+        self.sim.reporters = [self.reporter]
+        self.reporter.report_all(self.sim)
+
+        self.sim.step(nsteps)  # this is the actual dynamics loop
+
+        self.energy_model._sync_to_openmm()
+        self.reporter.report_all(self.sim)
+        traj = self.reporter.build_trajectory()
+        traj.flush()
+        return traj
+
+    # Files written to the checkpoint directory
+    MOLFILE = 'molecule.pkl'  # the molecule, energy model and integrator (written once)
+    SYSTEMFILE = 'system.xml'  # the OpenMM system (written once)
+    CHECKPOINTFILE = 'openmm.chk'  # OpenMM checkpoint (written after each chunk)
+    STATEFILE = 'state.json'  # progress of the run (written after each chunk)
+
+    def _run_checkpointed(self, nsteps):
+        """ Run dynamics in chunks of ``params.checkpoint_interval``, writing a checkpoint after
+        each one. The trajectory is streamed to disk as it's generated.
+        """
+        from simtk import openmm
+
+        if self.params.get('record_fields', None):
+            raise exceptions.NotSupportedError("Checkpointed runs can't use 'record_fields'")
+
+        directory = self.params.checkpoint_directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        trajdir = self.params.get('trajectory_directory', None)
+        if trajdir is None:
+            trajdir = os.path.join(directory, 'trajectory')
+
+        with open(os.path.join(directory, self.MOLFILE), 'wb') as molfile:
+            pickle.dump(self.mol, molfile, protocol=2)
+        with open(os.path.join(directory, self.SYSTEMFILE), 'w') as systemfile:
+            systemfile.write(openmm.XmlSerializer.serialize(self.energy_model.mm_system))
+
+        self.reporter = self._attach_reporters(directory=trajdir)
+        self.reporter.annotation = self._describe_dynamics()
+        self.reporter.report_from_mol()
+
+        runstate = {'start_step': self.sim.currentStep,
+                    'nsteps': nsteps,
+                    'steps_done': 0,
+                    'trajectory_directory': os.path.abspath(trajdir)}
+        return self._run_chunks(directory, runstate)
+
+    def _resume(self, directory):
+        """ Continue a checkpointed run (see :func:`resume_dynamics`)
+        """
+        from simtk import openmm
+
+        with open(os.path.join(directory, self.STATEFILE), 'r') as statefile:
+            runstate = json.load(statefile)
+        with open(os.path.join(directory, self.SYSTEMFILE), 'r') as systemfile:
+            mm_system = openmm.XmlSerializer.deserialize(systemfile.read())
+
+        # the system already has its constraints, so it isn't rebuilt from the force field
+        self.mol.energy_model.prep(mm_system=mm_system)
+        self.sim.loadCheckpoint(os.path.join(directory, self.CHECKPOINTFILE))
+        self.sim.currentStep = runstate['start_step'] + runstate['steps_done']
+        self.energy_model._sync_to_openmm()
+
+        trajdir = runstate['trajectory_directory']
+        self.reporter = self._attach_reporters(directory=trajdir)
+        self.reporter.trajectory = mdt.Trajectory.from_directory(self.mol, trajdir, mode='r+',
+                                                                 num_frames=runstate['num_frames'])
+        self.reporter.annotation = self._describe_dynamics()
+        if self.reporter.trajectory.num_frames > 0:
+            self.reporter.last_report_time = self.reporter.trajectory.time[-1]
+        return self._run_chunks(directory, runstate)
+
+    def _run_chunks(self, directory, runstate):
+        chunksize = max(1, self.time_to_steps(self.params.checkpoint_interval,
+                                              self.params.timestep))
+        while runstate['steps_done'] < runstate['nsteps']:
+            steps = min(chunksize, runstate['nsteps'] - runstate['steps_done'])
+            self.sim.step(steps)
+            runstate['steps_done'] += steps
+            self._write_checkpoint(directory, runstate)
+
+        self.energy_model._sync_to_openmm()
+        if self.reporter.last_report_time != self.mol.time:
+            self.reporter.report_from_mol()
+        self.reporter.trajectory.flush()
+        return self.reporter.trajectory
+
+    def _write_checkpoint(self, directory, runstate):
+        """ Write the OpenMM checkpoint, then the run's progress. Each file is written to a
+        temporary file first, so a crash can't leave an incomplete checkpoint behind.
+        """
+        self.reporter.trajectory.flush()
+        runstate['num_frames'] = self.reporter.trajectory.num_frames
+
+        chkpath = os.path.join(directory, self.CHECKPOINTFILE)
+        self.sim.saveCheckpoint(chkpath + '.tmp')
+        os.rename(chkpath + '.tmp', chkpath)
+
+        statepath = os.path.join(directory, self.STATEFILE)
+        with open(statepath + '.tmp', 'w') as statefile:
+            json.dump(runstate, statefile)
+        os.rename(statepath + '.tmp', statepath)
+
+    def _attach_reporters(self, directory=None):
         """
         Make sure the simulation has reporters for this run
         :return:
         """
         report_interval = self.time_to_steps(self.params.frame_interval,
                                              self.params.timestep)
-        reporter = MdtReporter(self.mol, report_interval)
+        if directory is None:
+            directory = self.params.get('trajectory_directory', None)
+        reporter = MdtReporter(self.mol, report_interval, directory=directory)
         self.sim.reporters = [reporter]
         return reporter
 
@@ -91,27 +239,55 @@ class OpenMMBaseIntegrator(IntegratorBase, OpenMMPickleMixin):
 @exports
 class OpenMMVerlet(OpenMMBaseIntegrator):
     def get_openmm_integrator(self):
-        from simtk import openmm
-        integrator = openmm.VerletIntegrator(pint2simtk(self.params.timestep))
+        integrator = opm.make_reconfigurable_integrator()
+        self.configure_openmm_integrator(integrator)
         return integrator
 
+    def configure_openmm_integrator(self, integrator):
+        """ Set up an integrator (created by
+        :func:`moldesign.interfaces.openmm.make_reconfigurable_integrator`) to run these dynamics
+        """
+        opm.configure_integrator(integrator, self.params.timestep)
+
     def _describe_dynamics(self):
         return 'Constant energy dynamics'
 
 
 @exports
 class OpenMMLangevin(LangevinBase, OpenMMBaseIntegrator):
-    def get_openmm_integrator(self):
-        from simtk import openmm
+    PARAMETERS = LangevinBase.PARAMETERS + [record_fields] + checkpoint_parameters
 
-        integrator = openmm.LangevinIntegrator(
-            pint2simtk(self.params.temperature),
-            pint2simtk(self.params.collision_rate),
-            pint2simtk(self.params.timestep))
+    def get_openmm_integrator(self):
+        integrator = opm.make_reconfigurable_integrator()
+        self.configure_openmm_integrator(integrator)
         return integrator
 
+    def configure_openmm_integrator(self, integrator):
+        """ Set up an integrator (created by
+        :func:`moldesign.interfaces.openmm.make_reconfigurable_integrator`) to run these dynamics
+        """
+        opm.configure_integrator(integrator, self.params.timestep,
+                                 temperature=self.params.temperature,
+                                 collision_rate=self.params.collision_rate)
+
     def _describe_dynamics(self):
         return 'Langevin dynamics @ %s' % self.params.temperature
 
 
+@exports
+def resume_dynamics(directory):
+    """ Resume an OpenMM dynamics run from its last checkpoint (e.g., after a crash).
+
+    The run must have been started with the integrator's ``checkpoint_directory`` parameter set.
+    The molecule, force field and OpenMM system are restored from the checkpoint directory, so
+    nothing needs to be re-prepared.
+
+    Args:
+        directory (str): the run's checkpoint directory
 
+    Returns:
+        moldesign.Trajectory: the entire trajectory (including frames written before the crash)
+    """
+    with open(os.path.join(directory, OpenMMBaseIntegrator.MOLFILE), 'rb') as molfile:
+        mol = pickle.load(molfile)
+    return mol.integrator._resume(directory)
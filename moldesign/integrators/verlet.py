@@ -16,20 +16,32 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import numpy as np
+
 from .. import units as u
+from .. import parameters
 from ..molecules import Trajectory
 from ..utils import exports
 
 from .base import IntegratorBase
 
 
-
 @exports
 class VelocityVerlet(IntegratorBase):
+    """ Velocity Verlet integrator that runs in-process, for use with any energy model that
+    calculates forces.
+
+    All propagation is done on the molecule's raw position and momentum arrays (see
+    :attr:`moldesign.Molecule.positions_raw`), and the forces from the end of each step are reused
+    at the start of the next one, so each step requires exactly one force calculation.
+
+    Note:
+        Constraints, and the removal of global translation and rotation, are not supported.
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-
-    # TODO: raise exception if any constraints are requested ...
+        self._forces = None
+        self._forces_positions = None
 
     def run(self, run_for):
         """
@@ -40,34 +52,169 @@ class VelocityVerlet(IntegratorBase):
         if not self._prepped:
             self.prep()
         nsteps = self.time_to_steps(run_for, self.params.timestep)
+        frame_interval = self.time_to_steps(self.params.frame_interval, self.params.timestep)
 
         # Set up trajectory and record the first frame
         self.mol.time = 0.0 * u.default.time
-        self.traj = Trajectory(self.mol)
-        self.mol.calculate()
+        self.traj = Trajectory(self.mol,
+                               preallocate=nsteps // frame_interval + 1,
+                               directory=self.params.get('trajectory_directory', None))
+        self._forces = None
+        self._get_forces()
         self.traj.new_frame()
-        next_trajectory_frame = self.params.frame_interval
+        next_trajectory_frame = frame_interval
 
         # Dynamics loop
         for istep in range(nsteps):
             self.step()
             if istep + 1 >= next_trajectory_frame:
                 self.traj.new_frame()
-                next_trajectory_frame += self.params.frame_interval
+                next_trajectory_frame += frame_interval
+        self.traj.flush()
         return self.traj
 
     def prep(self):
         self.time = 0.0 * self.params.timestep
+        # factor converting force*time into momentum, for unitless arrays in the default units
+        self._impulse_to_momentum = u.default.convert(
+                1.0 * u.default.force * u.default.time).magnitude
         self._prepped = True
 
     def step(self):
-        # Move momenta from t-dt to t-dt/2
-        phalf = self.mol.momenta + 0.5 * self.params.timestep * self.mol.calc_forces(wait=True)
+        if not self._prepped:
+            self.prep()
+        mol = self.mol
+        dt = self.params.timestep.value_in(u.default.time)
+        kick = 0.5 * dt * self._impulse_to_momentum
+        momenta = mol.momenta_raw
+
+        # Move momenta from t-dt to t-dt/2, using the forces from the end of the last step
+        momenta += kick * self._get_forces()
 
         # Move positions from t-dt to t
-        self.mol.positions += phalf * self.params.timestep / self.mol.dim_masses
+        mol.positions_raw += momenta * dt / mol.dim_masses.magnitude
 
         # Move momenta from t-dt/2 to t - triggers recomputed forces
-        self.mol.momenta = phalf + 0.5 * self.params.timestep * self.mol.calc_forces(wait=True)
+        momenta += kick * self._get_forces()
+
+        self._advance_time()
+
+    def _advance_time(self):
         self.time += self.params.timestep
         self.mol.time = self.time
+
+    def _get_forces(self):
+        """ Return forces at the molecule's current positions (as a raw array in the default
+        units), recalculating them only if the molecule has moved since they were last calculated
+        """
+        positions = self.mol.positions_raw
+        if self._forces is None or not np.array_equal(positions, self._forces_positions):
+            self._forces = self.mol.calc_forces(wait=True).value_in(u.default.force)
+            self._forces_positions = positions.copy()
+        return self._forces
+
+    def _kT(self):
+        """ Thermal energy at the target temperature, in the (raw) units of
+        mass * velocity**2 in the default unit system
+        """
+        kT = u.k_b * self.params.temperature
+        return kT.value_in(u.default.mass * u.default.length**2 / u.default.time**2)
+
+
+@exports
+class LangevinBAOAB(VelocityVerlet):
+    """ Langevin dynamics with the BAOAB splitting of Leimkuhler and Matthews, running in-process
+    on raw numpy arrays. Like :class:`VelocityVerlet`, this requires one force calculation per
+    step.
+
+    References:
+        B. Leimkuhler and C. Matthews. Robust and efficient configurational molecular sampling
+        via Langevin dynamics. J. Chem. Phys. 138, 174102 (2013).
+    """
+    PARAMETERS = (IntegratorBase.PARAMETERS +
+                  list(parameters.constant_temp_parameters.values()) +
+                  list(parameters.langevin_parameters.values()))
+
+    def step(self):
+        if not self._prepped:
+            self.prep()
+        mol = self.mol
+        dt = self.params.timestep.value_in(u.default.time)
+        masses = mol.dim_masses.magnitude
+        kick = 0.5 * dt * self._impulse_to_momentum
+        friction = np.exp(-dt * self.params.collision_rate.value_in(1.0/u.default.time))
+        momenta = mol.momenta_raw
+
+        # B
+        momenta += kick * self._get_forces()
+        # A
+        mol.positions_raw += 0.5 * dt * momenta / masses
+        # O
+        momenta *= friction
+        momenta += (np.sqrt((1.0 - friction**2) * masses * self._kT()) *
+                    np.random.normal(size=momenta.shape))
+        # A
+        mol.positions_raw += 0.5 * dt * momenta / masses
+        # B
+        momenta += kick * self._get_forces()
+
+        self._advance_time()
+
+
+@exports
+class BerendsenVerlet(VelocityVerlet):
+    """ Velocity Verlet dynamics with a Berendsen (weak-coupling) thermostat.
+
+    Note that this thermostat does NOT sample the canonical ensemble; see :class:`CSVRVerlet`.
+
+    References:
+        H.J.C. Berendsen, J.P.M. Postma, W.F. van Gunsteren, A. DiNola, and J.R. Haak.
+        Molecular dynamics with coupling to an external bath. J. Chem. Phys. 81, 3684 (1984).
+    """
+    PARAMETERS = (IntegratorBase.PARAMETERS +
+                  list(parameters.constant_temp_parameters.values()) +
+                  list(parameters.thermostat_parameters.values()))
+
+    def step(self):
+        super().step()
+        momenta = self.mol.momenta_raw
+        kinetic = 0.5 * (momenta * momenta / self.mol.dim_masses.magnitude).sum()
+        if kinetic > 0.0:
+            momenta *= self._scaling_factor(kinetic)
+
+    def _scaling_factor(self, kinetic):
+        dof = self.mol.dynamic_dof
+        target = 0.5 * dof * self._kT()
+        ratio = (self.params.timestep / self.params.coupling_time).value_in(u.dimensionless)
+        scaling = np.sqrt(max(0.0, 1.0 + ratio * (target / kinetic - 1.0)))
+        return min(max(scaling, self.MIN_SCALING), self.MAX_SCALING)
+
+    # limit the rescaling per step, e.g. for systems that start very far from equilibrium
+    MIN_SCALING = 0.8
+    MAX_SCALING = 1.25
+
+
+@exports
+class CSVRVerlet(BerendsenVerlet):
+    """ Velocity Verlet dynamics with the canonical sampling through velocity rescaling (CSVR)
+    thermostat of Bussi, Donadio and Parrinello, which (unlike the Berendsen thermostat) samples
+    the canonical ensemble.
+
+    References:
+        G. Bussi, D. Donadio, and M. Parrinello. Canonical sampling through velocity rescaling.
+        J. Chem. Phys. 126, 014101 (2007).
+    """
+    def _scaling_factor(self, kinetic):
+        dof = self.mol.dynamic_dof
+        target = 0.5 * dof * self._kT()
+        c = np.exp(-(self.params.timestep / self.params.coupling_time).value_in(u.dimensionless))
+
+        r1 = np.random.normal()
+        sum_r2 = np.random.chisquare(dof - 1) if dof > 1 else 0.0
+        new_kinetic = (kinetic +
+                       (1.0 - c) * (target * (r1**2 + sum_r2) / dof - kinetic) +
+                       2.0 * r1 * np.sqrt(c * (1.0 - c) * target * kinetic / dof))
+        alpha = np.sqrt(max(0.0, new_kinetic / kinetic))
+        if r1 + np.sqrt(c * dof * kinetic / ((1.0 - c) * target)) < 0.0:
+            alpha = -alpha
+        return alpha
@@ -49,7 +49,7 @@ class OpenMMPickleMixin(object):
 
 # This is a factory for the MdtReporter class. It's here so that we don't have to import
 # simtk.openmm.app at the module level
-def MdtReporter(mol, report_interval):
+def MdtReporter(mol, report_interval, directory=None):
     from simtk.openmm.app import StateDataReporter
 
     class MdtReporter(StateDataReporter):
@@ -58,10 +58,10 @@ def MdtReporter(mol, report_interval):
         It's pretty basic - the assumption is that there will be more processing on the client side
         """
 
-        def __init__(self, mol, report_interval):
+        def __init__(self, mol, report_interval, directory=None):
             self.mol = mol
             self.report_interval = report_interval
-            self.trajectory = mdt.Trajectory(mol)
+            self.trajectory = mdt.Trajectory(mol, directory=directory)
             self.annotation = None
             self.last_report_time = None
             self.logger = mdt.helpers.DynamicsLog()
@@ -119,7 +119,148 @@ def MdtReporter(mol, report_interval):
             steps = self.report_interval - simulation.currentStep % self.report_interval
             return (steps, True, True, True, True)
 
-    return MdtReporter(mol, report_interval)
+    return MdtReporter(mol, report_interval, directory=directory)
+
+
+class BufferedReporter(object):
+    """ A low-overhead OpenMM reporter that records only the requested fields, each at its own
+    interval.
+
+    Data is copied out of OpenMM as raw (``float32``) arrays in OpenMM's units, with no unit
+    conversions or per-frame bookkeeping during the run. Call :meth:`build_trajectory` once the
+    run is finished to convert everything into a :class:`moldesign.Trajectory`.
+
+    The trajectory contains a frame for every step at which any field was recorded; fields that
+    weren't recorded at a given frame are filled with ``nan``.
+
+    Args:
+        mol (moldesign.Molecule): the molecule being simulated
+        intervals (Mapping[str, int]): maps fields to record to the number of steps between
+           records. Fields are ``'positions'``, ``'velocities'`` (stored in the trajectory as
+           ``momenta``), ``'forces'`` and ``'energies'`` (potential and kinetic)
+        directory (str): store the trajectory on disk in this directory (see
+           :class:`moldesign.Trajectory`)
+    """
+    FIELDS = ('positions', 'velocities', 'forces', 'energies')
+
+    def __init__(self, mol, intervals, directory=None):
+        for field, interval in intervals.items():
+            if field not in self.FIELDS:
+                raise ValueError('Unknown field "%s"; allowed fields are %s'
+                                 % (field, ', '.join(self.FIELDS)))
+            if interval < 1:
+                raise ValueError('Report interval for "%s" must be at least one step' % field)
+
+        self.mol = mol
+        self.intervals = dict(intervals)
+        self.directory = directory
+        self.annotation = None
+        self.steps = []
+        self.times = []
+        self.data = {field: [] for field in self.intervals}
+        self.data_steps = {field: [] for field in self.intervals}
+
+    def _due(self, step):
+        return [field for field, interval in self.intervals.items() if step % interval == 0]
+
+    def describeNextReport(self, simulation):
+        """ OpenMM reporter interface: returns the number of steps until the next report, and
+        whether it will need positions, velocities, forces, and energies
+        """
+        step = simulation.currentStep
+        steps = min(interval - step % interval for interval in self.intervals.values())
+        due = self._due(step + steps)
+        return (steps,
+                'positions' in due,
+                'velocities' in due,
+                'forces' in due,
+                'energies' in due)
+
+    def report(self, simulation, state, fields=None):
+        """ Record data from an OpenMM state
+
+        Args:
+            simulation (simtk.openmm.app.Simulation): simulation to report on
+            state (simtk.openmm.State): state of the simulation
+            fields (List[str]): fields to record (default: those that are due at this step)
+        """
+        step = simulation.currentStep
+        if fields is None:
+            fields = self._due(step)
+        if self.steps and self.steps[-1] == step:  # already have a record for this step
+            fields = [f for f in fields if not self.data_steps[f] or self.data_steps[f][-1] != step]
+        else:
+            self.steps.append(step)
+            self.times.append(state.getTime()._value)
+
+        for field in fields:
+            if field == 'positions':
+                value = state.getPositions(asNumpy=True)._value
+            elif field == 'velocities':
+                value = state.getVelocities(asNumpy=True)._value
+            elif field == 'forces':
+                value = state.getForces(asNumpy=True)._value
+            else:
+                value = (state.getPotentialEnergy()._value, state.getKineticEnergy()._value)
+            self.data[field].append(np.array(value, dtype='float32'))
+            self.data_steps[field].append(step)
+
+    def report_all(self, simulation):
+        """ Record every field from the simulation's current state (unless it was already
+        recorded at this step)
+        """
+        need = set(self.intervals)
+        state = simulation.context.getState(getPositions='positions' in need,
+                                            getVelocities='velocities' in need,
+                                            getForces='forces' in need,
+                                            getEnergy='energies' in need)
+        self.report(simulation, state, fields=list(self.intervals))
+
+    def build_trajectory(self):
+        """ Convert all recorded data into a trajectory
+
+        Returns:
+            moldesign.Trajectory: trajectory with a frame for every recorded step
+        """
+        from simtk import unit as stku
+
+        rows = {step: irow for irow, step in enumerate(self.steps)}
+        num_frames = len(self.steps)
+        columns = {'time': self._converted(self.times, stku.picosecond)}
+
+        for field, values in self.data.items():
+            if field == 'energies':
+                energies = self._filled(field, (num_frames, 2), rows)
+                columns['potential_energy'] = self._converted(energies[:, 0],
+                                                              stku.kilojoule_per_mole)
+                columns['kinetic_energy'] = self._converted(energies[:, 1],
+                                                            stku.kilojoule_per_mole)
+                continue
+
+            array = self._filled(field, (num_frames, self.mol.num_atoms, 3), rows)
+            if field == 'positions':
+                columns['positions'] = self._converted(array, stku.nanometer)
+            elif field == 'velocities':
+                columns['momenta'] = (self._converted(array, stku.nanometer/stku.picosecond) *
+                                      self.mol.dim_masses)
+            elif field == 'forces':
+                columns['forces'] = self._converted(array,
+                                                    stku.kilojoule_per_mole/stku.nanometer)
+
+        if self.annotation is not None:
+            columns['annotation'] = [self.annotation] * num_frames
+        return mdt.Trajectory.from_arrays(self.mol, columns, directory=self.directory)
+
+    def _filled(self, field, shape, rows):
+        array = np.full(shape, np.nan, dtype='float32')
+        if self.data[field]:
+            array[[rows[step] for step in self.data_steps[field]]] = self.data[field]
+        return array
+
+    @staticmethod
+    def _converted(values, stkunit):
+        factor, units = _get_conversion(stkunit)
+        return u.MdtQuantity(np.asarray(values, dtype='float64') * factor, units)
 
 
 PINT_NAMES = {'mole': u.avogadro,
@@ -139,25 +280,77 @@ def simtk2pint(quantity, flat=False):
     Returns:
         mdt.units.MdtQuantity: converted to MDT unit system
     """
-    from simtk import unit as stku
+    factor, units = _get_conversion(quantity.unit)
+    mag = np.array(quantity._value) * factor
+    if flat:
+        mag = np.reshape(mag, (np.product(mag.shape),))
+    return u.MdtQuantity(mag, units)
 
-    mag = np.array(quantity._value)
 
-    if quantity.unit == stku.radian:
-        return mag * u.radians
-    if quantity.unit == stku.degree:
-        return mag * u.degrees
+@exports
+def simtk2raw(quantity):
+    """ Converts a simtk quantity into a plain numpy array in MDT's default unit system.
 
-    for dim, exp in itertools.chain(quantity.unit.iter_scaled_units(),
-                                    quantity.unit.iter_top_base_units()):
+    This skips the creation of a units-aware object entirely - it's meant for copying large
+    arrays (e.g., from ``state.getPositions(asNumpy=True)``) into a molecule's raw arrays (see
+    :attr:`moldesign.Molecule.positions_raw`)
+
+    Args:
+        quantity (simtk.unit.quantity.Quantity): quantity to convert
+
+    Returns:
+        np.ndarray: magnitude of the quantity in MDT's default units
+    """
+    factor, units = _get_conversion(quantity.unit)
+    return np.asarray(quantity._value) * factor
+
+
+_PINT_UNITS = {}
+_CONVERSIONS = {}
+
+
+def _get_conversion(stkunit):
+    """ Get the factor that converts magnitudes in a simtk unit into MDT's default units.
+
+    Parsing simtk units into pint units is slow, so the parsed units are cached for each simtk
+    unit, and the conversion factors for each combination of simtk unit and (current) default
+    units.
+
+    Args:
+        stkunit (simtk.unit.Unit): unit to convert from
+
+    Returns:
+        Tuple[float, mdt.units.MdtUnit]: conversion factor, and the MDT units it converts to
+    """
+    pintunit = _PINT_UNITS.get(stkunit)
+    if pintunit is None:
+        pintunit = _PINT_UNITS[stkunit] = _parse_simtk_unit(stkunit)
+
+    key = (stkunit, u.default.get_baseunit(pintunit))
+    if key not in _CONVERSIONS:
+        converted = u.default.convert(pintunit)
+        _CONVERSIONS[key] = (converted.magnitude, converted.units)
+    return _CONVERSIONS[key]
+
+
+def _parse_simtk_unit(stkunit):
+    """ Returns a pint quantity equal to one of the passed simtk units
+    """
+    from simtk import unit as stku
+
+    if stkunit == stku.radian:
+        return 1.0 * u.radians
+    elif stkunit == stku.degree:
+        return 1.0 * u.degrees
+
+    pintunit = 1.0 * u.ureg.dimensionless
+    for dim, exp in itertools.chain(stkunit.iter_scaled_units(),
+                                    stkunit.iter_top_base_units()):
         if dim.name in PINT_NAMES:
-            pintunit = PINT_NAMES[dim.name]
+            pintunit = pintunit * PINT_NAMES[dim.name]**exp
         else:
-            pintunit = u.ureg.parse_expression(dim.name)
-        mag = mag * (pintunit**exp)
-        if flat:
-            mag = np.reshape(mag, (np.product(mag.shape),))
-    return u.default.convert(mag)
+            pintunit = pintunit * u.ureg.parse_expression(dim.name)**exp
+    return pintunit
 
 
 @exports
@@ -346,3 +539,71 @@ def list_openmmplatforms():
     from simtk import openmm
     return [openmm.Platform.getPlatform(ip).getName()
             for ip in range(openmm.Platform.getNumPlatforms())]
+
+
+def make_reconfigurable_integrator():
+    """ Create an OpenMM integrator whose dynamics can be changed after the simulation context
+    has been created (see :func:`configure_integrator`).
+
+    This is a ``CustomIntegrator`` implementing Langevin dynamics with the "BAOAB" splitting
+    (Leimkuhler and Matthews, J. Chem. Phys. 138, 174102). With zero friction it reduces to
+    velocity Verlet. Because OpenMM binds a context to its integrator, switching between
+    constant-energy and Langevin dynamics (or changing the timestep or temperature) this way
+    doesn't require a new context.
+
+    Returns:
+        simtk.openmm.CustomIntegrator: the integrator (configured for constant energy dynamics
+           with a 1 fs timestep)
+    """
+    from simtk import openmm
+
+    integrator = openmm.CustomIntegrator(0.001)
+    integrator.addGlobalVariable('a', 1.0)  # velocity scaling from friction, exp(-gamma*dt)
+    integrator.addGlobalVariable('b', 0.0)  # magnitude of random kicks, sqrt(1-a^2)
+    integrator.addGlobalVariable('kT', 0.0)
+    integrator.addPerDofVariable('x1', 0.0)  # positions before constraints are applied
+    integrator.addUpdateContextState()
+
+    def half_kick():  # "B"
+        integrator.addComputePerDof('v', 'v + 0.5*dt*f/m')
+        integrator.addConstrainVelocities()
+
+    def half_drift():  # "A"
+        integrator.addComputePerDof('x', 'x + 0.5*dt*v')
+        integrator.addComputePerDof('x1', 'x')
+        integrator.addConstrainPositions()
+        integrator.addComputePerDof('v', 'v + (x-x1)/(0.5*dt)')
+        integrator.addConstrainVelocities()
+
+    half_kick()
+    half_drift()
+    integrator.addComputePerDof('v', 'a*v + b*sqrt(kT/m)*gaussian')  # "O"
+    integrator.addConstrainVelocities()
+    half_drift()
+    half_kick()
+    return integrator
+
+
+def configure_integrator(integrator, timestep, temperature=None, collision_rate=None):
+    """ Set the dynamics run by an integrator from :func:`make_reconfigurable_integrator`
+
+    Args:
+        integrator (simtk.openmm.CustomIntegrator): integrator to configure
+        timestep (u.Scalar[time]): timestep
+        temperature (u.Scalar[temperature]): bath temperature (if None, run constant
+           energy dynamics)
+        collision_rate (u.Scalar[1/time]): Langevin collision rate (ignored if temperature is
+           None)
+    """
+    dt = timestep.value_in(u.ps)
+    integrator.setStepSize(dt)
+    if temperature is None:
+        integrator.setGlobalVariableByName('a', 1.0)
+        integrator.setGlobalVariableByName('b', 0.0)
+        integrator.setGlobalVariableByName('kT', 0.0)
+    else:
+        a = np.exp(-collision_rate.value_in(1.0/u.ps) * dt)
+        kt = (u.boltz * temperature).value_in(u.kjpermol)
+        integrator.setGlobalVariableByName('a', float(a))
+        integrator.setGlobalVariableByName('b', float(np.sqrt(1.0 - a**2)))
+        integrator.setGlobalVariableByName('kT', float(kt))
@@ -240,10 +240,9 @@ def mol_to_parmed(mol):
                        resnum=utils.if_not_none(atom.residue.pdbindex, -1),
                        chain=utils.if_not_none(atom.chain.name, ''))
 
-    for bond in mol.bonds:
-        struc.bonds.append(parmed.Bond(pmedatoms[bond.a1.index],
-                                       pmedatoms[bond.a2.index],
-                                       order=bond.order))
+    topology = mol.bond_graph.topology
+    for (i, j), order in zip(topology.bonds, topology.bond_orders):
+        struc.bonds.append(parmed.Bond(pmedatoms[i], pmedatoms[j], order=int(order)))
     return struc
 
 
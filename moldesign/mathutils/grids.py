@@ -102,6 +102,35 @@ class VolumetricGrid(object):
         """
         return _cartesian_product(self.spaces)
 
+    def iter_slabs(self, num_planes=1):
+        """ Iterate through the grid's points one slab (a set of grid planes perpendicular
+        to the x-axis) at a time, so that the entire grid never needs to be in memory at once.
+
+        The points are yielded in the same order as ``allpoints``.
+
+        Args:
+            num_planes (int): number of x-planes in each slab
+
+        Yields:
+            Matrix[shape=(*, 3)]: x,y,z coordinates of each point in the slab
+        """
+        for start in range(0, self.xpoints, num_planes):
+            yield self.slab(start, num_planes)
+
+    def slab(self, start, num_planes=1):
+        """ Return the coordinates of the points in the grid planes ``start`` through
+        ``start+num_planes-1`` (perpendicular to the x-axis)
+
+        Args:
+            start (int): index of the first plane
+            num_planes (int): number of planes
+
+        Returns:
+            Matrix[shape=(*, 3)]: x,y,z coordinate of each point in the slab
+        """
+        return _cartesian_product([self.xspace[start:start+num_planes],
+                                   self.yspace, self.zspace])
+
 
 def _cartesian_product(arrays):
     """ Fast grid creation routine from @senderle on Stack Overflow. This is awesome.
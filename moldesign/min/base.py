@@ -16,6 +16,7 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import collections
 import sys
 
 import numpy as np
@@ -28,6 +29,7 @@ from .. import units as u
 class MinimizerBase(object):
 
     _strip_units = True  # callbacks expect and return dimensionless quantities scaled to default unit system
+    _CALC_CACHE_SIZE = 10  # number of recently evaluated points to keep properties for
 
     def __init__(self, mol, nsteps=20,
                  force_tolerance=data.DEFAULT_FORCE_TOLERANCE,
@@ -41,7 +43,7 @@ class MinimizerBase(object):
                                                     max(nsteps/10, 1))
         self._restart_from = _restart_from
         self._foundmin = None
-        self._calc_cache = {}
+        self._calc_cache = collections.OrderedDict()
 
         # Set up the trajectory to track the minimization
         self.traj = mdt.Trajectory(mol)
@@ -69,7 +71,7 @@ class MinimizerBase(object):
         """
         c = vector.reshape((self.mol.num_atoms, 3))
         if self._strip_units:
-            self.mol.positions = c*u.default.length
+            self.mol.positions_raw = c
         else:
             self.mol.positions = c
 
@@ -92,12 +94,12 @@ class MinimizerBase(object):
             return np.inf
 
         self._cachemin()
-        self._calc_cache[tuple(vector)] = self.mol.properties
+        self._cache_properties(vector)
         pot = self.mol.potential_energy
 
         if self._initial_energy is None: self._initial_energy = pot
         self._last_energy = pot
-        if self._strip_units: return pot.defunits().magnitude
+        if self._strip_units: return pot.value_in(u.default.energy)
         else: return pot.defunits()
 
     def grad(self, vector):
@@ -106,16 +108,27 @@ class MinimizerBase(object):
         self._sync_positions(vector)
         self.mol.calculate(requests=self.request_list)
         self._cachemin()
-        self._calc_cache[tuple(vector)] = self.mol.properties
-        grad = -self.mol.forces
-
-        grad = grad.reshape(self.mol.num_atoms * 3)
-        self._last_grad = grad
+        self._cache_properties(vector)
         if self._strip_units:
-            return grad.defunits().magnitude
+            grad = -self.mol.forces_raw.reshape(self.mol.num_atoms * 3)
+            self._last_grad = grad * u.default.force
+            return grad
         else:
+            grad = -self.mol.forces.reshape(self.mol.num_atoms * 3)
+            self._last_grad = grad
             return grad.defunits()
 
+    def _cache_properties(self, vector):
+        """ Remember the properties calculated at this point, discarding the least recently
+        calculated ones (the persistent cache, if enabled, still has those - see
+        :func:`moldesign.models.set_calculation_cache`)
+        """
+        key = tuple(vector)
+        self._calc_cache.pop(key, None)
+        self._calc_cache[key] = self.mol.properties
+        while len(self._calc_cache) > self._CALC_CACHE_SIZE:
+            self._calc_cache.popitem(last=False)
+
     def _cachemin(self):
         """ Caches the minimum potential energy properties so we can return them
         when the calculation is done.
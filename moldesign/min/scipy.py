@@ -81,9 +81,13 @@ class ScipyMinimizer(MinimizerBase):
 
         self.traj.info = result
 
-        finalprops = self._calc_cache[tuple(result.x)]
-        self.mol.positions = finalprops.positions
-        self.mol.properties = finalprops
+        finalprops = self._calc_cache.get(tuple(result.x), None)
+        if finalprops is None:
+            self._sync_positions(result.x)
+            self.mol.calculate(self.request_list)
+        else:
+            self.mol.positions = finalprops.positions
+            self.mol.properties = finalprops
 
     def _force_constraint_convergence(self, result):
         """ Make sure that all constraints are satisfied, ramp up the constraint functions if not
@@ -1,3 +1,4 @@
+from .cache import *
 from .openmm import *
 from .pyscf import *
 from .models import *
@@ -16,6 +16,7 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
 import itertools
 
 import numpy as np
@@ -42,6 +43,10 @@ class EnergyModelBase(Method):
 
     _CALLS_MDT_IN_DOCKER = False  # gets set to true if a python-interfaced dependency is missing
 
+    CACHEABLE = False
+    """bool: whether results from this model are stored in the calculation cache (see
+    :func:`moldesign.models.set_calculation_cache`)"""
+
     def calculate(self, requests):
         """Calculate the the default properties and any additiona requests
 
@@ -54,6 +59,73 @@ class EnergyModelBase(Method):
         self.prep()
         raise NotImplementedError('EnergyModelBase is an abstract base class')
 
+    def calculate_batch(self, positions, requests=None):
+        """ Calculate the energy (and forces) of many different conformations of the molecule.
+
+        This default implementation just calculates each conformation in turn. Models that can do
+        better (e.g., by re-using a simulation context, or the previous conformation's
+        wavefunction) override it. Either way, the molecule's positions and properties are
+        restored afterwards.
+
+        Args:
+            positions (u.Array[length]): coordinates of each conformation
+               (shape: ``(num_conformations, num_atoms, 3)``)
+            requests (List[str]): properties to calculate (default: ``potential_energy`` and
+               ``forces``)
+
+        Returns:
+            utils.DotDict: the requested properties, stacked along a new first axis (e.g.,
+               ``potential_energy`` has shape ``(num_conformations,)``)
+        """
+        requests = self._get_batch_requests(requests)
+        coords = self._get_batch_coordinates(positions)
+        results = {name: [] for name in requests}
+        with self._batch_state():
+            for conformation in coords:
+                self.mol.positions_raw = conformation
+                props = self.mol.calculate(requests)
+                for name in requests:
+                    results[name].append(props[name])
+        return mdt.utils.DotDict((name, u.array(results[name])) for name in requests)
+
+    @staticmethod
+    def _get_batch_requests(requests):
+        if requests is None:
+            return ['potential_energy', 'forces']
+        else:
+            return list(requests)
+
+    def _get_batch_coordinates(self, positions):
+        """ Check the shape of an array of conformations, and return its magnitude in the default
+        length units
+        """
+        coords = u.array(positions).value_in(u.default.length)
+        if coords.ndim != 3 or coords.shape[1:] != (self.mol.num_atoms, 3):
+            raise ValueError('Expected conformations with shape (num_conformations, %d, 3), got %s'
+                             % (self.mol.num_atoms, coords.shape))
+        return coords
+
+    @contextlib.contextmanager
+    def _batch_state(self):
+        """ Context manager that restores the molecule's positions and properties on exit
+        """
+        positions = self.mol.positions.copy()
+        properties = self.mol.properties
+        try:
+            yield
+        finally:
+            self.mol.positions = positions
+            self.mol.properties = properties
+
+    def _get_cache_data(self):
+        """ Lists any state (other than the model's parameters) that calculation results depend
+        on; used to build keys for the calculation cache.
+
+        Returns:
+            List: objects whose ``repr`` identifies the state
+        """
+        return []
+
     def minimize(self, method='bfgs', **kwargs):
         """
         If the energy model provides its own minimizer, it should be hooked up here
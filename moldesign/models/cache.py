@@ -0,0 +1,249 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+import moldesign as mdt
+from .. import utils
+from .. import units as u
+
+_active_cache = None
+
+
+@utils.exports
+def set_calculation_cache(path, max_size=500000000, decimals=6):
+    """ Store the results of energy model calculations on disk, so that repeated calculations
+    (for the same molecule, geometry, and model parameters) are returned without being re-run.
+
+    Only models that set ``CACHEABLE = True`` (currently PySCF, OpenMM and NWChem) use the cache.
+    Results persist across python sessions; the cache can be shared between processes.
+
+    Args:
+        path (str): directory to store cached results in (created if it doesn't exist). If None,
+           disable the cache.
+        max_size (int): maximum size of the cache, in bytes. When it's exceeded, the least
+           recently used results are deleted.
+        decimals (int): geometries are compared after rounding coordinates (in angstroms) to this
+           many decimal places
+
+    Returns:
+        CalculationCache: the active cache (or None, if it was disabled)
+    """
+    global _active_cache
+    if path is None:
+        _active_cache = None
+    else:
+        _active_cache = CalculationCache(path, max_size=max_size, decimals=decimals)
+    return _active_cache
+
+
+@utils.exports
+def get_calculation_cache():
+    """ Returns:
+        CalculationCache: the active calculation cache (or None if caching is disabled)
+    """
+    return _active_cache
+
+
+@utils.exports
+def calculation_key(mol, model=None, decimals=6):
+    """ Compute a hash that identifies an energy model calculation.
+
+    The hash depends on the atomic numbers, the coordinates (rounded to ``decimals`` places, in
+    angstroms), the charge and multiplicity, and the energy model's class and parameters.
+
+    Args:
+        mol (moldesign.Molecule): molecule to calculate
+        model (moldesign.models.base.EnergyModelBase): energy model (default: ``mol.energy_model``)
+        decimals (int): number of decimal places to round coordinates to
+
+    Returns:
+        str: hex digest identifying this calculation
+    """
+    model = utils.if_not_none(model, mol.energy_model)
+    sha = hashlib.sha1()
+    sha.update(np.array([atom.atnum for atom in mol.atoms], dtype='int64').tobytes())
+
+    # adding 0.0 turns -0.0 into 0.0 so that they hash the same
+    coords = np.round(mol.positions.value_in(u.angstrom), decimals) + 0.0
+    sha.update(np.ascontiguousarray(coords, dtype='float64').tobytes())
+
+    charge = model.get_formal_charge()
+    multiplicity = model.params.get('multiplicity', 1)
+    sha.update(('%s;%s;%s.%s' % (charge, multiplicity,
+                                 model.__class__.__module__,
+                                 model.__class__.__name__)).encode('utf-8'))
+    for item in sorted(model.params.items()):
+        sha.update(repr(item).encode('utf-8'))
+    for item in model._get_cache_data():
+        sha.update(repr(item).encode('utf-8'))
+    return sha.hexdigest()
+
+
+@utils.exports
+class CalculationCache(object):
+    """ A directory of pickled calculation results, keyed by :func:`calculation_key`.
+
+    Each result is stored in its own file, so caches can be shared between processes. When the
+    total size exceeds ``max_size``, the least recently used files (by modification time, which
+    is updated whenever a result is read) are deleted.
+
+    Args:
+        path (str): directory to store results in
+        max_size (int): maximum total size of the stored results, in bytes
+        decimals (int): number of decimal places to round coordinates (in angstroms) to
+    """
+    SUFFIX = '.pkl'
+
+    def __init__(self, path, max_size=500000000, decimals=6):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_size = max_size
+        self.decimals = decimals
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def __len__(self):
+        return len(self._entries())
+
+    def key(self, mol):
+        return calculation_key(mol, decimals=self.decimals)
+
+    def get(self, mol, requests=(), key=None):
+        """ Look up the stored results for the molecule's current state
+
+        Args:
+            mol (moldesign.Molecule): molecule (with an energy model) to look up
+            requests (List[str]): names of properties that must be present in the result
+            key (str): the calculation's key, if already known (default: ``self.key(mol)``)
+
+        Returns:
+            MolecularProperties: the cached results (associated with ``mol``), or None if there
+               are no matching results
+        """
+        if key is None:
+            key = self.key(mol)
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as pklfile:
+                properties = _MoleculeUnpickler(pklfile, mol).load()
+            os.utime(filename, None)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if not set(requests).issubset(properties):
+            return None
+        properties['positions'] = mol.positions.copy()
+        return properties
+
+    def store(self, mol, properties, key=None):
+        """ Store calculation results for the molecule's current state
+
+        Args:
+            mol (moldesign.Molecule): molecule (with an energy model) that was calculated
+            properties (MolecularProperties): the calculated properties
+            key (str): the calculation's key, if already known (default: ``self.key(mol)``)
+        """
+        if key is None:
+            key = self.key(mol)
+        buffer = io.BytesIO()
+        _MoleculePickler(buffer, mol).dump(properties)
+
+        # write to a temporary file first so other processes never read a partial result
+        fd, tmpname = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmpfile:
+            tmpfile.write(buffer.getvalue())
+        os.rename(tmpname, self._filename(key))
+        self._evict()
+
+    def clear(self):
+        """ Delete all stored results
+        """
+        for filename, stat in self._entries():
+            _remove(filename)
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + self.SUFFIX)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(self.SUFFIX):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                entries.append((filename, os.stat(filename)))
+            except OSError:  # deleted by another process
+                continue
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(stat.st_size for filename, stat in entries)
+        if total <= self.max_size:
+            return
+
+        entries.sort(key=lambda entry: entry[1].st_mtime)
+        for filename, stat in entries:
+            if total <= self.max_size:
+                break
+            _remove(filename)
+            total -= stat.st_size
+
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+class _MoleculePickler(pickle.Pickler):
+    """ Pickles references to a molecule (and its atoms) by name, so that cached results don't
+    contain a copy of the molecule. They are re-attached to the molecule when unpickled.
+    """
+    def __init__(self, fileobj, mol):
+        pickle.Pickler.__init__(self, fileobj, protocol=2)
+        self.mol = mol
+
+    def persistent_id(self, obj):
+        if obj is self.mol:
+            return 'molecule'
+        elif isinstance(obj, mdt.Atom) and obj.molecule is self.mol:
+            return 'atom:%d' % obj.index
+        else:
+            return None
+
+
+class _MoleculeUnpickler(pickle.Unpickler):
+    def __init__(self, fileobj, mol):
+        pickle.Unpickler.__init__(self, fileobj)
+        self.mol = mol
+
+    def persistent_load(self, pid):
+        if pid == 'molecule':
+            return self.mol
+        elif pid.startswith('atom:'):
+            return self.mol.atoms[int(pid[5:])]
+        else:
+            raise pickle.UnpicklingError('Unknown persistent id "%s"' % pid)
@@ -38,6 +38,11 @@ class NWChemQM(JsonModelBase, QMBase):
     MODELNAME = 'nwchem'
     DEFAULT_PROPERTIES = ['potential_energy']
     ALL_PROPERTIES = DEFAULT_PROPERTIES + 'forces dipole esp'.split()
+    CACHEABLE = True
+
+    def _get_cache_data(self):
+        return [(constraint._constraintsig(), constraint.value)
+                for constraint in self.mol.constraints]
 
     def _get_inputfiles(self):
         return {'input.xyz': self.mol.write(format='xyz')}
@@ -68,6 +73,7 @@ class NWChemQMMM(NWChemQM):
     MODELNAME = 'nwchem_qmmmm'
     DEFAULT_PROPERTIES = ['potential_energy', 'forces', 'esp']
     ALL_PROPERTIES = DEFAULT_PROPERTIES
+    CACHEABLE = False  # results depend on the MM force field, which isn't part of the cache key
     RUNNER = 'runqmmm.py'
     PARSER = 'getresults.py'
     PARAMETERS = NWChemQM.PARAMETERS + [mdt.parameters.Parameter('qm_atom_indices')]
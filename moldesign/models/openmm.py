@@ -16,15 +16,21 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import collections
+import hashlib
 import os
 import tempfile
 from future.utils import native_str
 
+import numpy as np
+
+import moldesign as mdt
 import moldesign.molecules
 from ..compute import packages
 from ..molecules import Trajectory, MolecularProperties
 from ..utils import exports
 from ..interfaces import openmm as opm
+from .. import units as u
 from .base import MMBase
 from .. import parameters
 
@@ -41,6 +47,17 @@ numcpus.help = ('Sets number of threads for OpenMM CPU platform. '
 numcpus.help_url = \
     'http://docs.openmm.org/7.1.0/userguide/library.html#platform-specific-properties'
 
+# Serialized OpenMM systems, keyed on the force field and system parameters, so that systems
+# don't need to be rebuilt when a molecule's energy model is re-created
+_SYSTEM_XML_CACHE = collections.OrderedDict()
+_SYSTEM_XML_CACHE_SIZE = 10
+
+# parmed.Structure attributes that hold force field terms
+_TERM_LISTS = ('bonds', 'angles', 'dihedrals', 'rb_torsions', 'urey_bradleys', 'impropers',
+               'cmaps', 'trigonal_angles', 'out_of_plane_bends', 'pi_torsions',
+               'stretch_bends', 'torsion_torsions', 'chiral_frames', 'multipole_frames',
+               'adjusts')
+
 
 @exports
 class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
@@ -58,9 +75,11 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
     _CALLS_MDT_IN_DOCKER = packages.openmm.force_remote
 
     _openmm_compatible = True
+    CACHEABLE = True
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self._ffkey = None
         self._reset()
 
     def _reset(self):
@@ -70,6 +89,11 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
         self._prepped_integrator = 'uninitialized'
         self._constraints_set = False
         self._required_tolerance = None
+        self._simulation_key = None
+        self._reconfigurable = False
+        self._applied_constraints = None
+        self._base_masses = None
+        self._base_constraints = None
 
     def get_openmm_simulation(self):
         if packages.openmm.force_remote:
@@ -98,13 +122,79 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
                                     forces=opm.simtk2pint(state.getForces(), flat=False))
         return props
 
-    def prep(self):
+    @packages.openmm.runsremotely(is_imethod=True)
+    def calculate_batch(self, positions, requests=None):
+        """ Calculate the energy (and forces) of many different conformations of the molecule.
+
+        All conformations are evaluated in the same OpenMM context, and results are collected as
+        plain arrays, with units attached only once at the end.
+
+        Args:
+            positions (u.Array[length]): coordinates of each conformation
+               (shape: ``(num_conformations, num_atoms, 3)``)
+            requests (List[str]): any of ``potential_energy`` and ``forces`` (default: both)
+
+        Returns:
+            utils.DotDict: the requested properties, stacked along a new first axis
+        """
+        requests = self._get_batch_requests(requests)
+        unsupported = set(requests).difference(['potential_energy', 'forces'])
+        if unsupported:
+            raise ValueError("Can't calculate %s in a batch" % ', '.join(unsupported))
+        get_energy = 'potential_energy' in requests
+        get_forces = 'forces' in requests
+
+        coords = self._get_batch_coordinates(positions) * (1.0*u.default.length).value_in(u.nm)
+        energies = np.zeros(len(coords))
+        forces = np.zeros(coords.shape)
+
+        self.prep()
+        context = self.sim.context
+        for iconf, conformation in enumerate(coords):
+            context.setPositions(conformation)
+            state = context.getState(getEnergy=get_energy, getForces=get_forces)
+            if get_energy:
+                energies[iconf] = opm.simtk2raw(state.getPotentialEnergy())
+            if get_forces:
+                forces[iconf] = opm.simtk2raw(state.getForces(asNumpy=True))
+
+        result = mdt.utils.DotDict()
+        if get_energy:
+            result.potential_energy = energies * u.default.energy
+        if get_forces:
+            result.forces = forces * u.default.force
+        return result
+
+    def _get_cache_data(self):
+        return [self._get_forcefield_key()]
+
+    def _get_forcefield_key(self):
+        """ Hash of the molecule's force field parameters (see :func:`_forcefield_key`). It's only
+        recomputed when the molecule's force field changes.
+        """
+        struc = self.mol.ff.parmed_obj
+        if self._ffkey is None or self._ffkey[0] is not struc:
+            self._ffkey = (struc, _forcefield_key(struc))
+        return self._ffkey[1]
+
+    def prep(self, mm_system=None):
         """ Construct the OpenMM simulation objects
 
+        Args:
+            mm_system (simtk.openmm.System): use this system instead of creating one from the
+               molecule's force field (for instance, a system restored from a checkpoint). Any
+               constraints must already have been applied to it.
+
         Note:
             An OpenMM simulation object consists of both the system AND the integrator. This routine
             therefore constructs both. If self.mol does not use an OpenMM integrator, we create
             an OpenMM simulation with a "Dummy" integrator that doesn't ever get used.
+
+            Creating a simulation is expensive, so the existing one is updated in place when
+            possible: changing the integrator (or its parameters) just reconfigures the OpenMM
+            integrator, and changing the molecule's constraints updates the system and
+            reinitializes the context. The simulation is only rebuilt if the force field or the
+            system parameters change (and even then, previously built systems are cached).
         """
         if packages.openmm.force_remote:
             return True
@@ -119,21 +209,20 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
             _prepped = self._prepped
             setup_integrator = False
 
-        if _prepped:
+        if _prepped and mm_system is None:
             return
 
-        self._reset()
-        system_params = self._get_system_params()
-        self.mm_system = self.mol.ff.parmed_obj.createSystem(**system_params)
+        if mm_system is None and self._can_update_simulation(setup_integrator):
+            self._update_simulation(setup_integrator)
+            return
 
-        if (self.params.nonbonded != 'nocutoff'
-                and not self.params.periodic
-                and self.params.implicit_solvent):
-            # TODO: remove this workaround once fix for pandegroup/openmm#1848 is released
-            tmpfile = os.path.join(tempfile.mkdtemp(), 'prmtop')
-            self.mol.ff.parmed_obj.write_parm(tmpfile)
-            om_prmtop = app.AmberPrmtopFile(tmpfile)
-            self.mm_system = om_prmtop.createSystem(**system_params)
+        self._reset()
+        if mm_system is None:
+            self.mm_system = self._create_system()
+        else:
+            self.mm_system = mm_system
+            self._constraints_set = True
+            self._required_tolerance = self._get_required_tolerance()
 
         if setup_integrator:
             try:
@@ -153,7 +242,15 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
                                   self.mm_integrator,
                                   platform=platform,
                                   platformProperties=platform_properties)
+        if mm_system is None:
+            self._simulation_key = self._get_simulation_key()
+        self._reconfigurable = ((not setup_integrator) or
+                                hasattr(self.mol.integrator, 'configure_openmm_integrator'))
 
+        self._finish_prep(setup_integrator)
+        print('Created OpenMM kernel (Platform: %s)' % self.sim.context.getPlatform().getName())
+
+    def _finish_prep(self, setup_integrator):
         if setup_integrator:
             self.mol.integrator.energy_model = self
             self.mol.integrator.sim = self.sim
@@ -161,7 +258,114 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
 
         self._prepped = True
         self._prepped_integrator = self.mol.integrator
-        print('Created OpenMM kernel (Platform: %s)' % self.sim.context.getPlatform().getName())
+
+    def _get_simulation_key(self):
+        """ Everything (other than constraints and the integrator) that the current simulation
+        was built from. Note that ``_get_platform`` must have been called already, so that the
+        "auto" platform has been resolved.
+        """
+        return (self.mol.ff,
+                repr(sorted(self._get_system_params().items())),
+                self.params.compute_platform.lower(),
+                self.params.num_cpus)
+
+    def _can_update_simulation(self, setup_integrator):
+        """ Check whether the existing simulation can be updated for the current integrator and
+        constraints, instead of being rebuilt
+        """
+        if self.sim is None or self._simulation_key is None or not self._reconfigurable:
+            return False
+        if setup_integrator and not hasattr(self.mol.integrator, 'configure_openmm_integrator'):
+            return False
+        return self._simulation_key == self._get_simulation_key()
+
+    def _update_simulation(self, setup_integrator):
+        """ Update the existing simulation's constraints and integrator in place
+        """
+        if setup_integrator:
+            self._update_constraints()
+            self.mol.integrator.configure_openmm_integrator(self.mm_integrator)
+        else:  # constraints don't affect energies or forces; no need to update them
+            opm.configure_integrator(self.mm_integrator, self.DUMMY_TIMESTEP)
+        if self._required_tolerance:
+            self.mm_integrator.setConstraintTolerance(float(self._required_tolerance))
+        self._finish_prep(setup_integrator)
+
+    def _update_constraints(self):
+        """ Make the system's constraints match the molecule's.
+
+        If other constraints were applied previously, the system is first reset to the masses and
+        constraints it was created with. The context is then reinitialized (preserving its state).
+        """
+        constraint_key = self._get_constraint_key()
+        if self._constraints_set and constraint_key == self._applied_constraints:
+            return
+
+        system_changed = False
+        if self._applied_constraints != []:
+            system = self.mm_system
+            for iatom, mass in enumerate(self._base_masses):
+                system.setParticleMass(iatom, mass)
+            for ic in reversed(range(system.getNumConstraints())):
+                system.removeConstraint(ic)
+            for i, j, dist in self._base_constraints:
+                system.addConstraint(i, j, dist)
+            self._applied_constraints = []
+            system_changed = True
+
+        self._constraints_set = False
+        try:
+            self._set_constraints()
+        except moldesign.NotSupportedError as exc:
+            print("Warning: dynamics not supported: %s" % exc.args[0])
+        if system_changed or self._applied_constraints != []:
+            self.sim.context.reinitialize(preserveState=True)
+
+    def _get_constraint_key(self):
+        return [(constraint._constraintsig(), repr(constraint.value))
+                for constraint in self.mol.constraints
+                if constraint.desc in ('position', 'distance')]
+
+    def _create_system(self):
+        """ Create an OpenMM system from the molecule's force field. Systems are cached (as XML),
+        keyed on the force field and the system parameters, so each is only built once.
+
+        Returns:
+            simtk.openmm.System: the system
+        """
+        from simtk import openmm
+        from simtk.openmm import app
+
+        system_params = self._get_system_params()
+        cachekey = (self._get_forcefield_key(),
+                    repr(sorted(system_params.items())))
+
+        if cachekey in _SYSTEM_XML_CACHE:
+            _SYSTEM_XML_CACHE[cachekey] = _SYSTEM_XML_CACHE.pop(cachekey)  # most recently used
+            mm_system = openmm.XmlSerializer.deserialize(_SYSTEM_XML_CACHE[cachekey])
+        else:
+            mm_system = self.mol.ff.parmed_obj.createSystem(**system_params)
+
+            if (self.params.nonbonded != 'nocutoff'
+                    and not self.params.periodic
+                    and self.params.implicit_solvent):
+                # TODO: remove this workaround once fix for pandegroup/openmm#1848 is released
+                tmpfile = os.path.join(tempfile.mkdtemp(), 'prmtop')
+                self.mol.ff.parmed_obj.write_parm(tmpfile)
+                om_prmtop = app.AmberPrmtopFile(tmpfile)
+                mm_system = om_prmtop.createSystem(**system_params)
+
+            _SYSTEM_XML_CACHE[cachekey] = openmm.XmlSerializer.serialize(mm_system)
+            while len(_SYSTEM_XML_CACHE) > _SYSTEM_XML_CACHE_SIZE:
+                _SYSTEM_XML_CACHE.popitem(last=False)
+
+        # remember the system's original state, so that constraints can be updated in place
+        self._applied_constraints = []
+        self._base_masses = [mm_system.getParticleMass(i)
+                             for i in range(mm_system.getNumParticles())]
+        self._base_constraints = [mm_system.getConstraintParameters(i)
+                                  for i in range(mm_system.getNumConstraints())]
+        return mm_system
 
     def minimize(self, **kwargs):
         if self.constraints_supported():
@@ -233,10 +437,7 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
             return
         system = self.mm_system
         fixed_atoms = set()
-
-        # openmm uses a global tolerance, calculated as ``constraint_violation/constraint_dist``
-        # (since only distance constraints are supported). Here we calculate the necessary value
-        required_tolerance = None
+        self._applied_constraints = None  # unknown until all constraints have been applied
 
         # Constrain atom positions
         for constraint in self.mol.constraints:
@@ -250,10 +451,6 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
                                      constraint.a2.index,
                                      opm.pint2simtk(constraint.value))
 
-                if required_tolerance is None:
-                    required_tolerance = 1e-5
-                required_tolerance = min(required_tolerance, constraint.tolerance/constraint.value)
-
             elif constraint.desc == 'hbonds':
                 continue  # already dealt with at system creation time
 
@@ -281,13 +478,28 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
                     ic += 1
 
         self._constraints_set = True
-        self._required_tolerance = required_tolerance
+        self._applied_constraints = self._get_constraint_key()
+        self._required_tolerance = self._get_required_tolerance()
 
-    @staticmethod
-    def _make_dummy_integrator():
-        from simtk import unit as stku
-        from simtk import openmm
-        return openmm.VerletIntegrator(2.0 * stku.femtoseconds)
+    def _get_required_tolerance(self):
+        """ OpenMM uses a global constraint tolerance, calculated as
+        ``constraint_violation/constraint_dist`` (since only distance constraints are supported).
+        Here we calculate the necessary value.
+        """
+        required_tolerance = None
+        for constraint in self.mol.constraints:
+            if constraint.desc == 'distance':
+                if required_tolerance is None:
+                    required_tolerance = 1e-5
+                required_tolerance = min(required_tolerance, constraint.tolerance/constraint.value)
+        return required_tolerance
+
+    DUMMY_TIMESTEP = 2.0 * u.fs
+
+    def _make_dummy_integrator(self):
+        integrator = opm.make_reconfigurable_integrator()
+        opm.configure_integrator(integrator, self.DUMMY_TIMESTEP)
+        return integrator
 
     def _set_openmm_state(self):  # TODO: periodic state
         self.sim.context.setPositions(opm.pint2simtk(self.mol.positions))
@@ -304,16 +516,13 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
         if get_positions or get_velocities:
             state = self.sim.context.getState(getPositions=get_positions,
                                               getVelocities=get_velocities)
+
+            # copy whole arrays straight into the molecule's storage - no per-atom updates
             if get_positions:
-                positions = state.getPositions()
+                self.mol.positions_raw = opm.simtk2raw(state.getPositions(asNumpy=True))
             if get_velocities:
-                velocities = state.getVelocities()
-
-            for iatom, atom in enumerate(self.mol.atoms):
-                if positions != False: #this is weird because of numpy comparisons
-                    atom.position = opm.simtk2pint(positions[iatom])
-                if velocities != False:
-                    atom.momentum = opm.simtk2pint(velocities[iatom]) * atom.mass
+                velocities = opm.simtk2raw(state.getVelocities(asNumpy=True))
+                self.mol.momenta_raw = velocities * self._raw_masses()[:, None]
 
         if time is True:
             if state is None:
@@ -325,6 +534,13 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
         if time:
             self.mol.time = time
 
+    def _raw_masses(self):
+        """ np.ndarray: atomic masses as plain numbers, in units so that (with velocities in MDT's
+        default units) ``masses * velocities`` is in ``u.default.momentum`` units
+        """
+        massunits = u.default.momentum / (u.default.length / u.default.time)
+        return self.mol.masses.value_in(massunits)
+
     def _get_system_params(self):
         """ Translates the spec from MMBase into system parameter keywords for createSystem
         """
@@ -397,3 +613,26 @@ class OpenMMPotential(MMBase, opm.OpenMMPickleMixin):
             properties[native_str('Threads')] = native_str(self.params.num_cpus)
 
         return platform, properties
+
+
+def _forcefield_key(struc):
+    """ Hash the force field parameters in a parmed structure
+
+    Args:
+        struc (parmed.Structure): structure to hash
+
+    Returns:
+        str: hex digest identifying the parameters
+    """
+    sha = hashlib.sha1()
+    for atom in struc.atoms:
+        sha.update(repr((atom.name, atom.type, atom.charge, atom.mass, atom.rmin, atom.epsilon,
+                         atom.rmin_14, atom.epsilon_14, atom.solvent_radius, atom.screen)
+                        ).encode('utf-8'))
+    for listname in _TERM_LISTS:
+        for term in getattr(struc, listname, ()):
+            atoms = [getattr(term, 'atom%d' % i).idx
+                     for i in range(1, 6) if hasattr(term, 'atom%d' % i)]
+            sha.update(repr((listname, atoms, getattr(term, 'type', None))).encode('utf-8'))
+    sha.update(repr(struc.box).encode('utf-8'))
+    return sha.hexdigest()
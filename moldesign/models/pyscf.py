@@ -92,6 +92,7 @@ class PySCFPotential(QMBase):
 
     FORCE_UNITS = u.hartree / u.bohr
     _PKG = packages.pyscf
+    CACHEABLE = True
 
     @mdt.utils.kwargs_from(QMBase)
     def __init__(self, **kwargs):
@@ -101,24 +102,23 @@ class PySCFPotential(QMBase):
         self.kernel = None
         self.logs = StringIO()
         self.logger = self._get_logger('PySCF interface')
+        self._pyscfmol_key = None
+        self._guess_history = []
 
     @packages.pyscf.runsremotely(is_imethod=True, persist_refs=True)
     def calculate(self, requests=None):
         self.logger = self._get_logger('PySCF calc')
         do_forces = 'forces' in requests
         if do_forces and self.params.theory not in FORCE_CALCULATORS:
-            raise ValueError('Forces are only available for the following theories:'
-                             ','.join(FORCE_CALCULATORS))
+            raise ValueError('Forces are only available for the following theories: %s'
+                             % ', '.join(FORCE_CALCULATORS))
         if do_forces:
             force_calculator = FORCE_CALCULATORS[self.params.theory]
 
-        self.prep(force=True)  # rebuild every time
+        self.prep(force=True)  # update the geometry every time
 
         # Set up initial guess
-        if self.params.wfn_guess == 'stored':
-            dm0 = self.params.initial_guess.density_matrix_ao
-        else:
-            dm0 = None
+        dm0 = self._get_initial_guess()
 
         # Compute reference WFN (if needed)
         refobj = self.pyscfmol
@@ -127,6 +127,7 @@ class PySCFPotential(QMBase):
                                            refobj)
             kernel, failures = self._converge(reference, dm0=dm0)
             refobj = self.reference = kernel
+            self._record_guess(kernel)
         else:
             self.reference = None
 
@@ -138,6 +139,7 @@ class PySCFPotential(QMBase):
             self.kernel = theory
         else:
             self.kernel, failures = self._converge(theory, dm0=dm0)
+            self._record_guess(self.kernel)
 
         # Compute forces (if requested)
         if do_forces:
@@ -153,6 +155,111 @@ class PySCFPotential(QMBase):
 
         return props
 
+    @packages.pyscf.runsremotely(is_imethod=True)
+    def calculate_batch(self, positions, requests=None):
+        """ Calculate the energy (and forces) of many different conformations of the molecule.
+
+        For SCF theories, each conformation's SCF starts from the previous conformation's
+        converged density matrix, which usually saves most of the SCF iterations when
+        neighboring conformations are similar (e.g., along a scan or trajectory). Only energies
+        and forces are computed - no wavefunction analysis is performed.
+
+        Args:
+            positions (u.Array[length]): coordinates of each conformation
+               (shape: ``(num_conformations, num_atoms, 3)``)
+            requests (List[str]): any of ``potential_energy`` and ``forces`` (default: both)
+
+        Returns:
+            utils.DotDict: the requested properties, stacked along a new first axis
+        """
+        if self.params.theory not in IS_SCF:
+            return super().calculate_batch(positions, requests=requests)
+
+        requests = self._get_batch_requests(requests)
+        unsupported = set(requests).difference(['potential_energy', 'forces'])
+        if unsupported:
+            raise ValueError("Can't calculate %s in a batch" % ', '.join(unsupported))
+        do_forces = 'forces' in requests
+        if do_forces and self.params.theory not in FORCE_CALCULATORS:
+            raise ValueError('Forces are only available for the following theories: %s'
+                             % ', '.join(FORCE_CALCULATORS))
+
+        coords = self._get_batch_coordinates(positions)
+        energies = np.zeros(len(coords))
+        forces = np.zeros(coords.shape)
+
+        if self.params.wfn_guess == 'stored':
+            dm0 = self.params.initial_guess.density_matrix_ao
+        else:
+            dm0 = None
+
+        with self._batch_state():
+            for iconf, conformation in enumerate(coords):
+                self.mol.positions_raw = conformation
+                self.prep(force=True)
+                theory = self._build_theory(self.params.theory, self.pyscfmol)
+                kernel, failures = self._converge(theory, dm0=dm0)
+                dm0 = kernel.make_rdm1()
+                energies[iconf] = kernel.e_tot
+                if do_forces:
+                    forces[iconf] = -FORCE_CALCULATORS[self.params.theory](kernel).grad()
+
+        result = mdt.utils.DotDict()
+        if 'potential_energy' in requests:
+            result.potential_energy = (energies * u.hartree).defunits()
+        if do_forces:
+            result.forces = (forces * self.FORCE_UNITS).defunits()
+        return result
+
+    def _get_initial_guess(self):
+        """ Get the initial density matrix for the next SCF calculation.
+
+        If ``store_orb_guesses`` is set, the density matrices from previous calculations are
+        kept in memory, and the next one is predicted from up to ``guess_extrapolation`` of them
+        with the "always stable predictor-corrector" (ASPC) scheme of J. Kolafa, J. Comput. Chem.
+        25, 335 (2004). The extrapolation is only used if the same coefficients also predict the
+        molecule's current geometry better than the last geometry does - otherwise (e.g., during
+        a minimizer's line search) the last density matrix is used as is.
+
+        Returns:
+            np.ndarray: initial guess density matrix (or None to use PySCF's default guess)
+        """
+        history = self._guess_history
+        if self.params.store_orb_guesses and history:
+            if history[-1][0] != self._pyscfmol_key:  # the molecule or model has changed
+                del history[:]
+            else:
+                return self._extrapolate_guess()
+
+        if self.params.wfn_guess == 'stored':
+            return self.params.initial_guess.density_matrix_ao
+        else:
+            return None
+
+    def _extrapolate_guess(self):
+        history = self._guess_history[-max(self.params.get('guess_extrapolation', 1), 1):]
+        last_positions, last_dm = history[-1][1:]
+        if len(history) == 1:
+            return last_dm
+
+        coeffs = aspc_coefficients(len(history))
+        positions = self.mol.positions.value_in(u.angstrom)
+        predicted = sum(c * pos for c, (key, pos, dm) in zip(coeffs, reversed(history)))
+        if np.abs(predicted - positions).max() >= np.abs(last_positions - positions).max():
+            return last_dm
+        else:
+            return sum(c * dm for c, (key, pos, dm) in zip(coeffs, reversed(history)))
+
+    def _record_guess(self, kernel):
+        """ Store the converged density matrix for extrapolating future initial guesses
+        """
+        if not self.params.store_orb_guesses:
+            return
+        self._guess_history.append((self._pyscfmol_key,
+                                    self.mol.positions.value_in(u.angstrom),
+                                    kernel.make_rdm1()))
+        del self._guess_history[:-max(self.params.get('guess_extrapolation', 1), 1)]
+
     def _get_properties(self, ref, kernel, grad):
         """ Analyze calculation results and return molecular properties
 
@@ -272,9 +379,28 @@ class PySCFPotential(QMBase):
                 raise ValueError('Parameter "%s" is required' % p)
 
         if self._prepped and not force: return
-        self.pyscfmol = self._build_mol()
+        key = self._get_pyscfmol_key()
+        if (self.pyscfmol is not None and key == self._pyscfmol_key
+                and self.params.get('symmetry', None) is None
+                and hasattr(self.pyscfmol, 'set_geom_')):
+            # only the coordinates have changed - keep the parsed basis set
+            self.pyscfmol.set_geom_(self.mol.positions.value_in(u.angstrom), unit='Angstrom')
+        else:
+            self.pyscfmol = self._build_mol()
+            self._pyscfmol_key = key
         self._prepped = True
 
+    def _get_pyscfmol_key(self):
+        """ Everything other than the coordinates that the PySCF molecule is built from (plus
+        the theory, since it determines the form of the density matrix)
+        """
+        return (tuple(atom.atnum for atom in self.mol.atoms),
+                self.params.basis,
+                self.params.get('symmetry', None),
+                self.get_formal_charge(),
+                self.params.theory,
+                self.params.get('reference', None))
+
     def _build_mol(self):
         """TODO: where does charge go? Model or molecule?"""
         pyscfmol = mol_to_pyscf(self.mol, self.params.basis,
@@ -493,6 +619,29 @@ class PySCFPotential(QMBase):
         return Logger(logname)
 
 
+def aspc_coefficients(num):
+    """ Coefficients for the "always stable predictor-corrector" extrapolation of the next value
+    in a series (J. Kolafa, J. Comput. Chem. 25, 335 (2004))
+
+    Args:
+        num (int): number of previous values to extrapolate from
+
+    Returns:
+        np.ndarray: coefficients, starting with the most recent value's
+
+    Examples:
+        >>> aspc_coefficients(2)  # linear extrapolation
+        array([ 2., -1.])
+    """
+    from scipy.special import binom
+
+    if num == 1:
+        return np.ones(1)
+    k = num - 2
+    j = np.arange(1, num + 1)
+    return (-1.0)**(j+1) * j * binom(2*k + 4, k + 2 - j) / binom(2*k + 2, k + 1)
+
+
 def _get_multiconf_dipoles(basis, mcstate, nstates):
     """ Compute dipoles and transition dipoles. Adapted from PySCF examples
 
@@ -12,7 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+
+import numpy as np
+
 import moldesign as mdt
+from .. import units as u
 from ..molecules import MolecularProperties
 from ..utils import exports
 
@@ -25,7 +30,17 @@ class QMMMEmbeddingBase(QMMMBase):
     To use any of this classes' subclasses, the MM models must support the ability to
     calculate the internal energies and interaction energies between subsystems,
     using the ``calculation_groups`` parameter.
+
+    The subsystems' atoms are mapped onto the full molecule's atoms by index arrays: the MM
+    subsystem (and any subsystem containing all of the molecule's atoms) shares the full
+    molecule's position array outright, and the other subsystems' positions are copied with a
+    single vectorized assignment. By default, the QM and MM calculations run concurrently (the MM
+    calculation runs in a separate thread), so that each step takes about as long as the QM
+    calculation alone.
     """
+    PARAMETERS = QMMMBase.PARAMETERS + [
+        mdt.parameters.Parameter('concurrent', 'Calculate QM and MM subsystems concurrently',
+                                 default=True, type=bool)]
 
     def __init__(self, *args, **kwargs):
         super(QMMMEmbeddingBase, self).__init__(*args, **kwargs)
@@ -34,35 +49,66 @@ class QMMMEmbeddingBase(QMMMBase):
         self.qm_atoms = None
         self.qm_link_atoms = None
         self._qm_index_set = None
+        self._qm_indices = None  # index of each QM atom in the full molecule
+        self._qm_rows = None  # index of each QM atom in the QM subsystem
+        self._link_qm_indices = None  # QM atom bonded to each link atom
+        self._link_mm_indices = None  # MM atom replaced by each link atom
 
     # TODO: add `qm_atom_indices` to QMMMBase parameters
 
     def calculate(self, requests):
         self.prep()
-
-        self.mmmol.positions = self.mol.positions
         self._set_qm_positions()
-
-        qmprops = self.qmmol.calculate(requests)
-        mmprops = self.mmmol.calculate(requests)
+        qmprops, mmprops = self._calculate_subsystems(requests)
 
         potential_energy = mmprops.potential_energy+qmprops.potential_energy
-        forces = mmprops.forces.copy()
-        for iatom, realatom in enumerate(self.qm_atoms):
-            forces[realatom.index] = qmprops.forces[iatom]
-        for atom in self.qm_link_atoms:
-            self._distribute_linkatom_forces(forces, atom)
+        forces = np.array(mmprops.forces.value_in(u.default.force))
+        qmforces = qmprops.forces.value_in(u.default.force)
+        forces[self._qm_indices] += qmforces[self._qm_rows]
+        if self.qm_link_atoms:
+            mdt.helpers.qmmm.distribute_link_atom_forces(forces,
+                                                         qmforces[len(self._qm_indices):],
+                                                         self._link_qm_indices,
+                                                         self._link_mm_indices)
 
         properties = MolecularProperties(self.mol,
                                          mmprops=mmprops,
                                          qmprops=qmprops,
                                          potential_energy=potential_energy,
-                                         forces=forces)
+                                         forces=forces * u.default.force)
         if 'wfn' in qmprops:
             properties.wfn = qmprops.wfn
 
         return properties
 
+    def _calculate_subsystems(self, requests):
+        """ Run the QM and MM calculations (concurrently, if ``self.params.concurrent`` is set)
+
+        Returns:
+            Tuple[MolecularProperties]: QM properties, MM properties
+        """
+        if not self.params.concurrent:
+            return self.qmmol.calculate(requests), self.mmmol.calculate(requests)
+
+        mmresult = {}
+
+        def calculate_mm():
+            try:
+                mmresult['props'] = self.mmmol.calculate(requests)
+            except Exception as exc:
+                mmresult['error'] = exc
+
+        mmthread = threading.Thread(target=calculate_mm, name='%s MM' % self.mol.name)
+        mmthread.start()
+        try:
+            qmprops = self.qmmol.calculate(requests)
+        finally:
+            mmthread.join()
+
+        if 'error' in mmresult:
+            raise mmresult['error']
+        return qmprops, mmresult['props']
+
     def prep(self):
         if self._prepped:
             return None
@@ -70,11 +116,22 @@ class QMMMEmbeddingBase(QMMMBase):
         self.params.qm_atom_indices.sort()
         self.qm_atoms = [self.mol.atoms[idx] for idx in self.params.qm_atom_indices]
         self._qm_index_set = set(self.params.qm_atom_indices)
+        self._qm_indices = np.array(self.params.qm_atom_indices, dtype='int')
 
         self.qmmol = self._setup_qm_subsystem()
+        if self.qmmol.num_atoms == self.mol.num_atoms:
+            self._share_positions(self.qmmol)
+            self._qm_rows = self._qm_indices
+        else:
+            self._qm_rows = np.arange(len(self._qm_indices))
+        self._link_qm_indices = np.array([atom.metadata.mmpartner.index
+                                          for atom in self.qm_link_atoms], dtype='int')
+        self._link_mm_indices = np.array([atom.metadata.mmatom.index
+                                          for atom in self.qm_link_atoms], dtype='int')
 
         self.mmmol = mdt.Molecule(self.mol,
                                   name='%s MM subsystem' % self.mol.name)
+        self._share_positions(self.mmmol)
         self.mol.ff.copy_to(self.mmmol)
         self._turn_off_qm_forcefield(self.mmmol.ff)
         self.mmmol.set_energy_model(self.params.mm_model)
@@ -82,6 +139,13 @@ class QMMMEmbeddingBase(QMMMBase):
         self._prepped = True
         return True
 
+    def _share_positions(self, submol):
+        """ Make a subsystem that contains all of the molecule's atoms (in the same order) use
+        the molecule's position array directly, so that it never needs to be updated
+        """
+        assert submol.num_atoms == self.mol.num_atoms
+        submol._positions = self.mol._positions
+
     def _setup_qm_subsystem(self):
         raise NotImplemented("%s is an abstract class, use one of its subclasses"
                              % self.__class__.__name__)
@@ -91,51 +155,59 @@ class QMMMEmbeddingBase(QMMMBase):
         self._exclude_internal_qm_ljterms(ff.parmed_obj)
 
     def _exclude_internal_qm_ljterms(self, pmdobj):
-        # Turn off QM/QM LJ interactions (must be done AFTER _remove_internal_qm_bonds)
-        numqm = len(self.params.qm_atom_indices)
-        for i in range(numqm):
-            for j in range(i+1, numqm):
-                pmdobj.atoms[i].exclude(pmdobj.atoms[j])
+        """ Turn off QM/QM LJ interactions (must be done AFTER _remove_internal_qm_bonds)
+
+        This is equivalent to calling ``Atom.exclude`` for every pair of QM atoms, but adds each
+        atom's exclusions in a single step.
+        """
+        qmatoms = [pmdobj.atoms[idx] for idx in self.params.qm_atom_indices]
+        for i, pmdatom in enumerate(qmatoms):
+            pmdatom._exclusion_partners.extend(qmatoms[:i] + qmatoms[i+1:])
 
     def _remove_internal_qm_bonds(self, pmdobj):
+        """ Turn off bonded terms between QM atoms.
+
+        Bonds are kept in the structure with a zero force constant rather than deleted, because
+        ParmEd assigns nonbonded exclusions (for the QM atoms' MM neighbors, too) from the bond
+        graph.
+        """
+        import parmed
+
+        nobond = parmed.BondType(0.0, 1.0, list=pmdobj.bond_types)
+        pmdobj.bond_types.append(nobond)
+
         for i, iatom in enumerate(self.params.qm_atom_indices):
             pmdatom = pmdobj.atoms[iatom]
-            allterms = ((pmdatom.bonds, 2), (pmdatom.angles, 3),
-                        (pmdatom.dihedrals, 4), (pmdatom.impropers, 4))
+            for bond in pmdatom.bonds:
+                if self._term_in_qm_system(bond, 2):
+                    bond.type = nobond
 
+            allterms = ((pmdatom.angles, 3), (pmdatom.dihedrals, 4), (pmdatom.impropers, 4))
             for termlist, numatoms in allterms:
                 for term in termlist[:]:  # make a copy so it doesn't change during iteration
                     if self._term_in_qm_system(term, numatoms):
                         term.delete()
-
-    @staticmethod
-    def _distribute_linkatom_forces(fullforces, linkatom):
-        """ Distribute forces according to the apparently indescribable and unciteable "lever rule"
-        """
-        # TODO: CHECK THIS!!!!
-
-        mmatom = linkatom.metadata.mmatom
-        qmatom = linkatom.metadata.mmpartner
-        dfull = mmatom.distance(qmatom)
-        d_mm = linkatom.distance(mmatom)
-
-        p = (dfull - d_mm)/dfull
-        fullforces[qmatom.index] += p*linkatom.force
-        fullforces[mmatom.index] += (1.0-p) * linkatom.force
+        pmdobj.prune_empty_terms()  # remove the deleted terms from the structure's lists too
 
     def _set_qm_positions(self):
-        for qmatom, realatom in zip(self.qmmol.atoms, self.qm_atoms):
-            qmatom.position = realatom.position
-        mdt.helpers.qmmm.set_link_atom_positions(self.qm_link_atoms)
+        if self.qmmol._positions is self.mol._positions:
+            return
+
+        positions = self.mol.positions_raw
+        qmpositions = self.qmmol.positions_raw
+        qmpositions[self._qm_rows] = positions[self._qm_indices]
+        if self.qm_link_atoms:
+            qmpositions[len(self._qm_rows):] = mdt.helpers.qmmm.link_atom_positions(
+                    positions, self._link_qm_indices, self._link_mm_indices)
 
     def _term_in_qm_system(self, t, numatoms):
         """ Check if an FF term is entirely within the QM subsystem """
         for iatom in range(numatoms):
             attrname = 'atom%i' % (iatom + 1)
-            if not getattr(t, attrname).idx in self._qm_index_set:
-                return True
+            if getattr(t, attrname).idx not in self._qm_index_set:
+                return False
         else:
-            return False
+            return True
 
 
 @exports
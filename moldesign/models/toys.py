@@ -53,6 +53,22 @@ class Spring(EnergyModelBase):
         return {'potential_energy': pe,
                 'forces': forcearray}
 
+    def calculate_batch(self, positions, requests=None):
+        self.prep()
+        requests = self._get_batch_requests(requests)
+        coords = self._get_batch_coordinates(positions) * u.default.length
+
+        dvec = coords[:, 1] - coords[:, 0]
+        dist = np.sqrt((dvec**2).sum(axis=1))
+        stretch = dist - self.params.d0
+        result = mdt.utils.DotDict()
+        if 'potential_energy' in requests:
+            result.potential_energy = (0.5 * self.params.k * stretch**2).defunits()
+        if 'forces' in requests:
+            f = self.params.k * dvec * (stretch / dist)[:, None]
+            result.forces = u.array([f, -f]).transpose(1, 0, 2).defunits()
+        return result
+
 
 @exports
 class HarmonicOscillator(EnergyModelBase):
@@ -74,3 +90,17 @@ class HarmonicOscillator(EnergyModelBase):
         forces = np.zeros((self.mol.num_atoms, 3)) * u.default.force
         forces[:, 0] = - self.params.k * self.mol.positions[:, 0]
         return dict(potential_energy=energy, forces=forces)
+
+    def calculate_batch(self, positions, requests=None):
+        self.prep()
+        requests = self._get_batch_requests(requests)
+        x = self._get_batch_coordinates(positions)[:, :, 0] * u.default.length
+
+        result = mdt.utils.DotDict()
+        if 'potential_energy' in requests:
+            result.potential_energy = (0.5 * self.params.k * (x**2).sum(axis=1)).defunits()
+        if 'forces' in requests:
+            forces = np.zeros((x.shape[0], self.mol.num_atoms, 3)) * u.default.force
+            forces[:, :, 0] = -self.params.k * x
+            result.forces = forces
+        return result
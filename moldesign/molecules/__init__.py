@@ -16,3 +16,4 @@ from .chain import *
 from .primary_structure import *
 from .molecule import *
 from .trajectory import *
+from .selection import *
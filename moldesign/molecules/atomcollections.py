@@ -57,13 +57,21 @@ class AtomGroup(object):
     @property
     def heavy_atoms(self):
         """ AtomList: a list of all heavy atoms (i.e., non-hydrogen) in this object """
-        return AtomList([a for a in self.atoms if a.atnum != 1])
+        mol, indices = self._molecule_indices()
+        if mol is None:
+            return AtomList([a for a in self.atoms if a.atnum != 1])
+        atnums = mol.atnums if indices is None else mol.atnums[indices]
+        return self._select(atnums != 1)
 
     @property
     def mass(self):
         """ u.Scalar[mass]: total mass of this object
         """
-        return u.unitsum(a.mass for a in self.atoms)
+        mol, indices = self._molecule_indices()
+        if mol is None:
+            return u.unitsum(a.mass for a in self.atoms)
+        masses = mol.masses if indices is None else mol.masses[indices]
+        return masses.sum()
 
     @property
     def momentum(self):
@@ -113,6 +121,10 @@ class AtomGroup(object):
             else:
                 raise ValueError("Invalid keyword '%s': valid values are %s" % (key, KEYS))
 
+        mol, indices = self._molecule_indices()
+        if mol is not None:
+            return self._get_atoms_from_columns(mol, indices, keywords, queries)
+
         result = mdt.AtomList()
         for atom in atoms:
             for field, val in queries.items():
@@ -123,6 +135,87 @@ class AtomGroup(object):
 
         return result
 
+    # atom attributes that can be compared directly with the molecule's columns
+    _ATOM_COLUMNS = {'atnum': 'atnums', 'atomic_number': 'atnums', 'name': 'atom_names',
+                     'mass': 'masses', 'formal_charge': 'formal_charges'}
+
+    def _get_atoms_from_columns(self, mol, indices, keywords, queries):
+        """ Vectorized implementation of :meth:`get_atoms` for atoms that all belong to one molecule
+
+        Each residue is only checked once; the results are mapped onto the atoms through
+        ``mol.residue_indices``.
+        """
+        residue_indices = mol.residue_indices if indices is None else mol.residue_indices[indices]
+        mask = np.ones(self.num_atoms, dtype='bool')
+
+        for key in keywords:
+            residue_matches = np.array([res.type == key for res in mol.residues], dtype='bool')
+            mask &= residue_matches[residue_indices]
+
+        for field, val in queries.items():
+            residue_matches = np.array([getattr(res, field, None) == val for res in mol.residues],
+                                       dtype='bool')
+            mask &= (self._atom_field_matches(mol, indices, field, val) |
+                     residue_matches[residue_indices])
+
+        return self._select(mask)
+
+    def _atom_field_matches(self, mol, indices, field, val):
+        columnname = self._ATOM_COLUMNS.get(field, None)
+        if columnname in ('masses', 'formal_charges') and not hasattr(val, 'units'):
+            columnname = None  # let the atoms handle comparisons with bare numbers
+
+        if columnname is not None:
+            column = getattr(mol, columnname)
+            return np.asarray(column == val if indices is None else column[indices] == val,
+                              dtype='bool')
+        elif field in ('symbol', 'element', 'elem'):
+            atnums = mol.atnums if indices is None else mol.atnums[indices]
+            return atnums == mdt.data.ATOMIC_NUMBERS.get(val, -1)
+        else:
+            return np.array([getattr(atom, field, None) == val for atom in self.atoms],
+                            dtype='bool')
+
+    def select(self, expression, indices=False):
+        """ Select atoms with a selection expression (see :class:`moldesign.Selection` for the
+        syntax). Compiled expressions are cached, so repeated selections are fast.
+
+        Args:
+            expression (str or moldesign.Selection): the selection
+            indices (bool): if True, return the selected atoms' indices in their molecule
+               instead of the atoms themselves
+
+        Returns:
+            AtomList or np.ndarray[int]: the selected atoms from this object (or their indices)
+
+        Raises:
+            ValueError: if the expression is invalid, or if this object's atoms aren't all
+               part of the same molecule
+
+        Examples:
+            >>> mol.select('protein and name CA and within 8 of resname LIG')
+            >>> mol.chains['A'].select('backbone', indices=True)
+        """
+        mol, myindices = self._molecule_indices()
+        if mol is None:
+            raise ValueError('Selections can only be made from atoms in the same molecule')
+        mask = mdt.Selection.compile(expression).mask(mol)
+        if myindices is not None:
+            mask = mask[myindices]
+
+        if not indices:
+            return self._select(mask)
+        elif myindices is None:
+            return np.nonzero(mask)[0]
+        else:
+            return myindices[mask]
+
+    def _select(self, mask):
+        """ AtomList: the atoms for which ``mask`` is True
+        """
+        atoms = self.atoms
+        return mdt.AtomList(atoms[i] for i in np.nonzero(mask)[0].tolist())
+
     def calc_distance_array(self, other=None):
         """ Calculate an array of pairwise distance between all atoms in self and other
 
@@ -173,8 +266,37 @@ class AtomGroup(object):
             >>> distance = self.distance(other)
             >>> distance == self.calc_distance_array(other).min()
         """
-        distance_array = self.calc_distance_array(other)
-        return distance_array.min()
+        if not isinstance(other, AtomGroup):  # e.g., a single atom
+            return self.calc_distance_array(other).min()
+
+        index, lookup = other._neighbor_search()
+        mask = None if lookup is None else lookup >= 0  # skip indexed atoms that aren't in other
+        return index.min_distance(self._raw_positions(), mask) * u.default.length
+
+    def calc_contact_map(self, radius, other=None):
+        """ Find all pairs of atoms within a given distance of each other.
+
+        This uses a spatial index, so it's much faster and uses much less memory than
+        thresholding :meth:`calc_distance_array` for large systems.
+
+        Args:
+            radius (u.Scalar[length]): contact distance
+            other (AtomContainer): object to find contacts with (default: self)
+
+        Returns:
+            scipy.sparse.csr_matrix: sparse boolean matrix; element ``[i, j]`` is True if
+               ``self.atoms[i]`` is within ``radius`` of ``other.atoms[j]``
+
+        Example:
+            >>> contacts = self.calc_contact_map(radius, other)
+            >>> contacts[i, j] == (self.atoms[i].distance(other.atoms[j]) <= radius)
+        """
+        other = utils.if_not_none(other, self)
+        radius = radius.value_in(u.default.length)
+        # query the (possibly molecule-wide) index around our atoms, keeping only other's atoms
+        index, lookup = other._neighbor_search()
+        return index.point_contacts(self._raw_positions(), radius,
+                                    lookup=lookup, num_columns=other.num_atoms)
 
     @property
     def center_of_mass(self):
@@ -182,13 +304,9 @@ class AtomGroup(object):
         if self.num_atoms == 0:  # nicer exception than divide-by-zero
             raise ValueError('"%s" has no atoms' % str(self))
 
-        total_mass = 0.0 * u.default.mass
-        com = np.zeros(3) * u.default.length * u.default.mass
-        for atom in self.atoms:
-            total_mass += atom.mass
-            com += atom.position * atom.mass
-        com = com / total_mass
-        return com
+        positions, masses = self._raw_positions_and_masses()
+        com = masses.dot(positions) / masses.sum()
+        return com * u.default.length
 
     @center_of_mass.setter
     def center_of_mass(self, value):
@@ -197,6 +315,70 @@ class AtomGroup(object):
 
     com = center_of_mass  # synonym
 
+    def _raw_positions(self):
+        """ Get the positions of these atoms as a plain array in the default unit system
+
+        If the atoms all belong to the same molecule, positions are sliced from the molecule's
+        array rather than being collected atom-by-atom.
+        """
+        mol, indices = self._molecule_indices()
+        if mol is None:
+            return u.array([atom.position for atom in self.atoms]).value_in(u.default.length)
+        elif indices is None:
+            return mol.positions_raw
+        else:
+            return mol.positions_raw[indices]
+
+    def _raw_positions_and_masses(self):
+        """ Get the positions and masses of these atoms as plain arrays in the default unit system
+        """
+        mol, indices = self._molecule_indices()
+        if mol is None:
+            masses = np.array([atom.mass.value_in(u.default.mass) for atom in self.atoms])
+        else:
+            masses = mol.masses.value_in(u.default.mass)
+            if indices is not None:
+                masses = masses[indices]
+        return self._raw_positions(), masses
+
+    def _molecule_indices(self):
+        """ Find the molecule that all of these atoms belong to, so that their data can be sliced
+        from the molecule's arrays rather than being collected atom-by-atom.
+
+        Returns:
+            Tuple[moldesign.Molecule, np.ndarray]: the molecule and the atoms' indices in it
+               (the indices are ``None`` if this object IS the molecule), or ``(None, None)`` if
+               the atoms don't all belong to the same molecule
+        """
+        if self.num_atoms == 0:
+            return None, None
+        mol = self.atoms[0].molecule
+        if mol is self:
+            return mol, None
+        elif mol is not None and all(atom.molecule is mol for atom in self.atoms):
+            return mol, np.array([atom.index for atom in self.atoms], dtype='int')
+        else:
+            return None, None
+
+    def _neighbor_search(self):
+        """ Get a spatial index for searching this object's atoms.
+
+        Returns:
+            Tuple[moldesign.geom.NeighborIndex, np.ndarray]: index containing (at least) these atoms,
+               and a lookup table from the index's positions to this object's atoms (``None`` if
+               they're the same)
+        """
+        mol, indices = self._molecule_indices()
+        if mol is None:
+            return mdt.geom.NeighborIndex(self._raw_positions()), None
+        elif indices is None:
+            return mol.neighbor_index, None
+        else:
+            # search the molecule's cached index, and filter out atoms that aren't in this object
+            lookup = np.full(mol.num_atoms, -1, dtype='int64')
+            lookup[indices] = np.arange(self.num_atoms)
+            return mol.neighbor_index, lookup
+
     def _getatom(self, a):
         """ Given an atom's name, index, or object, return the atom object
         """
@@ -250,6 +432,17 @@ class AtomGroup(object):
         Returns:
             AtomList: list of copied atoms
         """
+        mol, indices = self._molecule_indices()
+        if mol is not None and (indices is None or len(np.unique(indices)) == len(indices)):
+            with utils.paused_gc():
+                return self._copy_atoms_from_molecule(mol, indices)
+        else:
+            return self._copy_atoms_by_deepcopy()
+
+    def _copy_atoms_by_deepcopy(self):
+        """ General implementation of :meth:`copy_atoms`, for atoms that don't all belong to the
+        same molecule: shallow-copies the atoms' substructure, then deep-copies it.
+        """
         graph = {}
         memo = {'bondgraph':graph}
         for atom in self.atoms:
@@ -260,6 +453,52 @@ class AtomGroup(object):
             atom.bond_graph = newbonds[atom]
         return AtomList(newatoms)
 
+    def _copy_atoms_from_molecule(self, mol, indices):
+        """ Fast path for :meth:`copy_atoms` when all of the atoms belong to the same molecule.
+
+        Rather than deep-copying the atoms (and everything they refer to), their coordinates and
+        per-atom data are sliced out of the molecule's arrays, their bonds are remapped from the
+        molecule's bond topology, and only the residues and chains are (shallowly) copied.
+        """
+        if indices is None:
+            indices = np.arange(mol.num_atoms)
+        positions = mol.positions[indices]
+        momenta = mol.momenta[indices]
+        columns = [(attr, getattr(mol, getattr(mdt.Atom, attr).columnname)[indices])
+                   for attr in mdt.Atom._COLUMNS]
+
+        memo = {}
+        newatoms = []
+        for i, atom in enumerate(self.atoms):
+            newatom = atom.__class__.__new__(atom.__class__)
+            newatom.__dict__.update(atom.__dict__)
+            newatom.molecule = newatom.index = newatom.residue = None
+            newatom._position = positions[i]
+            newatom._momentum = momenta[i]
+            for attr, values in columns:
+                setattr(newatom, attr, values[i])
+            newatom.bond_graph = {}
+            newatom.metadata = copy.deepcopy(atom.metadata) if atom.metadata else utils.DotDict()
+
+            if atom.residue is not None:
+                if atom.residue not in memo:
+                    atom.residue._subcopy(memo)
+                memo[atom.residue].add(newatom)
+            newatoms.append(newatom)
+
+        # copy the bonds between these atoms, re-indexed by their positions in the new list
+        newindices = np.full(mol.num_atoms, -1, dtype='int')
+        newindices[indices] = np.arange(len(indices))
+        topology = mol.bond_graph.topology
+        bonds = newindices[topology.bonds]
+        internal = (bonds >= 0).all(axis=1)
+        for i, j, order in zip(bonds[internal, 0].tolist(), bonds[internal, 1].tolist(),
+                               topology.bond_orders[internal].tolist()):
+            newatoms[i].bond_graph[newatoms[j]] = order
+            newatoms[j].bond_graph[newatoms[i]] = order
+
+        return AtomList(newatoms)
+
     ###########################################
     # Routines to modify the geometry
     def rotate(self, angle, axis, center=None):
@@ -314,11 +553,15 @@ class AtomGroup(object):
         else:
             filter_atoms = set()
 
-        distances = self.calc_distance_array(other=other)
-        mindists = distances.min(axis=0)
+        index, lookup = other._neighbor_search()
+        found = index.within(self._raw_positions(), radius.value_in(u.default.length))
+        if lookup is not None:  # map from the index's atoms to other.atoms
+            found = np.sort(lookup[found])
+            found = found[found >= 0]
 
-        close_atoms = AtomList(atom for dist,atom in zip(mindists, other.atoms)
-                               if dist <= radius and atom not in filter_atoms)
+        otheratoms = other.atoms
+        close_atoms = AtomList(otheratoms[i] for i in found
+                               if otheratoms[i] not in filter_atoms)
         return close_atoms
 
     def residues_within(self, radius, other=None, include_self=False):
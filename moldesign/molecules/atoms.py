@@ -22,7 +22,8 @@ import moldesign as mdt
 from .. import data, utils
 from .. import units as u
 from ..widgets import WidgetMethod
-from . import toplevel, AtomContainer, AtomList, AtomArray, AtomCoordinate, Bond
+from . import toplevel, AtomContainer, AtomList, AtomArray, AtomColumn, AtomCoordinate, Bond
+from .coord_arrays import _intern_name
 
 
 class AtomPropertyMixin(object):  # TODO: this isn't worth it, just put it back into Atom
@@ -154,6 +155,13 @@ class Atom(AtomPropertyMixin):
     position = AtomArray('_position', 'positions')
     momentum = AtomArray('_momentum', 'momenta')
 
+    # these are stored in the molecule's per-atom arrays once the atom is part of a molecule
+    atnum = AtomColumn('_atnum', 'atnums')
+    mass = AtomColumn('_mass', 'masses')
+    formal_charge = AtomColumn('_formal_charge', 'formal_charges')
+    name = AtomColumn('_name', 'atom_names', convert=_intern_name)
+    _COLUMNS = ('atnum', 'mass', 'formal_charge', 'name')
+
     atomic_number = utils.Synonym('atnum')
 
     draw2d = WidgetMethod('atoms.draw2d')
@@ -167,6 +175,8 @@ class Atom(AtomPropertyMixin):
     def __init__(self, name=None, atnum=None, mass=None, residue=None,
                  formal_charge=None, pdbname=None, pdbindex=None, element=None,
                  metadata=None, position=None, momentum=None):
+        self.molecule = None
+        self.index = None
 
         # Allow user to instantiate an atom as Atom(6) or Atom('C')
         if atnum is None and element is None:
@@ -176,7 +186,7 @@ class Atom(AtomPropertyMixin):
                 element, name = name, None
 
         # Determine the element
-        if atnum:
+        if atnum is not None:
             self.atnum = atnum
             if element:
                 assert atnum == data.ATOMIC_NUMBERS[element.capitalize()], \
@@ -204,8 +214,6 @@ class Atom(AtomPropertyMixin):
         if not hasattr(self.formal_charge, 'units'):
             self.formal_charge *= u.q_e
         self.residue = residue
-        self.molecule = None
-        self.index = None
         if position is None:
             self._position = _position0.copy()
         else:
@@ -256,6 +264,16 @@ class Atom(AtomPropertyMixin):
                 self.residue._subcopy(memo)
             memo[self.residue].add(newatom)
 
+    @property
+    def residue(self):
+        return self._residue
+
+    @residue.setter
+    def residue(self, residue):
+        self._residue = residue
+        if self.molecule is not None:  # keep the molecule's residue_indices column in sync
+            self.molecule._update_residue_indices([self])
+
     @property
     def chain(self):
         if self.residue is not None:
@@ -309,6 +327,9 @@ class Atom(AtomPropertyMixin):
             state['_bond_graph'] = None
             state['_position'] = self.position
             state['_momentum'] = self.momentum
+            for attr in self._COLUMNS:
+                descriptor = getattr(self.__class__, attr)
+                state[descriptor.name] = getattr(self, attr)
         return state
 
     def _set_molecule(self, molecule):
@@ -336,6 +357,13 @@ class Atom(AtomPropertyMixin):
         moleculearray[index, :] = oldarray
         setattr(self, '_' + array_name, None)  # remove the internally stored version
 
+    def _release_column_values(self):
+        """ Discard the atom's own copies of the attributes that are now stored in its molecule's
+        columns (private - the molecule calls this after building its columns)
+        """
+        for attr in self._COLUMNS:
+            self.__dict__.pop(getattr(self.__class__, attr).name, None)
+
     def bond_to(self, other, order):
         """ Create or modify a bond with another atom
 
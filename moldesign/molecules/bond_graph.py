@@ -19,6 +19,8 @@ standard_library.install_aliases()
 from future.utils import PY2
 import collections
 
+import numpy as np
+
 from .. import utils
 
 if not PY2:  # we'll skip the type hints in Python 2
@@ -44,6 +46,7 @@ class AtomBondDict(utils.NewUserDict):
         self._setitem_super(otheratom, order)
         if self.parent is not None:
             self.parent[otheratom]._setitem_super(self.atom, order)
+            self.parent._topology = None
 
     def _setitem_super(self, atom, order):
         super().__setitem__(atom, order)
@@ -52,6 +55,7 @@ class AtomBondDict(utils.NewUserDict):
         self._delitem_super(otheratom)
         if self.parent is not None:
             self.parent[otheratom]._delitem_super(self.atom)
+            self.parent._topology = None
 
     def _delitem_super(self, otheratom):
         super().__delitem__(otheratom)
@@ -65,6 +69,10 @@ class BondGraph(utils.NewUserDict):
          ``bond_graph[b][a] = o``
       2. It has exactly one entry for every atom in the molecule; it does not expose any methods
          for adding or deleting these entries.
+
+    An integer-indexed copy of the graph (see :class:`BondTopology`), for fast graph algorithms,
+    is available as ``bond_graph.topology``. It's created on demand and discarded whenever the
+    bonds change.
     """
     if not PY2:
         __metaclass__ = Mapping['mdt.Atom', AtomBondDict]
@@ -74,6 +82,7 @@ class BondGraph(utils.NewUserDict):
         """
         super().__init__()
         self.molecule = molecule
+        self._topology = None
         self._add_atoms(molecule.atoms)
 
     def __str__(self):
@@ -82,6 +91,14 @@ class BondGraph(utils.NewUserDict):
     def __repr__(self):
         return '<%s>' % self.molecule
 
+    @property
+    def topology(self):
+        """ BondTopology: compact, integer-indexed representation of this bond graph
+        """
+        if self._topology is None:
+            self._topology = BondTopology.from_bond_graph(self)
+        return self._topology
+
     def _add_atoms(self, atoms):
         """ Move bonds defined in the atom to this object.
 
@@ -95,6 +112,7 @@ class BondGraph(utils.NewUserDict):
             atoms (List[moldesign.Atom]): atom to initialize
         """
         add_atoms = [atom for atom in atoms if atom not in self]
+        self._topology = None
         for atom in add_atoms:
             super().__setitem__(atom, AtomBondDict(self, atom))
         for atom in add_atoms:
@@ -111,4 +129,242 @@ class BondGraph(utils.NewUserDict):
         raise NotImplementedError('Bond graphs cannot be manipulated using this method')
 
 
+class BondTopology(object):
+    """ A molecule's bonds, stored as integer arrays in compressed sparse row (CSR) format.
+
+    The neighbors of atom ``i`` are ``neighbors[offsets[i]:offsets[i+1]]`` (in increasing
+    order), and the corresponding bond orders are ``orders[offsets[i]:offsets[i+1]]``. Each bond
+    is also listed once in ``bonds`` (with the lower atom index first).
+
+    This is a snapshot of the bond graph - get a molecule's current topology from
+    ``mol.bond_graph.topology``, which is rebuilt whenever the bonds change.
+
+    Args:
+        num_atoms (int): number of atoms
+        bonds (np.ndarray[int]): indices of the atoms in each bond (shape ``(num_bonds, 2)``)
+        bond_orders (np.ndarray[int]): order of each bond (default: all 1)
+
+    Attributes:
+        offsets (np.ndarray[int]): start of each atom's entries in ``neighbors``
+           (length ``num_atoms+1``)
+        neighbors (np.ndarray[int]): bonded atoms' indices (length ``2*num_bonds``)
+        orders (np.ndarray[int]): bond order for each entry in ``neighbors``
+        bond_indices (np.ndarray[int]): index in ``bonds`` for each entry in ``neighbors``
+        bonds (np.ndarray[int]): atom indices for each bond (shape ``(num_bonds, 2)``)
+        bond_orders (np.ndarray[int]): order of each bond
+    """
+    def __init__(self, num_atoms, bonds, bond_orders=None):
+        bonds = np.sort(np.asarray(bonds, dtype='int').reshape(-1, 2), axis=1)
+        if bond_orders is None:
+            bond_orders = np.ones(len(bonds), dtype='int')
+        bond_orders = np.asarray(bond_orders, dtype='int')
+
+        order = np.lexsort((bonds[:, 1], bonds[:, 0]))
+        self.num_atoms = num_atoms
+        self.bonds = bonds[order]
+        self.bond_orders = bond_orders[order]
+
+        # each bond appears twice: once in each of its atoms' rows
+        rows = np.concatenate((self.bonds[:, 0], self.bonds[:, 1]))
+        cols = np.concatenate((self.bonds[:, 1], self.bonds[:, 0]))
+        entries = np.lexsort((cols, rows))
+        self.neighbors = cols[entries]
+        self.bond_indices = np.tile(np.arange(len(self.bonds)), 2)[entries]
+        self.orders = self.bond_orders[self.bond_indices]
+        self.offsets = np.zeros(num_atoms+1, dtype='int')
+        np.cumsum(np.bincount(rows, minlength=num_atoms), out=self.offsets[1:])
+
+        self._cyclic = None
+        self._fragments = {}
+
+    @classmethod
+    def from_bond_graph(cls, bond_graph):
+        """ Create a topology from a molecule's bond graph, using the atoms' indices
+
+        Args:
+            bond_graph (BondGraph): the bond graph
+
+        Returns:
+            BondTopology: the topology
+        """
+        bonds, orders = [], []
+        for atom, nbrs in bond_graph.items():
+            for nbr, order in nbrs.items():
+                if atom.index < nbr.index:
+                    bonds.append((atom.index, nbr.index))
+                    orders.append(order)
+        return cls(len(bond_graph), bonds, orders)
+
+    @property
+    def num_bonds(self):
+        return len(self.bonds)
+
+    @property
+    def degrees(self):
+        """ np.ndarray[int]: number of bonds to each atom
+        """
+        return np.diff(self.offsets)
+
+    def neighbors_of(self, iatom):
+        """ np.ndarray[int]: indices of the atoms bonded to atom ``iatom``
+        """
+        return self.neighbors[self.offsets[iatom]:self.offsets[iatom+1]]
+
+    def bond_index(self, iatom, jatom):
+        """ Index of the bond between two atoms in ``self.bonds`` (or None if they're not bonded)
+        """
+        start = self.offsets[iatom]
+        pos = start + np.searchsorted(self.neighbors_of(iatom), jatom)
+        if pos < self.offsets[iatom+1] and self.neighbors[pos] == jatom:
+            return self.bond_indices[pos]
+        else:
+            return None
+
+    def csgraph(self):
+        """ scipy.sparse.csr_matrix: the adjacency matrix (with bond orders as its values), for
+        use with :mod:`scipy.sparse.csgraph`
+        """
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.orders, self.neighbors, self.offsets),
+                          shape=(self.num_atoms, self.num_atoms))
+
+    def connected_components(self):
+        """ Find the covalently bonded fragments of the molecule
+
+        Returns:
+            np.ndarray[int]: the index of the component that each atom belongs to
+        """
+        from scipy.sparse.csgraph import connected_components
+        num_components, labels = connected_components(self.csgraph(), directed=False)
+        return labels
+
+    def distances(self, iatom):
+        """ Number of bonds in the shortest path between atom ``iatom`` and every other atom
+
+        Returns:
+            np.ndarray: topological distance to each atom (``np.inf`` for atoms that aren't
+               connected to ``iatom``)
+        """
+        from scipy.sparse.csgraph import shortest_path
+        return shortest_path(self.csgraph(), directed=False, unweighted=True, indices=iatom)
+
+    def shortest_path(self, iatom, jatom):
+        """ Find the shortest chain of bonds between two atoms
+
+        Returns:
+            List[int]: indices of the atoms along the path, from ``iatom`` to ``jatom`` (or None if
+               they aren't connected)
+        """
+        from scipy.sparse.csgraph import breadth_first_order
+        _, predecessors = breadth_first_order(self.csgraph(), iatom, directed=False)
+        if iatom != jatom and predecessors[jatom] < 0:
+            return None
+
+        path = [jatom]
+        while path[-1] != iatom:
+            path.append(predecessors[path[-1]])
+        return [int(i) for i in path[::-1]]
+
+    @property
+    def cyclic_bonds(self):
+        """ np.ndarray[bool]: whether each bond in ``self.bonds`` is part of at least one ring
+        """
+        if self._cyclic is None:
+            self._cyclic = self._find_cyclic_bonds()
+        return self._cyclic
+
+    def is_cyclic(self, iatom, jatom):
+        """ bool: True if the bond between these atoms is part of at least one ring
+        """
+        ibond = self.bond_index(iatom, jatom)
+        if ibond is None:
+            raise ValueError('Atoms %d and %d are not bonded' % (iatom, jatom))
+        return bool(self.cyclic_bonds[ibond])
+
+    @property
+    def ring_atoms(self):
+        """ np.ndarray[bool]: whether each atom is part of at least one ring
+        """
+        inring = np.zeros(self.num_atoms, dtype='bool')
+        inring[self.bonds[self.cyclic_bonds].ravel()] = True
+        return inring
+
+    def _find_cyclic_bonds(self):
+        """ A bond is in a ring if and only if it isn't needed to connect the graph. All bonds not
+        in a spanning forest are in rings, as are the bonds of the forest that lie on the path
+        between the ends of any such bond.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+        # add a "super-root" (index N), bonded to one atom in each component, so that the
+        # whole spanning forest comes from a single search
+        nroot = self.num_atoms
+        _, labels = connected_components(self.csgraph(), directed=False)
+        roots = np.unique(labels, return_index=True)[1]
+        rows = np.concatenate((np.repeat(np.arange(self.num_atoms), self.degrees),
+                               np.full(len(roots), nroot, dtype='int')))
+        cols = np.concatenate((self.neighbors, roots))
+        graph = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(nroot+1, nroot+1))
+        _, parents = breadth_first_order(graph, nroot, directed=False)
+        parents[nroot] = nroot
+
+        # depth of each atom in the forest (by pointer jumping)
+        depths = np.ones(nroot+1, dtype='int')
+        depths[nroot] = 0
+        ancestors = parents.copy()
+        while (ancestors != nroot).any():
+            depths += depths[ancestors]
+            ancestors = ancestors[ancestors]
+
+        # tree bonds are identified by their child atom, in_cycle[child]
+        first, second = self.bonds[:, 0], self.bonds[:, 1]
+        child = np.where(parents[first] == second, first, second)
+        cyclic = parents[child] != np.where(child == first, second, first)
+        in_cycle = np.zeros(nroot+1, dtype='bool')
+        for a, b in self.bonds[cyclic]:
+            while a != b:
+                if depths[a] < depths[b]:
+                    a, b = b, a
+                in_cycle[a] = True
+                a = parents[a]
+
+        return cyclic | in_cycle[child]
+
+    def fragment(self, iatom, jatom):
+        """ Find all atoms on ``iatom``'s side of the ``iatom``-``jatom`` bond
+
+        Args:
+            iatom (int): index of the atom whose side of the bond to return
+            jatom (int): index of the atom on the other side of the bond
+
+        Returns:
+            np.ndarray[int]: sorted indices of all atoms connected to ``iatom`` without going
+               through ``jatom`` (including ``iatom`` itself)
+
+        Raises:
+            ValueError: if the atoms are in a ring (so that the molecule can't be split this way)
+        """
+        key = (iatom, jatom)
+        if key not in self._fragments:
+            self._fragments[key] = self._find_fragment(iatom, jatom)
+        result = self._fragments[key]
+        if result is None:
+            raise ValueError("Atoms %d and %d are in a cyclic moiety" % (iatom, jatom))
+        return result
+
+    def _find_fragment(self, iatom, jatom):
+        from scipy.sparse.csgraph import breadth_first_order
+
+        # cut jatom out of a copy of the graph (csgraph() shares our arrays), then search from iatom
+        graph = self.csgraph().copy()
+        graph.data[self.offsets[jatom]:self.offsets[jatom+1]] = 0
+        graph.data[self.neighbors == jatom] = 0
+        graph.eliminate_zeros()
+        found = breadth_first_order(graph, iatom, directed=False, return_predecessors=False)
 
+        others = self.neighbors_of(jatom)
+        if np.isin(others[others != iatom], found).any():
+            return None
+        else:
+            return np.sort(found)
@@ -168,6 +168,10 @@ class Bond(object):
         """
         bool: True if this bond is in one or more rings
         """
+        mol = self.molecule
+        if mol is not None and self.exists:
+            return mol.bond_graph.topology.is_cyclic(self.a1.index, self.a2.index)
+
         visited = set([self.a2])
 
         def check_for_cycles(atom):
@@ -180,7 +184,7 @@ class Bond(object):
                     if in_cycle:
                         return True
             return False  # if here, not in a cycle
-        check_for_cycles(self.a1)
+        return check_for_cycles(self.a1)
 
 
     def align(self, other, centered=True):
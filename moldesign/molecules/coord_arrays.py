@@ -20,6 +20,22 @@ standard_library.install_aliases()
 This module contains python "descriptors" (nothing to do with chemoinformatic "descriptors") that
 help maintain the links between an atom's coordinates and its molecule's coordinates
 """
+import sys
+
+try:
+    _intern = sys.intern
+except AttributeError:  # python 2
+    _intern = intern
+
+
+def _intern_name(name):
+    """ Intern a string (so that the many copies of common atom names share storage)
+    """
+    try:
+        return _intern(name)
+    except TypeError:  # not a (native) string
+        return name
+
 
 class ProtectedArray(object):
     """
@@ -80,4 +96,50 @@ class AtomCoordinate(object):
 
     def __set__(self, instance, value):
         array = getattr(instance, self.attrname)
-        array[self.index] = value
\ No newline at end of file
+        array[self.index] = value
+
+
+class AtomColumn(object):
+    """
+    Descriptor for per-atom attributes that are stored in columns of the parent molecule.
+
+    An atom that isn't part of a molecule stores the value itself; once it's added to a molecule,
+    the value lives in one of the molecule's arrays (``molecule.<columnname>[atom.index]``), so
+    that it can be queried for all atoms at once.
+
+    Args:
+        atomname (str): name of the attribute used by atoms that aren't part of a molecule
+        columnname (str): name of the corresponding array in the molecule instance
+        convert (callable): applied to values before they are stored
+    """
+    def __init__(self, atomname, columnname, convert=None):
+        self.name = atomname
+        self.columnname = columnname
+        self.convert = convert
+        self.cachename = atomname + '_cached'
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        mol = instance.molecule
+        if mol is None:
+            return getattr(instance, self.name)
+        column = getattr(mol, self.columnname)
+        if not hasattr(column, '_units'):
+            return column.item(instance.index)  # as a python object, not a numpy scalar
+
+        # Creating a new quantity is slow, so the atom keeps the last one it returned and reuses
+        # it for as long as it matches the column
+        magnitude = column._magnitude.item(instance.index)
+        cached = instance.__dict__.get(self.cachename)
+        if cached is None or cached._magnitude != magnitude or cached._units is not column._units:
+            cached = instance.__dict__[self.cachename] = type(column)(magnitude, column._units)
+        return cached
+
+    def __set__(self, instance, value):
+        if self.convert is not None:
+            value = self.convert(value)
+        if instance.molecule is None:
+            setattr(instance, self.name, value)
+        else:
+            getattr(instance.molecule, self.columnname)[instance.index] = value
@@ -32,6 +32,21 @@ from ..min.base import MinimizerBase
 from . import PrimaryStructure, AtomGroup, Bond, HasResidues, BondGraph, MolecularProperties
 from ..widgets import WidgetMethod
 from .coord_arrays import *
+from .coord_arrays import _intern_name
+
+
+def _stack_magnitudes(values, units):
+    """ Stack a list of quantities (one per atom) into a single array of magnitudes in ``units``
+
+    When the values all have the same units (the usual case), they're converted all at once
+    instead of one at a time.
+    """
+    if values and all(isinstance(v, u.MdtQuantity) and v._units == values[0]._units
+                      for v in values):
+        return u.MdtQuantity(np.array([v._magnitude for v in values]),
+                             values[0].units).value_in(units)
+    else:
+        return np.array([v.value_in(units) for v in values])
 
 
 class MolConstraintMixin(object):
@@ -209,7 +224,7 @@ class MolPropertyMixin(object):
     @property
     def num_electrons(self):
         """int: The number of electrons in the system, based on the atomic numbers and self.charge"""
-        return sum(atom.atnum for atom in self.atoms) - self.charge.value_in(u.q_e)
+        return int(self.atnums.sum()) - self.charge.value_in(u.q_e)
 
     @property
     def homo(self):
@@ -386,11 +401,13 @@ class MolTopologyMixin(object):
         """
         if name is None:
             name = self.name + ' copy'
-        newmol = Molecule(self.atoms,
-                          name=name,
-                          pdbname=self.pdbname,
-                          charge=self.charge,
-                          metadata=self.metadata)
+        with utils.paused_gc():
+            newmol = Molecule(self.atoms,
+                              name=name,
+                              pdbname=self.pdbname,
+                              charge=self.charge,
+                              metadata=self.metadata)
+        newmol.bond_graph._topology = self.bond_graph.topology  # same atom indices; read-only
         if self.energy_model is not None:
             newmodel = self._copy_method('energy_model')
             newmol.set_energy_model(newmodel)
@@ -413,14 +430,15 @@ class MolTopologyMixin(object):
     def _rebuild_from_atoms(self):
         """ Rebuild component data structures based on atomic data
         """
+        self.residue_indices = self.chain_indices = None  # rebuilt at the end
         self.is_biomolecule = False
         self.ndims = 3 * self.num_atoms
         self._positions = np.zeros((self.num_atoms, 3)) * u.default.length
         self._momenta = np.zeros((self.num_atoms, 3)) * u.default.momentum
-        self.masses = np.zeros(self.num_atoms) * u.default.mass
-        self.dim_masses = u.broadcast_to(self.masses, (3, self.num_atoms)).T
         self._assign_atom_indices()
+        self.dim_masses = u.broadcast_to(self.masses, (3, self.num_atoms)).T
         self.chains.rebuild_hierarchy()
+        self._assign_residue_indices()
         self._dof = None
         self._topology_changed()
 
@@ -429,15 +447,59 @@ class MolTopologyMixin(object):
         Create geometry-level information based on constituent atoms, and mark the atoms
         as the property of this molecule
         """
-        idim = 0
+        self._build_atom_columns()
         for idx, atom in enumerate(self.atoms):
             atom._set_molecule(self)
             atom.index = idx
-            idim += 3
-            self.masses[idx] = atom.mass
-            # Here, we index the atom arrays directly into the molecule
-            atom._index_into_molecule('_position', self.positions, idx)
-            atom._index_into_molecule('_momentum', self.momenta, idx)
+            atom._release_column_values()
+
+        # Here, we index the atom arrays directly into the molecule
+        for array_name, moleculearray in (('_position', self.positions),
+                                          ('_momentum', self.momenta)):
+            values = [getattr(atom, array_name) for atom in self.atoms]
+            if values and all(isinstance(v, u.MdtQuantity) for v in values):
+                moleculearray.magnitude[:] = _stack_magnitudes(values, moleculearray.units)
+            else:
+                for idx, atom in enumerate(self.atoms):
+                    atom._index_into_molecule(array_name, moleculearray, idx)
+
+    def _build_atom_columns(self):
+        """ Collect the atoms' per-atom attributes into arrays (see :attr:`atnums`, :attr:`masses`,
+        :attr:`formal_charges` and :attr:`atom_names`).
+
+        This needs to happen before the atoms are re-indexed - atoms that already belong to this
+        molecule read their values from the existing arrays.
+        """
+        atoms = self.atoms
+        self.atnums = np.array([atom.atnum for atom in atoms], dtype='int')
+        self.masses = _stack_magnitudes([atom.mass for atom in atoms],
+                                        u.default.mass) * u.default.mass
+        self.formal_charges = _stack_magnitudes([atom.formal_charge for atom in atoms],
+                                                u.q_e) * u.q_e
+        self.atom_names = np.array([_intern_name(atom.name) for atom in atoms], dtype='object')
+
+    def _assign_residue_indices(self):
+        """ Record the index of each atom's residue and chain (run after the primary structure
+        is rebuilt)
+        """
+        self.residue_indices = np.array([atom.residue.index for atom in self.atoms], dtype='int')
+        self.chain_indices = np.array([atom.chain.index for atom in self.atoms], dtype='int')
+
+    def _update_residue_indices(self, atoms):
+        """ Update the residue and chain indices of atoms that were moved to a different residue,
+        or whose residue was moved to a different chain (called by the Atom and Residue setters).
+        Atoms whose residue or chain isn't part of this molecule get an index of -1.
+        """
+        if self.residue_indices is None:  # the hierarchy is being rebuilt
+            return
+        for atom in atoms:
+            if atom.molecule is not self:
+                continue
+            residue, chain = atom.residue, atom.chain
+            self.residue_indices[atom.index] = (residue.index if residue is not None and
+                                                residue.molecule is self else -1)
+            self.chain_indices[atom.index] = (chain.index if chain is not None and
+                                              chain.molecule is self else -1)
 
     def is_identical(self, other, verbose=False):
         """ Test whether two molecules are "identical"
@@ -669,8 +731,20 @@ class MolSimulationMixin(object):
         to_calculate = set(list(requests) + self.energy_model.DEFAULT_PROPERTIES)
         if use_cache:
             to_calculate = to_calculate.difference(self.properties)
+
+        # Check for stored results (see moldesign.models.set_calculation_cache)
+        resultcache = cached = None
+        if use_cache and to_calculate and self.energy_model.CACHEABLE:
+            resultcache = mdt.models.get_calculation_cache()
+        if resultcache is not None:
+            cachekey = resultcache.key(self)
+            cached = resultcache.get(self, to_calculate, key=cachekey)
+
         if len(to_calculate) == 0:
             job = self.properties
+        elif cached is not None:
+            job = cached
+            resultcache = None  # no need to store it again
         else:
             job = self.energy_model.calculate(to_calculate)
 
@@ -683,6 +757,8 @@ class MolSimulationMixin(object):
             else:
                 properties = job
             self.properties.update(properties)
+            if resultcache is not None:
+                resultcache.store(self, self.properties, key=cachekey)
             return self.properties
         else:
             # We're not waiting for the job to complete - return a job object
@@ -958,6 +1034,11 @@ class Molecule(AtomGroup,
         positions (units.Array[length]): Nx3 array of atomic positions
         momenta (units.Array[momentum]): Nx3 array of atomic momenta
         masses (units.Vector[mass]): vector of atomic masses
+        atnums (np.ndarray[int]): vector of atomic numbers
+        formal_charges (units.Vector[charge]): vector of atomic formal charges
+        atom_names (np.ndarray[str]): vector of atom names
+        residue_indices (np.ndarray[int]): index of each atom's residue in ``self.residues``
+        chain_indices (np.ndarray[int]): index of each atom's chain in ``self.chains``
         dim_masses (units.Array[mass]): Nx3 array of atomic masses (for numerical convenience -
            allows you to calculate velocity, for instance, as
            ``velocity = mol.momenta/mol.dim_masses``
@@ -1000,6 +1081,7 @@ class Molecule(AtomGroup,
         self._constraints = None
         self._charge = None
         self._properties = None
+        self._neighbor_index = None
 
         atoms, name = self._get_initializing_atoms(atomcontainer, name, copy_atoms)
 
@@ -1016,11 +1098,12 @@ class Molecule(AtomGroup,
         self.metadata = metadata
         self.electronic_state_index = 0
 
+        if charge is None:
+            charge = getattr(atomcontainer, 'charge', None)
         if charge is not None:
             self.charge = charge
         else:
-            self.charge = getattr(atomcontainer, 'charge',
-                                  u.unitsum(atom.formal_charge for atom in self.atoms))
+            self.charge = u.unitsum(atom.formal_charge for atom in self.atoms)
 
         # Builds the internal memory structures
         self.chains = PrimaryStructure(self)
@@ -1130,13 +1213,70 @@ class Molecule(AtomGroup,
     def velocities(self, value):
         self.momenta = value * self.dim_masses
 
+    @property
+    def positions_raw(self):
+        """ np.ndarray: Nx3 array of atomic positions as plain numbers, in
+        ``u.default.length`` units.
+
+        This is a view of the molecule's position array, not a copy - modifying it in place will
+        move the atoms. It's intended for numerical code that needs to avoid the overhead of
+        unit arithmetic.
+        """
+        return self._positions.magnitude
+
+    @positions_raw.setter
+    def positions_raw(self, value):
+        self._positions.magnitude[:] = value
+
+    @property
+    def momenta_raw(self):
+        """ np.ndarray: Nx3 array of atomic momenta as plain numbers, in
+        ``u.default.momentum`` units (a view, like :attr:`positions_raw`)
+        """
+        return self._momenta.magnitude
+
+    @momenta_raw.setter
+    def momenta_raw(self, value):
+        self._momenta.magnitude[:] = value
+
+    @property
+    def neighbor_index(self):
+        """ moldesign.geom.NeighborIndex: spatial index of the atoms' current positions (in
+        ``u.default.length`` units), used for fast neighbor searches.
+
+        This is cached, and only rebuilt when the atoms have moved.
+        """
+        index = self._neighbor_index
+        if index is None or not index.matches(self.positions_raw):
+            index = self._neighbor_index = mdt.geom.NeighborIndex(self.positions_raw)
+        return index
+
+    @property
+    def forces_raw(self):
+        """ np.ndarray: Nx3 array of the current forces as plain numbers, in
+        ``u.default.force`` units
+
+        Raises:
+            NotCalculatedError: If the forces have not yet been calculated at this geometry
+        """
+        return self.forces.value_in(u.default.force)
+
     @property
     def num_bonds(self):
         """int: number of chemical bonds in this molecule"""
-        return sum(atom.nbonds for atom in self.atoms) // 2
+        return self.bond_graph.topology.num_bonds
 
     nbonds = num_bonds
 
+    @property
+    def bonds(self):
+        """ Iterable[moldesign.Bond]: iterator over this molecule's bonds, ordered by the atoms'
+        indices
+        """
+        atoms = self.atoms
+        for i, j in self.bond_graph.topology.bonds:
+            yield Bond(atoms[i], atoms[j])
+
     def add_atom(self, newatom):
         """  Add a new atom to the molecule
 
@@ -52,6 +52,16 @@ class Residue(MolecularHierarchy):
         self._template_name = None
         self._name = None
 
+    @property
+    def chain(self):
+        return self._chain
+
+    @chain.setter
+    def chain(self, chain):
+        self._chain = chain
+        if getattr(self, 'molecule', None) is not None:  # keep the chain_indices column in sync
+            self.molecule._update_residue_indices(self.atoms)
+
     def copy(self):
         """ Create a copy of this residue and all topology within.
 
@@ -77,9 +87,10 @@ class Residue(MolecularHierarchy):
             return
 
         newresidue = copy.copy(self)
-        newresidue.chain = None
         newresidue.molecule = None
+        newresidue.chain = None
         newresidue.children = ChildList(newresidue)
+        newresidue._backbone = newresidue._sidechain = None
 
         memo[self] = newresidue
         if self.chain is not None:
@@ -87,6 +98,9 @@ class Residue(MolecularHierarchy):
                 newchain = copy.copy(self.chain)
                 newchain.molecule = None
                 newchain.children = ChildList(newchain)
+                newchain._type = None
+                newchain._5p_end = newchain._3p_end = None
+                newchain._n_terminal = newchain._c_terminal = None
                 memo[self.chain] = newchain
             memo[self.chain].add(newresidue)
 
@@ -0,0 +1,430 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Atom selection expressions, e.g. ``"protein and name CA and within 8 of resname LIG"``
+
+Expressions are parsed once into a tree of functions that each compute a boolean mask over all
+atoms in a molecule, using the molecule's per-atom columns (``atnums``, ``atom_names``,
+``residue_indices``, ...) and its spatial index. Residue- and chain-level attributes are only
+evaluated once per residue or chain, then mapped onto the atoms.
+"""
+import re
+
+import numpy as np
+
+import moldesign as mdt
+from .. import data
+from .. import units as u
+from . import toplevel
+
+MAX_CACHED_SELECTIONS = 256
+
+OPERATORS = {'and', 'or', 'not', 'byres', 'within', 'of'}
+
+# residue types that can be used as bare keywords
+RESIDUE_TYPE_KEYWORDS = ('protein', 'dna', 'rna', 'water', 'ion', 'solvent', 'unknown')
+
+
+@toplevel
+class Selection(object):
+    """ A compiled atom selection expression.
+
+    Selections are built from:
+      - keywords: ``all``, ``none``, ``hydrogen``, ``heavy``, ``backbone``, and the residue types
+        ``protein``, ``dna``, ``rna``, ``water``, ``ion``, ``solvent``, and ``unknown``
+      - atom fields, followed by one or more values: ``name``, ``element`` (or ``symbol``),
+        ``atnum``, ``index``
+      - residue and chain fields, followed by one or more values: ``resname``, ``resid`` (the
+        residue's PDB sequence number), ``resindex`` (its index in the molecule), ``chain``
+      - boolean operators ``and``, ``or``, ``not``, and parentheses
+      - ``byres <selection>``: every atom in any residue that contains a selected atom
+      - ``within <distance> of <selection>``: every atom within ``distance`` angstroms of any
+        selected atom (including the selected atoms themselves)
+
+    Numeric fields also accept ``start:stop`` ranges, which (as with python slices) include
+    ``start`` but not ``stop``. Values containing spaces or parentheses can be double-quoted.
+
+    Use :meth:`Selection.compile` instead of the constructor to reuse previously compiled
+    expressions.
+
+    Args:
+        expression (str): the selection expression
+
+    Raises:
+        ValueError: if the expression can't be parsed
+
+    Examples:
+        >>> sel = mdt.Selection.compile('protein and name CA and within 8 of resname LIG')
+        >>> sel.indices(mol)  # array of atom indices
+        >>> sel.atoms(mol)  # AtomList
+        >>> mol.select('byres (water and within 3.5 of chain A)')
+    """
+    _cache = {}
+
+    def __init__(self, expression):
+        self.expression = expression
+        parser = _Parser(expression)
+        self._evaluate = parser.parse()
+        self.uses_positions = parser.uses_positions
+
+    @classmethod
+    def compile(cls, expression):
+        """ Get the compiled selection for an expression, reusing it if it was already compiled
+
+        Args:
+            expression (str or Selection): the selection expression
+
+        Returns:
+            Selection: the compiled selection
+        """
+        if isinstance(expression, cls):
+            return expression
+        selection = cls._cache.get(expression, None)
+        if selection is None:
+            if len(cls._cache) >= MAX_CACHED_SELECTIONS:
+                cls._cache.clear()
+            selection = cls._cache[expression] = cls(expression)
+        return selection
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self.expression)
+
+    def mask(self, mol, positions=None):
+        """ Evaluate this selection for a molecule
+
+        Args:
+            mol (moldesign.Molecule): molecule to select atoms from
+            positions (Matrix[length]): positions to use for distance-based selections
+                (default: the molecule's current positions)
+
+        Returns:
+            np.ndarray[bool]: array with one entry per atom in the molecule - True if the atom is
+               selected
+        """
+        return self._evaluate(_SelectionContext(mol, positions))
+
+    def indices(self, mol, positions=None):
+        """ Evaluate this selection for a molecule (see :meth:`mask`)
+
+        Returns:
+            np.ndarray[int]: sorted indices of the selected atoms
+        """
+        return np.nonzero(self.mask(mol, positions))[0]
+
+    def atoms(self, mol, positions=None):
+        """ Evaluate this selection for a molecule (see :meth:`mask`)
+
+        Returns:
+            moldesign.AtomList: the selected atoms, in order
+        """
+        atoms = mol.atoms
+        return mdt.AtomList(atoms[i] for i in self.indices(mol, positions).tolist())
+
+    def iter_frames(self, traj):
+        """ Evaluate this selection for each frame in a trajectory
+
+        If the selection doesn't depend on the atoms' positions, it's only evaluated once.
+
+        Args:
+            traj (moldesign.Trajectory): the trajectory
+
+        Yields:
+            np.ndarray[int]: sorted indices of the selected atoms in each frame
+        """
+        context = _SelectionContext(traj.mol)
+        if not self.uses_positions:
+            indices = np.nonzero(self._evaluate(context))[0]
+            for iframe in range(traj.num_frames):
+                yield indices
+            return
+
+        for positions in traj.positions:
+            context.set_positions(positions)
+            yield np.nonzero(self._evaluate(context))[0]
+
+
+class _SelectionContext(object):
+    """ The data that a selection is evaluated against: a molecule, its atoms' positions (for
+    distance-based selections), and any per-residue values that have already been collected
+    """
+    def __init__(self, mol, positions=None):
+        self.mol = mol
+        self._residue_values = {}
+        self.set_positions(positions)
+
+    def set_positions(self, positions):
+        if positions is not None:
+            positions = positions.value_in(u.default.length)
+        self._positions = positions
+        self._neighbor_index = None
+
+    @property
+    def num_atoms(self):
+        return self.mol.num_atoms
+
+    @property
+    def neighbor_index(self):
+        if self._positions is None:
+            return self.mol.neighbor_index
+        elif self._neighbor_index is None:
+            self._neighbor_index = mdt.geom.NeighborIndex(self._positions)
+        return self._neighbor_index
+
+    def residue_values(self, key, getter, dtype='object'):
+        """ Collect the value of ``getter(residue)`` for each residue (only once per context),
+        and map them onto the atoms
+
+        Atoms whose residue isn't part of the molecule (residue index -1) get an extra, blank
+        slot at the end of the array (``None``, or NaN for numerical dtypes), so they don't match
+        any residue-level value.
+        """
+        values = self._residue_values.get(key, None)
+        if values is None:
+            values = np.empty(len(self.mol.residues) + 1, dtype=dtype)
+            values[:-1] = [getter(res) for res in self.mol.residues]
+            values[-1] = None if values.dtype.kind == 'O' else np.nan
+            values = self._residue_values[key] = values[self.mol.residue_indices]
+        return values
+
+
+def _match_values(column, values):
+    """ Mask for the entries in a column that match any of the (parsed) values
+    """
+    mask = np.zeros(len(column), dtype='bool')
+    exact = [v for v in values if not isinstance(v, slice)]
+    if exact:
+        mask |= np.isin(column, exact)
+    for rng in values:
+        if isinstance(rng, slice):
+            mask |= (column >= rng.start) & (column < rng.stop)
+    return mask
+
+
+def _atom_column_field(columnname):
+    return lambda ctx: getattr(ctx.mol, columnname)
+
+
+def _residue_field(key, getter, dtype='object'):
+    return lambda ctx: ctx.residue_values(key, getter, dtype)
+
+
+def _pdbindex(res):
+    return res.pdbindex if res.pdbindex is not None else np.nan
+
+
+_CHAIN_NAMES = _residue_field('chain', lambda res: res.chain.name)
+
+# field name -> (function returning the column to compare, type of each value)
+FIELDS = {'name': (_atom_column_field('atom_names'), str),
+          'element': (_atom_column_field('atnums'), 'element'),
+          'symbol': (_atom_column_field('atnums'), 'element'),
+          'atnum': (_atom_column_field('atnums'), int),
+          'index': (lambda ctx: np.arange(ctx.num_atoms), int),
+          'resname': (_residue_field('resname', lambda res: res.resname), str),
+          'resid': (_residue_field('resid', _pdbindex, 'float'), int),
+          'resindex': (_atom_column_field('residue_indices'), int),
+          'chain': (_CHAIN_NAMES, str)}
+
+
+def _residue_type_mask(restype):
+    def residue_type(ctx):
+        return ctx.residue_values('type', lambda res: res.type) == restype
+    return residue_type
+
+
+def _backbone(ctx):
+    restypes = ctx.residue_values('type', lambda res: res.type)
+    mask = np.zeros(ctx.num_atoms, dtype='bool')
+    for restype, names in data.BACKBONES.items():
+        mask |= (restypes == restype) & np.isin(ctx.mol.atom_names, list(names))
+    return mask
+
+
+KEYWORDS = {'all': lambda ctx: np.ones(ctx.num_atoms, dtype='bool'),
+            'none': lambda ctx: np.zeros(ctx.num_atoms, dtype='bool'),
+            'hydrogen': lambda ctx: ctx.mol.atnums == 1,
+            'heavy': lambda ctx: ctx.mol.atnums != 1,
+            'backbone': _backbone}
+KEYWORDS.update((restype, _residue_type_mask(restype)) for restype in RESIDUE_TYPE_KEYWORDS)
+
+RESERVED = OPERATORS | set(FIELDS) | set(KEYWORDS)
+
+_TOKEN = re.compile(r'\s*(?:(?P<paren>[()])|"(?P<quoted>[^"]*)"|(?P<word>[^\s()"]+)|(?P<bad>\S))')
+
+
+class _Parser(object):
+    """ Recursive descent parser that turns a selection expression into a mask function.
+
+    Grammar::
+
+        expression := term ('or' term)*
+        term := factor ('and' factor)*
+        factor := 'not' factor | 'byres' factor | 'within' NUMBER 'of' factor
+                  | '(' expression ')' | KEYWORD | FIELD VALUE+
+    """
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = self._tokenize(expression)
+        self.pos = 0
+        self.uses_positions = False
+
+    def _tokenize(self, expression):
+        tokens = []  # list of (text, is_value) tuples
+        for match in _TOKEN.finditer(expression):
+            if match.group('bad') is not None:
+                self._fail('unterminated quote')
+            elif match.group('quoted') is not None:
+                tokens.append((match.group('quoted'), True))
+            elif match.group('paren') is not None:
+                tokens.append((match.group('paren'), False))
+            elif match.group('word') is not None:
+                word = match.group('word')
+                tokens.append((word, word not in RESERVED))
+        return tokens
+
+    def _fail(self, message):
+        raise ValueError('Invalid selection "%s": %s' % (self.expression, message))
+
+    def _peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        else:
+            return None, False
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            self._fail('unexpected end of expression')
+        self.pos += 1
+        return token
+
+    def _accept(self, word):
+        text, is_value = self._peek()
+        if text == word and not is_value:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self):
+        if not self.tokens:
+            self._fail('empty expression')
+        func = self._expression()
+        if self.pos < len(self.tokens):
+            self._fail('unexpected "%s"' % self.tokens[self.pos][0])
+        return func
+
+    def _expression(self):
+        funcs = [self._term()]
+        while self._accept('or'):
+            funcs.append(self._term())
+        if len(funcs) == 1:
+            return funcs[0]
+        return lambda ctx: np.logical_or.reduce([f(ctx) for f in funcs])
+
+    def _term(self):
+        funcs = [self._factor()]
+        while self._accept('and'):
+            funcs.append(self._factor())
+        if len(funcs) == 1:
+            return funcs[0]
+        return lambda ctx: np.logical_and.reduce([f(ctx) for f in funcs])
+
+    def _factor(self):
+        if self._accept('not'):
+            func = self._factor()
+            return lambda ctx: ~func(ctx)
+        elif self._accept('byres'):
+            return _byres(self._factor())
+        elif self._accept('within'):
+            distance = self._number(float, 'distance')
+            if not self._accept('of'):
+                self._fail('expected "of" after "within %s"' % distance)
+            self.uses_positions = True
+            return _within(distance * u.angstrom, self._factor())
+        elif self._accept('('):
+            func = self._expression()
+            if not self._accept(')'):
+                self._fail('missing ")"')
+            return func
+
+        text, is_value = self._next()
+        if is_value:
+            self._fail('expected a keyword or field name, got "%s"' % text)
+        elif text in KEYWORDS:
+            return KEYWORDS[text]
+        elif text in FIELDS:
+            return self._field(text)
+        else:
+            self._fail('unexpected "%s"' % text)
+
+    def _number(self, valuetype, description):
+        text, is_value = self._next()
+        try:
+            return valuetype(text)
+        except ValueError:
+            self._fail('expected %s, got "%s"' % (description, text))
+
+    def _field(self, field):
+        getcolumn, valuetype = FIELDS[field]
+        values = []
+        while self._peek()[1]:
+            text = self._next()[0]
+            if valuetype is str:
+                values.append(text)
+            elif valuetype == 'element':
+                if text not in data.ATOMIC_NUMBERS:
+                    self._fail('unknown element "%s"' % text)
+                values.append(data.ATOMIC_NUMBERS[text])
+            elif ':' in text:
+                start, stop = text.split(':', 1)
+                values.append(slice(self._to_int(start), self._to_int(stop)))
+            else:
+                values.append(self._to_int(text))
+
+        if not values:
+            self._fail('no values given for "%s"' % field)
+        return lambda ctx: _match_values(getcolumn(ctx), values)
+
+    def _to_int(self, text):
+        try:
+            return int(text)
+        except ValueError:
+            self._fail('expected an integer, got "%s"' % text)
+
+
+def _byres(func):
+    def byres(ctx):
+        residue_indices = ctx.mol.residue_indices
+        selected = np.zeros(len(ctx.mol.residues) + 1, dtype='bool')
+        selected[residue_indices[func(ctx)]] = True
+        selected[-1] = False  # atoms outside of the molecule's residues (residue index -1)
+        return selected[residue_indices]
+    return byres
+
+
+def _within(distance, func):
+    radius = distance.value_in(u.default.length)
+
+    def within(ctx):
+        target = func(ctx)
+        mask = np.zeros(ctx.num_atoms, dtype='bool')
+        if target.any():
+            index = ctx.neighbor_index
+            mask[index.within(index.positions[target], radius)] = True
+        return mask
+    return within
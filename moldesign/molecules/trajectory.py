@@ -16,8 +16,12 @@ standard_library.install_aliases()
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import collections
 import copy
+import json
+import os
 import time
+import weakref
 
 import numpy as np
 
@@ -34,6 +38,9 @@ class Frame(utils.DotDict):
     substantially depending on the origin of the trajectory. They also include relevant dynamical
     data and metadata (such as ``time``, ``momenta``, ``minimization_step``, etc.)
 
+    Frames are lightweight views into the trajectory's storage - they are created when they're
+    accessed, and their properties aren't read from the trajectory until they're needed.
+
     Properties can be accessed either as attributes (``frame.property_name``) or as keys
     (``frame['property_name']``)
 
@@ -54,13 +61,23 @@ class Frame(utils.DotDict):
         >>> assert starting_frame.minimization_step == 0
     """
     def __init__(self, traj, frameidx):
-        super().__init__()
         self.traj = traj
         self.frameidx = frameidx
-        for key in self.traj.properties:
-            if key == 'frameidx':
-                continue
-            self[key] = getattr(traj, key)[self.frameidx]
+        self._data = None
+        self._init = True
+
+    @property
+    def _od(self):
+        """ The frame's properties are only pulled out of the trajectory's storage arrays when
+        they're first accessed
+        """
+        if self.__dict__['_data'] is None:
+            self.__dict__['_data'] = self.traj._get_frame_data(self.frameidx)
+        return self.__dict__['_data']
+
+    @_od.setter
+    def _od(self, value):
+        self.__dict__['_data'] = value
 
     def __str__(self):
         return 'Frame %d in trajectory "%s"' % (self.frameidx, self.traj.name)
@@ -80,6 +97,53 @@ class Frame(utils.DotDict):
         return mdt.Molecule(self.traj._tempmol)
 
 
+class _FrameList(object):
+    """ A read-only, list-like sequence of a trajectory's frames.
+
+    :class:`Frame` objects are created when they're accessed rather than when they're added to
+    the trajectory. Frames that are still referenced elsewhere will be reused.
+    """
+    def __init__(self, traj):
+        self.traj = traj
+        self._frames = weakref.WeakValueDictionary()
+
+    def __getstate__(self):  # cached frames are never pickled
+        return {'traj': self.traj}
+
+    def __setstate__(self, state):
+        self.__init__(state['traj'])
+
+    def __len__(self):
+        return self.traj._num_frames
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('Frame index %s out of range' % item)
+
+        frame = self._frames.get(item, None)
+        if frame is None:
+            frame = self._frames[item] = Frame(self.traj, item)
+        return frame
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return '<Frames for %s>' % self.traj
+
+
 class _TrajAtom(object):
     """ A helper class for querying individual atoms' dynamics
     """
@@ -133,12 +197,19 @@ class TrajectoryAnalysisMixin(object):
     def kinetic_energy(self):
         from ..helpers import kinetic_energy
 
+        if 'kinetic_energy' in self.properties:  # recorded directly (e.g., by an MD engine)
+            return self._get_column('kinetic_energy')
+
         convert_units = True
         energies = []
-        for frame in self.frames:
-            if 'momenta' in frame:
+        if 'momenta' in self.properties:
+            allmomenta = self.momenta
+        else:
+            allmomenta = [None] * self.num_frames
+        for momenta in allmomenta:
+            if momenta is not None:
                 energies.append(
-                    kinetic_energy(frame.momenta, self.mol.masses))
+                    kinetic_energy(momenta, self.mol.masses))
             else:
                 convert_units = False
                 energies.append(None)
@@ -156,7 +227,7 @@ class TrajectoryAnalysisMixin(object):
         temps = []
         energies = self.kinetic_energy
         dof = self.mol.dynamic_dof
-        for energy, frame in zip(energies, self.frames):
+        for energy in energies:
             if energy is not None:
                 temps.append(kinetic_temperature(energy, dof))
             else:
@@ -169,18 +240,73 @@ class TrajectoryAnalysisMixin(object):
             return temps
 
     def distance(self, a1, a2):
-        a1, a2 = list(map(self._get_traj_atom, (a1, a2)))
-        return mdt.distance(a1, a2)
+        return self.distances([(a1, a2)])[:, 0]
 
     def angle(self, a1, a2, a3):
-        a1, a2, a3 = list(map(self._get_traj_atom, (a1, a2, a3)))
-        return mdt.angle(a1, a2, a3)
+        return self.angles([(a1, a2, a3)])[:, 0]
 
     def dihedral(self, a1, a2, a3=None, a4=None):
-        a1, a2, a3, a4 = list(map(self._get_traj_atom, (a1, a2, a3, a4)))
-        return mdt.dihedral(a1, a2, a3, a4)
+        if a3 is a4 is None:  # infer the first and last atoms
+            a1, a2, a3, a4 = mdt.geom.coords._infer_dihedral(self._get_real_atom(a1),
+                                                             self._get_real_atom(a2))
+        return self.dihedrals([(a1, a2, a3, a4)])[:, 0]
 
-    def rmsd(self, atoms=None, reference=None):
+    def distances(self, pairs):
+        """ Calculate many distances over every frame in the trajectory at once
+
+        Args:
+            pairs (List[Tuple[int or mdt.Atom]]): ``(a1, a2)`` pairs of atoms (or atom indices)
+
+        Returns:
+            u.Array[length]: distances, with shape ``(num_frames, num_pairs)``
+        """
+        pairs = mdt.geom.batch._index_array(pairs, 2)
+        return self._batch_measure(lambda pos: mdt.geom.batch_distances(pos, pairs), len(pairs))
+
+    def angles(self, triples):
+        """ Calculate many bond angles over every frame in the trajectory at once
+
+        Args:
+            triples (List[Tuple[int or mdt.Atom]]): ``(a1, a2, a3)`` triples of atoms (or atom
+                indices)
+
+        Returns:
+            u.Array[angle]: angles, with shape ``(num_frames, num_triples)``
+        """
+        triples = mdt.geom.batch._index_array(triples, 3)
+        return self._batch_measure(lambda pos: mdt.geom.batch_angles(pos, triples),
+                                   len(triples))
+
+    def dihedrals(self, quads):
+        """ Calculate many dihedral angles over every frame in the trajectory at once
+
+        Args:
+            quads (List[Tuple[int or mdt.Atom]]): ``(a1, a2, a3, a4)`` sets of atoms (or atom
+                indices)
+
+        Returns:
+            u.Array[angle]: dihedral angles in [0, 2 pi), with shape ``(num_frames, num_quads)``
+        """
+        quads = mdt.geom.batch._index_array(quads, 4)
+        return self._batch_measure(lambda pos: mdt.geom.batch_dihedrals(pos, quads), len(quads))
+
+    def select(self, expression):
+        """ Evaluate a selection expression (see :class:`moldesign.Selection`) in every frame of
+        the trajectory. Distance-based selections use each frame's positions.
+
+        Args:
+            expression (str or moldesign.Selection): the selection
+
+        Returns:
+            List[np.ndarray[int]]: sorted indices of the selected atoms in each frame
+
+        Examples:
+            >>> waters = traj.select('byres (water and within 3.5 of resname LIG)')
+            >>> [len(w) for w in waters]  # number of nearby water atoms in each frame
+        """
+        return list(mdt.Selection.compile(expression).iter_frames(self))
+
+    def rmsd(self, atoms=None, reference=None, superpose=False):
         r""" Calculate root-mean-square displacement for each frame in the trajectory.
 
         The RMSD between times :math:`t` and :math:`t0` is given by
@@ -196,22 +322,49 @@ class TrajectoryAnalysisMixin(object):
                 ``Molecule``)
             reference (u.Vector[length]): Reference positions for RMSD. (default:
                 ``traj.frames[0].positions``)
+            superpose (bool): if True, optimally superimpose each frame onto the reference
+                structure (with the Kabsch algorithm) before calculating its RMSD
 
         Returns:
             u.Vector[length]: list of RMSD displacements for each frame in the trajectory
 
         """
-        if reference is None: refpos = self.frames[0].positions
+        positions = self.positions
+        if reference is None: refpos = positions[0]
         else: refpos = reference.positions
 
         atoms = mdt.utils.if_not_none(atoms, self.mol.atoms)
         indices = np.array([atom.index for atom in atoms])
+        refpos = refpos[indices]
+
+        return self._batch_measure(
+                lambda pos: mdt.geom.batch_rmsd(pos[:, indices], refpos, superpose=superpose),
+                len(indices)).defunits()
 
-        rmsds = []
-        for f in self.frames:
-            diff = (refpos[indices] - f.positions[indices])
-            rmsds.append(np.sqrt((diff*diff).sum()/len(atoms)))
-        return u.array(rmsds).defunits()
+    # Upper limit on the number of (frame, measurement) pairs to calculate at once
+    BATCH_SIZE = 2**20
+
+    def _batch_measure(self, func, num_measurements):
+        """ Apply a batch measurement function to the positions in every frame.
+
+        The frames are processed in chunks, so that temporary arrays stay a manageable size even
+        for very long trajectories.
+        """
+        if self.num_frames == 0:  # measure nothing, to get an empty array with the right units
+            return func(np.zeros((0, self.mol.num_atoms, 3)) * self.unit_system.length)
+
+        positions = self.positions
+        chunksize = max(1, self.BATCH_SIZE // max(1, num_measurements))
+        results = [func(positions[start:start+chunksize])
+                   for start in range(0, self.num_frames, chunksize)]
+        units = results[0].units
+        return np.concatenate([r.value_in(units) for r in results]) * units
+
+    def _get_real_atom(self, a):
+        if isinstance(a, int):
+            return self.mol.atoms[a]
+        else:
+            return getattr(a, 'real_atom', a)
 
 
 @toplevel
@@ -230,6 +383,23 @@ class Trajectory(TrajectoryAnalysisMixin):
             ``moldesign.units.default``)
         first_frame(bool): Create the trajectory's first :class:`Frame` from the molecule's
             current position
+        name (str): name of this trajectory
+        preallocate (int): expected number of frames - if passed, storage for this many frames
+            is allocated up front, so that adding frames won't require any reallocation
+        directory (str): if passed, store numerical properties in memory-mapped files in this
+            directory instead of in memory (see :meth:`Trajectory.from_directory`)
+
+    Note:
+        Numerical properties (positions, momenta, energies, time, etc.) are stored as single
+        contiguous arrays of shape ``(num_frames, ...)``, with their units stored once per
+        property. Each array grows (by doubling) only when its allocation is exhausted, so adding a
+        frame costs the same regardless of how many frames already exist. :class:`Frame` objects
+        are just views into these arrays that are created on demand.
+
+        If a ``directory`` is passed, these arrays are instead written through to memory-mapped
+        files, and are only read back from disk when accessed. This allows trajectories that are
+        much larger than the available memory. Non-numerical properties (strings, wavefunctions,
+        etc.) are still stored in memory.
 
     Attributes:
         mol (moldesign.Molecule): the molecule object that this trajectory comes from
@@ -242,10 +412,16 @@ class Trajectory(TrajectoryAnalysisMixin):
     draw_orbitals = widgets.WidgetMethod('trajectory.draw_orbitals')
     plot = widgets.WidgetMethod('trajectory.plot')
 
-    def __init__(self, mol, unit_system=None, first_frame=False, name=None):
+    def __init__(self, mol, unit_system=None, first_frame=False, name=None, preallocate=None,
+                 directory=None):
         self._init = True
         self.info = "Trajectory"
-        self.frames = []
+        self._num_frames = 0
+        self._preallocate = preallocate
+        self._directory = directory
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.frames = _FrameList(self)
         self.mol = mol
         self.unit_system = utils.if_not_none(unit_system, mdt.units.default)
         self.properties = utils.DotDict()
@@ -264,24 +440,103 @@ class Trajectory(TrajectoryAnalysisMixin):
 
     def copy(self):
         newtraj = copy.copy(self)
-        newtraj.frames = self.frames[:]
-        newtraj.properties = self.properties.copy()
+        newtraj.properties = utils.DotDict((key, self._copy_column(key))
+                                           for key in self.properties)
+        newtraj.frames = _FrameList(newtraj)
+        newtraj._directory = None  # the copy is stored in memory
         newtraj._reset()
         return newtraj
 
+    def _copy_column(self, key):
+        column = self._get_column(key)
+        if isinstance(column, list):
+            return list(column)
+
+        newcolumn = column.copy()
+        if hasattr(newcolumn, 'make_resizable'):
+            newcolumn.make_resizable()
+        else:
+            newcolumn = utils.ResizableArray(newcolumn)
+        return newcolumn
+
     @property
     def num_frames(self):
         """int: number of frames in this trajectory"""
-        return len(self)
+        return self._num_frames
+
+    def __len__(self):
+        return self._num_frames
 
-    __len__ = mdt.utils.Alias('frames.__len__')
     __iter__ = mdt.utils.Alias('frames.__iter__')
 
     def __getattr__(self, attr):
         if attr == 'properties' or attr not in self.properties:
             return self.__getattribute__(attr)
         else:
-            return self.properties[attr]
+            return self._get_column(attr)
+
+    def _get_column(self, key):
+        """ Return the stored values of a property for every frame.
+
+        Properties that weren't present in the most recent frames are backfilled here, rather
+        than every time a frame is added: numerical properties with ``nan`` (so that they stay in
+        a single array), and anything else with ``None``.
+        """
+        column = self.properties[key]
+        if len(column) < self._num_frames:
+            column = self._backfill_with_nan(key, column)
+        while len(column) < self._num_frames:
+            try:
+                column.append(None)
+            except (TypeError, AttributeError, ValueError, u.DimensionalityError):
+                column = list(column)
+                column.extend([None] * (self._num_frames - len(column)))
+                self.properties[key] = column
+        return column
+
+    def _backfill_with_nan(self, key, column):
+        storage = getattr(column, '_magnitude', column)
+        if not isinstance(storage, utils.ResizableArray) or len(storage) == 0:
+            return column
+        missing = self._missing_value(column[0])
+        if missing is None:
+            return column
+
+        if storage.dtype.kind != 'f':  # integer data needs to be stored as floats to hold nan
+            values = np.array(storage, dtype='float64')
+            if hasattr(column, 'units'):
+                values = values * column.units
+            del self.properties[key], column, storage  # release the file before it's rewritten
+            column = self.properties[key] = self._new_column(key, values)
+
+        column.extend([missing] * (self._num_frames - len(column)))
+        return column
+
+    @staticmethod
+    def _missing_value(value):
+        """ Placeholder for a frame where a numerical property wasn't recorded
+
+        Returns:
+            ``nan`` with the same shape and units as ``value``, or ``None`` if ``value`` isn't
+            numerical
+        """
+        magnitude = np.asarray(getattr(value, 'magnitude', value))
+        if magnitude.dtype.kind not in 'iuf':
+            return None
+        missing = np.full(magnitude.shape, np.nan)
+        if isinstance(value, u.MdtQuantity):
+            missing = missing * value.units
+        return missing
+
+    def _get_frame_data(self, frameidx):
+        """ Pull out the properties of a single frame (called by :class:`Frame` objects)
+        """
+        data = collections.OrderedDict()
+        for key in self.properties:
+            if key == 'frameidx':
+                continue
+            data[key] = self._get_column(key)[frameidx]
+        return data
 
     @property
     def atoms(self):
@@ -329,29 +584,21 @@ class Trajectory(TrajectoryAnalysisMixin):
 
         props.update(additional_data)
 
-        # add properties to trajectory
+        # add properties to trajectory. Properties that are NOT present in this frame are only
+        # backfilled when they're next accessed (see ``_get_column``)
         for key, value in props.items():
             if key not in self.properties:
                 self._new_property(key, value)
             else:
-                proplist = getattr(self, key)
-                assert len(proplist) == self.num_frames
-                proplist.append(value)
-
-        # backfill missing data with None
-        for key in self.properties:
-            proplist = self.properties[key]
-            if len(proplist) < self.num_frames+1:
-                assert len(proplist) == self.num_frames
+                proplist = self._get_column(key)
                 try:
-                    proplist.append(None)
-                except TypeError:
-                    newpl = list(proplist)
-                    newpl.append(None)
-                    self.properties[key] = newpl
+                    proplist.append(value)
+                except (TypeError, AttributeError, ValueError, u.DimensionalityError):
+                    proplist = self.properties[key] = list(proplist)
+                    proplist.append(value)
 
-        # TODO: less awkward way of keeping track of # of frames
-        self.frames.append(Frame(self, self.num_frames))
+        self._num_frames += 1
+        return self._num_frames - 1
 
 
     def _new_property(self, key, value):
@@ -362,27 +609,154 @@ class Trajectory(TrajectoryAnalysisMixin):
           3) list
 
         If this property wasn't already present, we will add it to all previous frames with a
-        value of ``None``
+        value of ``nan`` (for numerical properties) or ``None`` (for anything else)
         """
         assert key not in self.properties
 
         if self.num_frames != 0:
-            proplist = [None] * self.num_frames
-            proplist.append(value)
+            missing = None
+            if not isinstance(value, (AtomicProperties, dict)):
+                missing = self._missing_value(value)
+            if missing is None:
+                proplist = [None] * self.num_frames
+                proplist.append(value)
+            else:
+                proplist = self._new_column(key, [missing] * self.num_frames + [value])
         elif isinstance(value, (AtomicProperties, dict)):
             proplist = [value]
         else:
-            try:
-                proplist = self.unit_system.convert(u.array([value]))
-            except (ValueError, TypeError, u.UndefinedUnitError):
-                proplist = [value]
-            else:
-                proplist.make_resizable()
-                if proplist.dimensionless:
-                    proplist = proplist._magnitude
+            proplist = self._new_column(key, [value])
 
         self.properties[key] = proplist
 
+    def _new_column(self, key, values):
+        """ Create storage for a property from a list (or array) of its values in each frame.
+        Numerical values are converted into this trajectory's unit system and stored in a single
+        array; anything else is stored in a list
+        """
+        try:
+            column = self.unit_system.convert(u.array(values))
+        except (ValueError, TypeError, u.UndefinedUnitError):
+            return list(values)
+        column._magnitude = self._new_storage(key, column._magnitude)
+        if column.dimensionless:
+            column = column._magnitude
+        return column
+
+    def _new_storage(self, key, array):
+        """ Create the resizable array that will store a numerical property, either in memory or
+        on disk
+        """
+        if self._directory is None:
+            storage = utils.ResizableArray(array)
+        else:
+            storage = utils.MemmapArray(os.path.join(self._directory, key + '.dat'),
+                                        shape=array.shape[1:], dtype=array.dtype)
+            storage.extend(array)
+        if self._preallocate:
+            storage.reserve(self._preallocate)
+        return storage
+
+    @classmethod
+    def from_arrays(cls, mol, columns, **kwargs):
+        """ Create a trajectory from arrays containing the values of each property at every frame.
+
+        This is much faster than adding the frames one at a time with :meth:`new_frame` - it's
+        intended for code that collects an entire trajectory's data before creating it.
+
+        Args:
+            mol (moldesign.Molecule): the molecule that this trajectory describes
+            columns (Mapping[str, Sequence]): maps property names to their values at each frame;
+               each must have the same length (the number of frames). Use ``nan`` (for numerical
+               properties) or ``None`` (for anything else) for frames where a property wasn't
+               recorded.
+            **kwargs: any additional keyword arguments for the :class:`Trajectory` constructor
+
+        Returns:
+            Trajectory: the new trajectory
+        """
+        traj = cls(mol, **kwargs)
+        num_frames = None
+        for key, values in columns.items():
+            if num_frames is None:
+                num_frames = len(values)
+            elif len(values) != num_frames:
+                raise ValueError('All properties must have the same number of frames '
+                                 '("%s" has %d, expected %d)' % (key, len(values), num_frames))
+            traj.properties[key] = traj._new_column(key, values)
+        traj._num_frames = utils.if_not_none(num_frames, 0)
+        return traj
+
+    INDEXFILE = 'trajectory.json'
+
+    def flush(self):
+        """ For disk-backed trajectories, write all data and the trajectory's index to disk.
+
+        This is called automatically by MDT's integrators at the end of a run.
+        """
+        if self._directory is None:
+            return
+
+        index = {'name': self.name,
+                 'num_frames': self.num_frames,
+                 'properties': {}}
+        for key in list(self.properties.keys()):
+            column = self._get_column(key)  # make sure that everything's backfilled
+            storage = getattr(column, '_magnitude', column)
+            if not isinstance(storage, utils.MemmapArray):
+                continue
+            storage.flush()
+            if hasattr(column, 'units'):
+                units = str(column.units)
+            else:
+                units = None
+            index['properties'][key] = {'filename': os.path.basename(storage.filename),
+                                        'dtype': storage.dtype.str,
+                                        'shape': list(storage.shape[1:]),
+                                        'units': units}
+
+        with open(os.path.join(self._directory, self.INDEXFILE), 'w') as indexfile:
+            json.dump(index, indexfile)
+
+    @classmethod
+    def from_directory(cls, mol, directory, mode='r', num_frames=None):
+        """ Open a disk-backed trajectory that was created with the ``directory`` argument.
+
+        Data is read from disk lazily, as it's accessed. Only numerical properties are stored
+        on disk, so other properties (e.g., wavefunctions or annotations) will not be present.
+
+        Args:
+            mol (moldesign.Molecule): the molecule that this trajectory describes
+            directory (str): the trajectory's directory
+            mode (str): ``'r'`` to open the trajectory read-only, or ``'r+'`` to allow
+               new frames to be added
+            num_frames (int): only use this many frames (frames after these will be overwritten
+               if new frames are added in ``'r+'`` mode). By default, use all frames that were
+               present when the trajectory was last flushed.
+
+        Returns:
+            Trajectory: the disk-backed trajectory
+        """
+        with open(os.path.join(directory, cls.INDEXFILE), 'r') as indexfile:
+            index = json.load(indexfile)
+
+        traj = cls(mol, name=index['name'], directory=directory)
+        if num_frames is None:
+            traj._num_frames = index['num_frames']
+        else:
+            traj._num_frames = min(num_frames, index['num_frames'])
+        for key, desc in index['properties'].items():
+            storage = utils.MemmapArray(os.path.join(directory, desc['filename']),
+                                        shape=desc['shape'], dtype=desc['dtype'],
+                                        length=traj._num_frames, mode=mode)
+            if desc['units'] is None:
+                traj.properties[key] = storage
+            else:
+                column = np.zeros(0) * u.ureg.parse_units(desc['units'])
+                column._magnitude = storage
+                traj.properties[key] = column
+        return traj
+
     def _get_traj_atom(self, a):
         if a is None:
             return None
@@ -21,6 +21,7 @@ import numpy as np
 
 from ..utils import Attribute
 from . import toplevel, MolecularOrbitals
+from .packed import PackedBasis
 
 
 @toplevel
@@ -36,9 +37,8 @@ class BasisSet(MolecularOrbitals):
         orbitals (List[AtomicBasisFunction]): list of basis functions comprising this set
         name (str): name of this basis set
         h1e (Matrix[energy]): 1-electron elements of the hamiltonian
-        overlaps (Matrix): overlap matrix
+        overlaps (Matrix): overlap matrix (if not passed, it will be calculated when needed)
     """
-    overlaps = Attribute('_overlaps')
     h1e = Attribute('_h1e')
 
     def __init__(self, mol, orbitals, name=None,
@@ -65,6 +65,7 @@ class BasisSet(MolecularOrbitals):
         for kw, val in kwargs.items():
             setattr(self, kw, val)
 
+        self._packed = None
         self._basis_fn_by_atom = {}
         for fn in self.orbitals:
             self._basis_fn_by_atom.setdefault(fn.atom.index, []).append(fn)
@@ -75,6 +76,9 @@ class BasisSet(MolecularOrbitals):
         Returns an array of orbital amplitudes. The amplitude of the _n_th orbital at the
         _j_th coordinate is stored at position ``(j, n)`` in the returned array.
 
+        All basis functions are evaluated together in vectorized chunks of points
+        (see :class:`moldesign.orbitals.packed.PackedBasis`).
+
         Args:
             coords (Matrix[shape=(*,3)]): List of coordinates.
             coeffs (Matrix[shape=(*, nbasis)]): List of ao coefficients (optional;
@@ -87,14 +91,37 @@ class BasisSet(MolecularOrbitals):
                - if ``coeffs`` is NOT passed, an array of basis function amplitudes
                  of size ``(len(coords), len(aobasis))``.
         """
-        basis_vals = np.zeros((len(coords), len(self))) * self.orbitals[0]._get_wfn_units()
-        for ibf, bf in enumerate(self.orbitals):
-            basis_vals[:, ibf] = bf(coords)
-
-        if coeffs is None:
-            return basis_vals
-        else:
-            return np.dot(basis_vals, coeffs.T)
+        return self.packed(coords, coeffs=coeffs)
+
+    @property
+    def packed(self):
+        """ PackedBasis: array representation of this basis, used to evaluate it on grids
+        (created the first time it's needed)
+        """
+        if self._packed is None:
+            self._packed = PackedBasis(self)
+        return self._packed
+
+    @property
+    def overlaps(self):
+        """ Matrix: overlap matrix between the functions in this basis
+        """
+        if self._overlaps is None:
+            self._overlaps = self.calculate_overlaps()
+        return self._overlaps
+
+    @overlaps.setter
+    def overlaps(self, value):
+        self._overlaps = value
+
+    def calculate_overlaps(self):
+        """ Calculate this basis' overlap matrix analytically
+        (see :meth:`moldesign.orbitals.packed.PackedBasis.overlaps`)
+
+        Returns:
+            Matrix[shape=(nbasis, nbasis)]: overlap matrix
+        """
+        return self.packed.overlaps()
 
     def get_basis_functions_on_atom(self, atom):
         """ Return a list of basis functions on this atom
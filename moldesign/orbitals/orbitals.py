@@ -208,10 +208,12 @@ class MolecularOrbitals(object):
         if assert_same_type:
             assert self.orbtype == other.orbtype, "Orbital type mismatch: %s vs. %s" % (
                 self.orbtype, other.orbtype)
-        for thisorb, otherorb in zip(self, other):
-            if thisorb.overlap(otherorb) < -1.0 * threshold:
-                thisorb.coeffs *= -1.0
-                # TODO: print a warning if overlap is small?
+        num_orbs = min(len(self), len(other))
+        olaps = (self.coeffs[:num_orbs].dot(self.basis.overlaps) *
+                 other.coeffs[:num_orbs]).sum(axis=1)
+        for iorb in np.nonzero(olaps < -1.0 * threshold)[0]:
+            self.orbitals[iorb].coeffs *= -1.0
+            # TODO: print a warning if overlap is small?
 
     def calc_eris(self):
         """ Calculate electron repulsion integrals in this basis
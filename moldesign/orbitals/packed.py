@@ -0,0 +1,286 @@
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from .. import units as u
+
+DEFAULT_MAX_MEMORY = 64 * 1024**2  # bytes of scratch space to use when evaluating a chunk
+
+
+class PackedBasis(object):
+    r""" Flat array representation of a basis set, for evaluating all of its functions on large
+    numbers of points at once.
+
+    Every primitive is expanded into cartesian terms of the form
+
+    .. math::
+        c \, x^{p_x} y^{p_y} z^{p_z} e^{-\alpha \left| \mathbf r - \mathbf r_0 \right|^2}
+
+    Each term refers to a "radial" row (a unique combination of center and exponent) and a
+    "monomial" row (a unique combination of center and cartesian powers), so that the
+    exponentials and polynomials are each only evaluated once per point, no matter how many basis
+    functions share them.
+
+    Points are processed in chunks to bound memory usage, and exponentials that are negligible
+    (i.e., less than ``threshold`` after including the largest coefficient and polynomial factor
+    that multiply them) are never evaluated.
+
+    Note:
+        The packed representation is a snapshot - it won't reflect any changes made to the basis
+        functions' primitives after it's created.
+
+    Args:
+        basis (moldesign.orbitals.BasisSet): the basis set to pack
+        threshold (float): values smaller than this (in the basis functions' units) are
+           neglected
+        max_memory (int): approximate scratch memory (in bytes) to use per chunk of points
+    """
+    def __init__(self, basis, threshold=1.0e-14, max_memory=DEFAULT_MAX_MEMORY):
+        self.threshold = threshold
+        self.max_memory = max_memory
+        self.num_functions = len(basis)
+        self.units = basis.orbitals[0]._get_wfn_units()
+        lengthunits = u.default.length
+
+        centers, radial, monomials = {}, {}, {}
+        term_basis, term_radial, term_monomial, term_coeffs = [], [], [], []
+        for ibf, bf in enumerate(basis.orbitals):
+            for prim in bf.iterprimitives():
+                if hasattr(prim, 'to_cart'):
+                    prim = prim.to_cart()
+
+                for cart in prim.iterprimitives():
+                    center = tuple(_magnitude(cart.center, lengthunits))
+                    alpha = float(_magnitude(cart.alpha, lengthunits**-2))
+                    powers = tuple(int(p) for p in cart.powers)
+                    coeff = u.MdtQuantity(cart.coeff * lengthunits**sum(powers))
+
+                    icenter = centers.setdefault(center, len(centers))
+                    term_basis.append(ibf)
+                    term_radial.append(radial.setdefault((icenter, alpha), len(radial)))
+                    term_monomial.append(monomials.setdefault((icenter, powers),
+                                                              len(monomials)))
+                    term_coeffs.append(coeff.value_in(self.units))
+
+        self.centers = np.array(_ordered_keys(centers))
+        radial_keys = _ordered_keys(radial)
+        self.radial_centers = np.array([k[0] for k in radial_keys], dtype='int')
+        self.alphas = np.array([k[1] for k in radial_keys])
+        monomial_keys = _ordered_keys(monomials)
+        self.monomial_centers = np.array([k[0] for k in monomial_keys], dtype='int')
+        self.powers = np.array([k[1] for k in monomial_keys], dtype='int')
+
+        # terms are already grouped by basis function, so they can be summed with reduceat
+        self.term_basis = np.array(term_basis, dtype='int')
+        self.term_radial = np.array(term_radial, dtype='int')
+        self.term_monomial = np.array(term_monomial, dtype='int')
+        self.term_coeffs = np.array(term_coeffs)
+        self._basis_starts = np.searchsorted(self.term_basis, np.arange(self.num_functions))
+
+        self.cutoffs = self._radial_cutoffs()
+
+    @property
+    def num_terms(self):
+        return len(self.term_coeffs)
+
+    def _radial_cutoffs(self):
+        r""" For each radial row, the value of :math:`\alpha r^2` beyond which all of its terms are
+        smaller than ``self.threshold``
+        """
+        maxcoeff = np.zeros(len(self.alphas))
+        maxpower = np.zeros(len(self.alphas))
+        np.maximum.at(maxcoeff, self.term_radial, np.abs(self.term_coeffs))
+        np.maximum.at(maxpower, self.term_radial,
+                      self.powers[self.term_monomial].sum(axis=1))
+
+        with np.errstate(divide='ignore'):
+            cutoffs = np.log(maxcoeff / self.threshold)
+        # scale by r^l at the cutoff radius, where |x^px y^py z^pz| <= r^l
+        radius = np.sqrt(np.maximum(cutoffs, 0.0) / self.alphas)
+        cutoffs += maxpower * np.log(np.maximum(radius, 1.0))
+        return cutoffs
+
+    def chunksize(self, num_outputs):
+        """ Number of points to evaluate at once, given the memory limit
+        """
+        rows = (self.num_terms + len(self.alphas) + 4 * len(self.powers) +
+                4 * len(self.centers) + self.num_functions + num_outputs)
+        return max(1, int(self.max_memory // (8 * rows)))
+
+    def __call__(self, coords, coeffs=None):
+        """ Evaluate the basis functions (or linear combinations of them) at a list of points
+
+        Args:
+            coords (Matrix[length, shape=(*,3)]): list of coordinates
+            coeffs (Matrix[shape=(*, nbasis)]): List of ao coefficients (optional)
+
+        Returns:
+            Matrix: array of shape ``(len(coords), len(coeffs))`` if ``coeffs`` is passed
+               (or ``(len(coords),)`` for a single vector of coefficients), otherwise
+               ``(len(coords), nbasis)``
+        """
+        points = _magnitude(coords, u.default.length)
+        if coeffs is None:
+            units = self.units
+            transform = None
+            outshape = (self.num_functions,)
+        else:
+            coeffunits = u.get_units(coeffs)
+            units = self.units * coeffunits
+            transform = _magnitude(coeffs, coeffunits).T
+            outshape = transform.shape[1:]
+
+        result = np.zeros((len(points),) + outshape)
+        chunksize = self.chunksize(int(np.prod(outshape)))
+        for start in range(0, len(points), chunksize):
+            values = self._evaluate_chunk(points[start:start+chunksize])
+            if transform is not None:
+                values = values.dot(transform)
+            result[start:start+chunksize] = values
+
+        return result * units
+
+    def overlaps(self):
+        r""" Calculate the overlap matrix between all functions in the basis,
+
+        .. math::
+            S_{\mu \nu} = \int \phi_\mu(\mathbf r) \phi_\nu(\mathbf r) d^3 \mathbf r
+
+        The integrals are calculated for blocks of radial rows against all other radial rows at
+        once, using the Obara-Saika recursion for the 1-D cartesian factors, and then
+        contracted into basis functions.
+
+        Returns:
+            Matrix[shape=(nbasis, nbasis)]: overlap matrix
+
+        References:
+            Obara and Saika. Efficient recursive computation of molecular integrals over
+                cartesian gaussian functions. J Chem Phys 84, 3963 (1986). doi:10.1063/1.450106
+        """
+        lmax = int(self.powers.max())
+        numradial = len(self.alphas)
+        term_powers = self.powers[self.term_monomial]
+        terms_per_row = -(-self.num_terms // numradial)
+        rowsize = numradial * (3 * (lmax+1)**2 + 12) + 6 * terms_per_row * self.num_terms
+        blocksize = max(1, int(self.max_memory // (8 * rowsize)))
+
+        result = np.zeros((self.num_functions, self.num_functions))
+        for start in range(0, numradial, blocksize):
+            with np.errstate(under='ignore'):
+                self._overlap_block(start, blocksize, lmax, term_powers, result)
+
+        olaps = 0.5 * (result + result.T) * self.units**2 * u.default.length**3
+        if olaps.dimensionless:
+            return olaps.value_in(u.dimensionless)
+        else:
+            return olaps
+
+    def _overlap_block(self, start, blocksize, lmax, term_powers, result):
+        """ Add the overlaps of all terms on radial rows ``start:start+blocksize`` (with all
+        other terms) to ``result``
+        """
+        rows = slice(start, start+blocksize)
+        a = self.alphas[rows, None]
+        b = self.alphas[None, :]
+        p = a + b
+        disp = (self.centers[None, self.radial_centers, :] -
+                self.centers[self.radial_centers[rows], None, :])  # B - A
+        prefactor = (np.pi / p)**1.5 * np.exp(-a * b / p * (disp**2).sum(axis=2))
+        table = _overlap_table_1d(lmax,
+                                  disp * (b / p)[:, :, None],  # P - A
+                                  -disp * (a / p)[:, :, None],  # P - B
+                                  p[:, :, None])
+
+        iterms = np.nonzero((self.term_radial >= start) &
+                            (self.term_radial < start+blocksize))[0]
+        r1 = self.term_radial[iterms, None] - start
+        r2 = self.term_radial[None, :]
+        values = prefactor[r1, r2] * self.term_coeffs[iterms, None] * self.term_coeffs
+        for idim in range(3):
+            values *= table[term_powers[iterms, None, idim], term_powers[None, :, idim],
+                            r1, r2, idim]
+
+        np.add.at(result, self.term_basis[iterms],
+                  np.add.reduceat(values, self._basis_starts, axis=1))
+
+    def _evaluate_chunk(self, points):
+        disp = points[None, :, :] - self.centers[:, None, :]
+        r2 = (disp**2).sum(axis=2)
+
+        # radial parts, skipping negligible exponentials
+        exponents = self.alphas[:, None] * r2[self.radial_centers]
+        active = exponents < self.cutoffs[:, None]
+        radial = np.zeros(exponents.shape)
+        radial[active] = np.exp(-exponents[active])
+
+        # angular parts: x^px y^py z^pz around each term's center
+        monodisp = disp[self.monomial_centers]
+        monomials = np.ones(monodisp.shape[:2])
+        for idim in range(3):
+            for p in np.unique(self.powers[:, idim]):
+                if p == 0:
+                    continue
+                rows = self.powers[:, idim] == p
+                monomials[rows] *= monodisp[rows, :, idim]**p
+
+        with np.errstate(under='ignore'):
+            terms = radial[self.term_radial] * monomials[self.term_monomial]
+            terms *= self.term_coeffs[:, None]
+        return np.add.reduceat(terms, self._basis_starts, axis=0).T
+
+
+def _overlap_table_1d(lmax, pa, pb, p):
+    """ 1-D overlap integrals between cartesian factors with powers up to ``lmax``, relative
+    to the overlap of the corresponding s functions (Obara-Saika recursion)
+
+    Returns:
+        np.ndarray: ``table[i, j, ...]`` is the integral for powers ``i`` and ``j``
+    """
+    table = np.zeros((lmax+1, lmax+1) + pa.shape)
+    table[0, 0] = 1.0
+    half_inv_p = 0.5 / p
+    for i in range(lmax):
+        table[i+1, 0] = pa * table[i, 0]
+        if i > 0:
+            table[i+1, 0] += i * half_inv_p * table[i-1, 0]
+    for j in range(lmax):
+        for i in range(lmax+1):
+            table[i, j+1] = pb * table[i, j]
+            if i > 0:
+                table[i, j+1] += i * half_inv_p * table[i-1, j]
+            if j > 0:
+                table[i, j+1] += j * half_inv_p * table[i, j-1]
+    return table
+
+
+def _magnitude(q, units):
+    """ Magnitude of ``q`` in the given units (plain numbers are assumed to already be in them)
+    """
+    if hasattr(q, 'units'):
+        return q.value_in(units)
+    else:
+        return np.asarray(q, dtype='float')
+
+
+def _ordered_keys(d):
+    keys = [None] * len(d)
+    for k, i in d.items():
+        keys[i] = k
+    return keys
@@ -165,6 +165,11 @@ qm_model_parameters = named_dict([
               choices=['huckel', 'minao', 'stored']),
     Parameter('store_orb_guesses', 'Automatically use orbitals for next initial guess',
               default=True, type=bool),
+    Parameter('guess_extrapolation',
+              'Number of previous density matrices to extrapolate the next initial guess from '
+              '(using ASPC if the geometries follow a smooth path, e.g. during dynamics)',
+              default=4, type=int,
+              relevance=WhenParam('store_orb_guesses', op.eq, True)),
     Parameter('multiplicity', 'Spin multiplicity', default=1, type=int),
     Parameter('symmetry', 'Symmetry detection',
               default=None, choices=[None, 'Auto', 'Loose']),
@@ -174,7 +179,9 @@ qm_model_parameters = named_dict([
 
 integrator_parameters = named_dict([
     Parameter('timestep', 'Dynamics timestep', default=1.0*u.fs, type=u.default.time),
-    Parameter('frame_interval', 'Time between frames', default=1.0*u.ps, type=u.fs)
+    Parameter('frame_interval', 'Time between frames', default=1.0*u.ps, type=u.fs),
+    Parameter('trajectory_directory', 'Store trajectory on disk in this directory',
+              default=None, type=str)
 ])
 
 md_parameters = named_dict([
@@ -196,6 +203,11 @@ langevin_parameters = named_dict([
     Parameter('collision_rate', 'Thermal collision rate', default=1.0/u.ps, type=1/u.ps)
 ])
 
+thermostat_parameters = named_dict([
+    Parameter('coupling_time', 'Thermostat coupling time', default=0.1*u.ps,
+              type=u.default.time)
+])
+
 num_cpus = Parameter('num_cpus', 'Number of CPUs (0=unlimited)', default=0, type=int)
 
 ground_state_properties = ['potential_energy',
@@ -20,6 +20,8 @@ standard_library.install_aliases()
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 import moldesign as mdt
 from moldesign import units as u
 
@@ -100,6 +102,73 @@ def assign_formal_charges(mol, ignore_nonzero=True):
             atom.formal_charge = newcharge * u.q_e
 
 
+@toplevel
+def assign_bonds_by_distance(mol, atoms=None, tolerance=0.4*u.angstrom):
+    """ Create single bonds between atoms that are closer than the sum of their covalent radii
+
+    This is a simple, template-free way to perceive bonding topology for structures that
+    don't come with it - for instance, ligands or other residues that aren't in the PDB chemical
+    component dictionary. It uses a spatial index, so it scales linearly with the number of atoms.
+
+    Two atoms are bonded if ``distance <= radius1 + radius2 + tolerance``, using the radii in
+    :data:`moldesign.data.COVALENT_RADII`. Existing bonds are not changed.
+
+    Note:
+        Bond orders are not assigned - all new bonds are created as single bonds. Use
+        ``mdt.guess_bond_orders`` to assign them afterwards.
+
+    Args:
+        mol (moldesign.Molecule): molecule to assign bonds to (modified in place). If ``atoms``
+            is passed, this is only used to check whether they're all of the molecule's atoms
+            (so that its cached spatial index can be reused)
+        atoms (List[moldesign.Atom]): only create bonds between these atoms, which must belong
+            to ``mol`` (default: all atoms)
+        tolerance (u.Scalar[length]): how far apart two atoms may be, beyond the sum of their
+            covalent radii, and still be bonded
+
+    Returns:
+        int: the number of bonds created
+    """
+    if atoms is None:
+        atoms = mol.atoms
+    else:
+        atoms = mdt.AtomList(atoms)
+    if len(atoms) < 2:
+        return 0
+
+    if atoms is mol.atoms:
+        index = mol.neighbor_index
+    else:
+        index = mdt.geom.NeighborIndex(atoms._raw_positions())
+    positions = index.positions
+    radii = _covalent_radii(atoms)
+    tol = tolerance.value_in(u.default.length)
+
+    pairs = index.pairs(2.0*radii.max() + tol)
+    displacements = positions[pairs[:, 0]] - positions[pairs[:, 1]]
+    distances = np.sqrt((displacements*displacements).sum(axis=1))
+    cutoffs = radii[pairs[:, 0]] + radii[pairs[:, 1]] + tol
+
+    numbonds = 0
+    for i, j in pairs[distances <= cutoffs]:
+        a1, a2 = atoms[i], atoms[j]
+        if a2 not in a1.bond_graph:
+            a1.bond_graph[a2] = 1  # also creates the reverse entry
+            numbonds += 1
+    return numbonds
+
+
+def _covalent_radii(atoms):
+    """ Array of the atoms' covalent radii, in the default length units (0 for unknown elements)
+    """
+    atnums = np.array([atom.atnum for atom in atoms])
+    radii = np.zeros(len(atnums))
+    for atnum in np.unique(atnums):
+        if atnum in mdt.data.COVALENT_RADII:
+            radii[atnums == atnum] = mdt.data.COVALENT_RADII[atnum].value_in(u.default.length)
+    return radii
+
+
 @toplevel
 def set_hybridization_and_saturate(mol):
     """ Assign bond orders, saturate with hydrogens, and assign formal charges
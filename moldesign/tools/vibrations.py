@@ -0,0 +1,205 @@
+"""
+Finite-difference hessians and harmonic vibrational analysis
+"""
+from __future__ import print_function, absolute_import, division
+from future.builtins import *
+from future import standard_library
+standard_library.install_aliases()
+
+# Copyright 2017 Autodesk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import multiprocessing
+
+import numpy as np
+
+from moldesign import units as u
+
+from . import toplevel
+
+WAVENUMBERS = 1.0 / u.ureg.centimeter
+
+
+@toplevel
+def hessian(mol, stepsize=0.005*u.angstrom, num_processes=1):
+    """ Calculate the molecule's hessian (the second derivatives of its potential energy with
+    respect to its cartesian coordinates) using central finite differences of the forces.
+
+    The forces at all 6N displaced geometries are calculated with the energy model's
+    :meth:`calculate_batch` method, so models that implement it efficiently (for instance, by
+    re-using the previous geometry's SCF solution) are fast here too. The displacements can also
+    be split between several processes, each working on its own copy of the molecule.
+
+    Args:
+        mol (moldesign.Molecule): molecule (with an energy model that calculates forces)
+        stepsize (u.Scalar[length]): size of each displacement
+        num_processes (int): number of processes to distribute the calculations between
+           (if 0, use all available CPUs)
+
+    Returns:
+        u.Array[energy/length**2]: the hessian, with shape ``(3*num_atoms, 3*num_atoms)``
+    """
+    ndim = mol.num_atoms * 3
+    displacements = np.zeros((2*ndim, ndim)) * stepsize
+    for idim in range(ndim):
+        displacements[2*idim, idim] = stepsize
+        displacements[2*idim + 1, idim] = -stepsize
+    conformations = mol.positions + displacements.reshape(2*ndim, mol.num_atoms, 3)
+
+    if num_processes == 0:
+        num_processes = multiprocessing.cpu_count()
+    num_processes = min(num_processes, len(conformations))
+    if num_processes > 1:
+        chunks = [conformations[i::num_processes] for i in range(num_processes)]
+        pool = multiprocessing.Pool(num_processes)
+        try:
+            results = pool.map(_calculate_forces, [(mol, chunk) for chunk in chunks])
+        finally:
+            pool.close()
+            pool.join()
+        forces = np.zeros((len(conformations), mol.num_atoms, 3)) * u.default.force
+        for i, chunkforces in enumerate(results):
+            forces[i::num_processes] = chunkforces
+    else:
+        forces = _calculate_forces((mol, conformations))
+
+    forces = forces.reshape(ndim, 2, ndim)
+    hess = (forces[:, 1, :] - forces[:, 0, :]) / (2.0 * stepsize)
+    return (0.5 * (hess + hess.T)).defunits()
+
+
+def _calculate_forces(args):
+    mol, conformations = args
+    return mol.energy_model.calculate_batch(conformations, requests=['forces']).forces
+
+
+@toplevel
+def normal_modes(mol, hess=None, project=True, **kwargs):
+    """ Harmonic vibrational analysis: calculate the molecule's normal modes and their
+    frequencies.
+
+    Args:
+        mol (moldesign.Molecule): molecule (with an energy model, unless ``hess`` is passed)
+        hess (u.Array[energy/length**2]): the molecule's hessian (default: calculate it with
+           :func:`hessian`)
+        project (bool): project out overall translations and rotations (only appropriate for
+           isolated molecules)
+        **kwargs: passed to :func:`hessian` (e.g., ``num_processes``)
+
+    Returns:
+        NormalModes: the normal modes, ordered by frequency
+    """
+    if hess is None:
+        hess = hessian(mol, **kwargs)
+
+    masses = mol.masses.value_in(u.default.mass)
+    inv_sqrt_m = np.repeat(1.0 / np.sqrt(masses), 3)
+    mw_hess = (hess.value_in(u.default.energy / u.default.length**2)
+               * inv_sqrt_m[:, None] * inv_sqrt_m[None, :])
+
+    if project:
+        basis = _internal_basis(mol.positions.value_in(u.default.length), masses)
+        mw_hess = basis.T.dot(mw_hess).dot(basis)
+
+    eigvals, eigvecs = np.linalg.eigh(mw_hess)
+    if project:
+        eigvecs = basis.dot(eigvecs)
+
+    # negative eigenvalues are reported as negative (i.e., imaginary) frequencies
+    eigunits = u.default.energy / (u.default.length**2 * u.default.mass)
+    angular_freqs = np.sign(eigvals) * np.sqrt(np.abs(eigvals) * eigunits)
+    frequencies = (angular_freqs / (2.0 * np.pi * u.c)).to(WAVENUMBERS)
+
+    cartesian = eigvecs * inv_sqrt_m[:, None]
+    reduced_masses = 1.0 / (cartesian**2).sum(axis=0)
+    cartesian /= np.sqrt((cartesian**2).sum(axis=0))
+    return NormalModes(mol, hess, frequencies,
+                       cartesian.T.reshape(-1, mol.num_atoms, 3),
+                       reduced_masses * u.default.mass)
+
+
+def _internal_basis(positions, masses):
+    """ Orthonormal basis for the mass-weighted coordinates that aren't overall translations
+    or rotations
+
+    Returns:
+        np.ndarray: basis vectors (as columns), shape ``(3*num_atoms, 3*num_atoms - 6)``
+           (or ``3*num_atoms - 5`` for linear molecules)
+    """
+    ndim = 3 * len(masses)
+    sqrt_m = np.sqrt(masses)
+    com = masses.dot(positions) / masses.sum()
+    rel = positions - com
+
+    external = np.zeros((ndim, 6))
+    for k in range(3):
+        external[k::3, k] = sqrt_m  # translations
+        axis = np.zeros(3)
+        axis[k] = 1.0
+        external[:, 3+k] = (np.cross(axis, rel) * sqrt_m[:, None]).ravel()  # rotations
+
+    # orthonormalize, dropping rotations that vanish (e.g., about a linear molecule's axis)
+    u_ext, svals, _ = np.linalg.svd(external, full_matrices=False)
+    external = u_ext[:, svals > 1e-6 * svals.max()]
+
+    projector = np.identity(ndim) - external.dot(external.T)
+    u_int, svals, _ = np.linalg.svd(projector)
+    return u_int[:, :ndim - external.shape[1]]
+
+
+class NormalModes(object):
+    """ The results of a harmonic vibrational analysis (see :func:`normal_modes`)
+
+    Attributes:
+        mol (moldesign.Molecule): the molecule
+        hessian (u.Array[energy/length**2]): cartesian hessian (shape ``(3N, 3N)``)
+        frequencies (u.Vector[1/length]): vibrational frequencies, in wavenumbers. Imaginary
+           frequencies are reported as negative numbers.
+        modes (np.ndarray): normalized cartesian displacements for each mode
+           (shape ``(num_modes, num_atoms, 3)``)
+        reduced_masses (u.Vector[mass]): reduced mass of each mode (defined as in most quantum
+           chemistry codes, ``1/sum(x**2)``, where ``x`` is the mode's cartesian displacement
+           vector with a normalized mass-weighted counterpart)
+    """
+    def __init__(self, mol, hessian, frequencies, modes, reduced_masses):
+        self.mol = mol
+        self.hessian = hessian
+        self.frequencies = frequencies
+        self.modes = modes
+        self.reduced_masses = reduced_masses
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def __repr__(self):
+        return '<%s for %s: %d modes>' % (self.__class__.__name__, self.mol.name, len(self))
+
+    @property
+    def num_imaginary(self):
+        """ int: number of modes with imaginary frequencies
+        """
+        return int((self.frequencies < 0.0 * WAVENUMBERS).sum())
+
+    def displaced(self, imode, amplitude=0.1*u.angstrom):
+        """ Get the molecule's positions, displaced along a normal mode
+
+        Args:
+            imode (int): index of the mode
+            amplitude (u.Scalar[length]): largest displacement of any atom
+
+        Returns:
+            u.Array[length]: displaced positions
+        """
+        mode = self.modes[imode]
+        scale = amplitude / np.sqrt((mode**2).sum(axis=1)).max()
+        return self.mol.positions + mode * scale
@@ -107,6 +107,9 @@ class MdtQuantity(ureg.Quantity):
     _Quantity__copy_units.extend(('diagonal', 'append', '_broadcast_to'))
     _Quantity__handled = ureg.Quantity._Quantity__handled + ('diagonal', 'append', 'dot')
 
+    # incremented inside :class:`moldesign.units.suspend_unit_checks` blocks
+    _unit_checks_suspended = 0
+
     # For pickling - prevent delegation to the built-in types' __getnewargs__ methods:
     def __getattr__(self, item):
         if item == '__getnewargs__':
@@ -142,6 +145,10 @@ class MdtQuantity(ureg.Quantity):
             if isinstance(value, basestring):
                 raise TypeError("Cannot assign units to a string ('%s')"%value)
 
+            if self._unit_checks_suspended:  # plain numbers are assumed to be in our units
+                self.magnitude[key] = value
+                return
+
             try:  # fallback to pint's implementation
                 super().__setitem__(key, value)
             except (TypeError, ValueError):
@@ -311,7 +318,10 @@ class MdtQuantity(ureg.Quantity):
     def append(self, item):
         from .tools import array
         try:
-            mag = item.value_in(self.units)
+            if item.units == self.units:  # skip the conversion if we can
+                mag = item._magnitude
+            else:
+                mag = item.value_in(self.units)
         except AttributeError:  # handles lists of quantities
             mag = array(item).value_in(self.units)
         self._magnitude.append(mag)
@@ -319,7 +329,7 @@ class MdtQuantity(ureg.Quantity):
     def extend(self, items):
         from . import array
         mags = array(items).value_in(self.units)
-        self._magnitude.append(mags)
+        self._magnitude.extend(mags)
 
 # monkeypatch pint's unit registry to return BuckyballQuantities
 ureg.Quantity = MdtQuantity
@@ -42,6 +42,26 @@ def unitsum(iterable):
     return g0
 
 
+class suspend_unit_checks(object):
+    """ Context manager that allows plain (unitless) numbers to be assigned into arrays with units.
+
+    Inside this block, numbers assigned into an existing quantity (e.g., ``mol.positions[3] = x``)
+    are assumed to already be in that quantity's units, instead of raising a
+    ``DimensionalityError``. This lets numerical code work with raw numpy arrays in MDT's
+    default unit system without paying for unit conversions on every assignment.
+
+    Examples:
+        >>> with suspend_unit_checks():
+        >>>     mol.positions[0] = [1.0, 0.0, 0.0]  # interpreted as angstroms
+    """
+    def __enter__(self):
+        MdtQuantity._unit_checks_suspended += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        MdtQuantity._unit_checks_suspended -= 1
+
+
 def dot(a1, a2):
     """ Dot product that respects units
 
@@ -88,6 +108,9 @@ def arrays_almost_equal(a1, a2):
     Raises:
         DimensionalityError: if the arrays have incompatible units
     """
+    if (isinstance(a1, MdtQuantity) and isinstance(a2, MdtQuantity)
+            and a1._units == a2._units):  # fast path - no unit conversions necessary
+        return np.allclose(a1.magnitude, a2.magnitude, atol=1e-12)
 
     a1units = False
     if isinstance(a1, MdtQuantity):
@@ -52,6 +52,11 @@ class UnitSystem(object):
         self.angle = angle
         self.charge = charge
 
+    def __setattr__(self, item, value):
+        # any change to the unit definitions invalidates the cached base units
+        super().__setattr__(item, value)
+        self.__dict__['_baseunit_cache'] = {}
+
     def __getitem__(self, item):
         """ For convenience when using pint dimensionality descriptions.
         This aliases self['item'] = self['[item]'] = self.item,
@@ -124,6 +129,17 @@ class UnitSystem(object):
         Returns:
             MdtUnit: units found in the passed object
         """
+        # base units only depend on the units themselves, so they're cached for quantities
+        units = getattr(quantity, '_units', None)
+        if units is None:
+            return self._get_baseunit(quantity)
+        try:
+            return self._baseunit_cache[units]
+        except KeyError:
+            baseunit = self._baseunit_cache[units] = self._get_baseunit(quantity)
+            return baseunit
+
+    def _get_baseunit(self, quantity):
         try:
             dims = dict(quantity.dimensionality)
         except AttributeError:
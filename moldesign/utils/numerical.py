@@ -44,7 +44,11 @@ class ResizableArray(object):
         return '%s(%s)' % (self.__class__.__name__, repr(self._subarray))
 
     def append(self, item):
-        self.extend([item])
+        if self._len >= self._size:
+            self._resize(self._len + 1)
+        self._array[self._len] = item
+        self._len += 1
+        self._subarray = self._array[:self._len]
 
     def extend(self, its):
         try:
@@ -63,6 +67,17 @@ class ResizableArray(object):
 
         self._subarray = self._array[:self._len]
 
+    def reserve(self, size):
+        """ Preallocate memory for at least ``size`` elements along the first axis.
+
+        This doesn't change the length of the array; it just means that the next
+        ``size - len(self)`` appends won't require any reallocation.
+
+        Args:
+            size (int): number of elements to allocate room for
+        """
+        self._resize(size)
+
     def _resize(self, minsize):
         newsize = round_up_to_power_of_two(minsize)
         if newsize <= self._size:
@@ -75,6 +90,88 @@ class ResizableArray(object):
         self._array = newarray
         self._size = newsize
 
+class MemmapArray(ResizableArray):
+    """ A :class:`ResizableArray` whose data lives in a memory-mapped file instead of in memory.
+
+    Data is only read from disk when it's accessed, so these arrays can be much larger than the
+    available RAM. As with ``ResizableArray``, the file is grown in large chunks whenever the
+    number of elements grows beyond its current size.
+
+    The file is raw binary data (no header); its layout is determined entirely by ``shape``,
+    ``dtype`` and ``length``.
+
+    Args:
+        filename (str): path to the data file
+        shape (tuple): shape of each element of the array (i.e., of ``array[0]``)
+        dtype (np.dtype): data type of the array
+        length (int): number of elements already stored in the file (when opening existing data)
+        mode (str): ``'w+'`` to create (or overwrite) the file, ``'r+'`` to open an existing
+           file for reading and writing, or ``'r'`` to open it read-only
+    """
+    def __init__(self, filename, shape=(), dtype='float64', length=0, mode='w+'):
+        if mode not in ('w+', 'r+', 'r'):
+            raise ValueError("Mode must be one of 'w+', 'r+', or 'r', not '%s'" % mode)
+        if mode == 'w+':
+            open(filename, 'wb').close()
+            length = 0
+        self.filename = filename
+        self.mode = mode
+        self._itemshape = tuple(shape)
+        self._dtype = np.dtype(dtype)
+        self._len = length
+        self._size = 0
+        self._array = None
+        self._map(max(length, 1))
+
+    def _map(self, size):
+        """ (Re)create the memory map with room for ``size`` elements, growing the file if necessary
+        """
+        if self._array is not None:
+            self.flush()
+        itemsize = self._dtype.itemsize * int(np.prod(self._itemshape))
+        if self.mode != 'r':
+            with open(self.filename, 'r+b') as datafile:
+                datafile.seek(0, 2)
+                if datafile.tell() < size * itemsize:
+                    datafile.truncate(size * itemsize)
+        self._array = np.memmap(self.filename, dtype=self._dtype,
+                                mode='r' if self.mode == 'r' else 'r+',
+                                shape=(size,) + self._itemshape)
+        self._size = size
+        self._subarray = self._array[:self._len]
+
+    def _resize(self, minsize):
+        newsize = round_up_to_power_of_two(minsize)
+        if newsize <= self._size:
+            return
+        if self.mode == 'r':
+            raise IOError('Cannot add data to read-only array "%s"' % self.filename)
+        self._map(newsize)
+
+    def flush(self):
+        """ Make sure all changes have been written to disk
+        """
+        if self.mode != 'r':
+            self._array.flush()
+
+    def __getstate__(self):
+        """ Only the file's description is pickled, not its data
+        """
+        self.flush()
+        return {'filename': self.filename, 'mode': self.mode, 'itemshape': self._itemshape,
+                'dtype': self._dtype, 'len': self._len}
+
+    def __setstate__(self, state):
+        self.filename = state['filename']
+        self.mode = 'r' if state['mode'] == 'r' else 'r+'
+        self._itemshape = state['itemshape']
+        self._dtype = state['dtype']
+        self._len = state['len']
+        self._size = 0
+        self._array = None
+        self._map(max(self._len, 1))
+
+
 # delegate magic methods as well - this is a list of all math-related array methods
 _ARRAYMAGIC = ('__abs__', '__add__', '__and__', '__array__', '__contains__', '__copy__',
                '__deepcopy__', '__delitem__', '__delslice__', '__div__', '__divmod__', '__eq__',
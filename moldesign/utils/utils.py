@@ -7,6 +7,7 @@ import future.utils
 
 from functools import reduce
 import fractions
+import gc
 import operator
 import os
 import re
@@ -312,6 +313,22 @@ class redirect_stderr(_RedirectStream):
     _stream = "stderr"
 
 
+class paused_gc(object):
+    """ Context manager that turns off python's cyclic garbage collector while it's active.
+
+    Creating many objects at once (e.g., copying a large molecule) would otherwise trigger
+    repeated collections, each of which has to traverse every object in memory. The collector
+    is only turned back on if it was on to begin with, so these blocks can be nested.
+    """
+    def __enter__(self):
+        self._was_enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, exctype, excinst, exctb):
+        if self._was_enabled:
+            gc.enable()
+
+
 GETFLOAT = re.compile(r'-?\d+(\.\d+)?(e[-+]?\d+)')  # matches numbers, e.g. 1, -2.0, 3.5e50, 0.001e-10
 
 